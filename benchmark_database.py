@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark Database - Times signal fan-out and menu lookups against the in-memory backend
+
+Generates a seeded synthetic dataset, so runs are reproducible and need no Supabase.
+
+Usage:
+    python benchmark_database.py --users 100000 --signals 50 --lookups 2000
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Database on synthetic data")
+    parser.add_argument("--users", type=int, default=100000, help="Number of synthetic users")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset and workload seed")
+    parser.add_argument("--signals", type=int, default=50, help="Signals to fan out")
+    parser.add_argument("--lookups", type=int, default=2000, help="Menu lookups per operation")
+    return parser.parse_args()
+
+
+def report(name, timings, extra=""):
+    timings = sorted(timings)
+    avg = sum(timings) / len(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<32} n={len(timings):<6} avg={avg * 1000:8.3f} ms  p95={p95 * 1000:8.3f} ms  {extra}")
+
+
+async def run(args):
+    from trading_bot.services.database.db import Database
+    from trading_bot.services.database.memory_backend import DEFAULT_INSTRUMENTS
+
+    started = time.perf_counter()
+    db = Database()
+    print(f"Loaded {db.memory_backend.get_stats()} in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(args.seed)
+    user_ids = [100_000_000 + i for i in range(args.users)]
+    signals = []
+    for _ in range(args.signals):
+        market = rng.choice(list(DEFAULT_INSTRUMENTS))
+        signals.append({"market": market, "instrument": rng.choice(DEFAULT_INSTRUMENTS[market]), "interval": "1h"})
+
+    # Signal fan-out: subscriptions per instrument, then the active-subscriber filter
+    lookups, filters, recipients = [], [], 0
+    for signal in signals:
+        t0 = time.perf_counter()
+        subscriptions = await db.get_signal_subscriptions(signal["instrument"])
+        t1 = time.perf_counter()
+        active = await db.filter_active_subscribers([s["user_id"] for s in subscriptions])
+        t2 = time.perf_counter()
+        lookups.append(t1 - t0)
+        filters.append(t2 - t1)
+        recipients += len(active)
+    report("get_signal_subscriptions", lookups)
+    report("filter_active_subscribers", filters, f"avg recipients={recipients // max(1, len(signals))}")
+
+    matches = []
+    for signal in signals:
+        t0 = time.perf_counter()
+        await db.match_subscribers(signal)
+        matches.append(time.perf_counter() - t0)
+    report("match_subscribers", matches)
+
+    # Menu flows: per-user preference and subscription lookups
+    sample = [rng.choice(user_ids) for _ in range(args.lookups)]
+    for name, method in (("get_user_preferences", db.get_user_preferences),
+                         ("get_user_subscription", db.get_user_subscription),
+                         ("is_user_subscribed", db.is_user_subscribed)):
+        timings = []
+        for user_id in sample:
+            t0 = time.perf_counter()
+            await method(user_id)
+            timings.append(time.perf_counter() - t0)
+        report(name, timings)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["USE_MOCK_DATA"] = "true"
+    os.environ["MOCK_DATA_USERS"] = str(args.users)
+    os.environ["MOCK_DATA_SEED"] = str(args.seed)
+    os.environ.pop("SUPABASE_URL", None)
+    os.environ.pop("SUPABASE_KEY", None)
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
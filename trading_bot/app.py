@@ -11,6 +11,7 @@ import psutil
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import importlib.util
 
 # Add the parent directory to the path for imports
@@ -19,6 +20,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import signal interceptor
 from trading_bot.services.signal_interceptor import SignalInterceptor
 from trading_bot.services.signal_storage_service import SignalStorageService
+from trading_bot.services.signal_queue import SignalQueueConsumer, get_signal_queue
+from trading_bot.services.signal_dedup import get_signal_deduplicator
 
 # Set up logger
 logger = logging.getLogger("trading_bot.api")
@@ -33,6 +36,10 @@ app = FastAPI(
 # Initialize signal interceptor
 signal_interceptor = None
 
+# Background consumers delivering queued signals
+signal_consumer = None
+telegram_service = None
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -45,10 +52,39 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global signal_interceptor
+    global signal_interceptor, signal_consumer
     signal_interceptor = SignalInterceptor()
     await signal_interceptor.setup()
     logger.info("Signal interceptor initialized successfully")
+    
+    # Start delivering queued signals in the background
+    signal_consumer = SignalQueueConsumer(get_signal_queue(), deliver_signal)
+    await signal_consumer.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background services on shutdown"""
+    if signal_consumer:
+        await signal_consumer.stop()
+    if telegram_service is not None and getattr(telegram_service, "signal_digest", None):
+        # Send signals still buffered for a digest before the process exits
+        await telegram_service.signal_digest.close()
+    if signal_interceptor:
+        # Write out signals still waiting for a write-behind flush
+        await signal_interceptor.signal_storage.close()
+
+async def deliver_signal(signal_data):
+    """Deliver a queued signal to subscribers through a shared TelegramService"""
+    global telegram_service
+    if telegram_service is None:
+        # Import the TelegramService dynamically to avoid circular imports
+        from trading_bot.main import TelegramService
+        from trading_bot.services.database.db import Database
+        telegram_service = TelegramService(db=Database())
+    if isinstance(signal_data, list):
+        # Queued by the batch endpoint
+        return await telegram_service.process_signal_batch(signal_data)
+    return await telegram_service.process_signal(signal_data)
 
 @app.get("/")
 async def root():
@@ -157,8 +193,8 @@ async def receive_signal(request: Request):
     """
     Endpoint for receiving trading signals from external sources
     
-    This endpoint processes incoming trading signals and forwards them to the bot
-    for distribution to subscribers.
+    This endpoint stores incoming trading signals in the durable signal queue and
+    returns 202 immediately; background consumers distribute them to subscribers.
     """
     try:
         # Log the incoming request
@@ -175,47 +211,76 @@ async def receive_signal(request: Request):
         # Log the parsed data
         logger.info(f"Signal data: {data}")
 
-        # Store signal using SignalInterceptor for persistence
+        # Acknowledge retried or duplicated alerts without processing them again
+        deduplicator = await get_signal_deduplicator()
+        is_duplicate, fingerprint = await deduplicator.check(data)
+        if is_duplicate:
+            return {"status": "duplicate", "message": "Signal already received, not processed again"}
+
         global signal_interceptor
-        if signal_interceptor:
-            # Get any user ID if present, otherwise use default
-            user_id = data.get("user_id", "default")
-            # Store the signal using the interceptor
-            signal_id = await signal_interceptor.intercept_signal(data, user_id)
-            logger.info(f"Signal {signal_id} stored successfully via SignalInterceptor")
-        else:
-            logger.warning("Signal interceptor not available - signal will not be stored for persistence")
-            
-        # Log the webhook URL being used
-        webhook_url = os.environ.get("WEBHOOK_URL", "https://sigmapips-27-production.up.railway.app")
-        logger.info(f"Processing signal using webhook URL: {webhook_url}")
-        
-        # Import the TelegramService dynamically to avoid circular imports
         try:
-            from trading_bot.main import TelegramService
-            from trading_bot.services.database.db import Database
-            
-            # Get the bot instance
-            db = Database()
-            telegram_service = TelegramService(db=db)
-            
-            # Process the signal
-            result = await telegram_service.process_signal(data)
-            
-            if result:
-                logger.info(f"Signal processed successfully via webhook URL: {webhook_url}")
-                return {"status": "success", "message": f"Signal {signal_id if signal_interceptor else 'unknown'} processed and stored successfully"}
+            # Store signal using SignalInterceptor for persistence
+            if signal_interceptor:
+                # Get any user ID if present, otherwise use default
+                user_id = data.get("user_id", "default")
+                # Store the signal using the interceptor
+                signal_id = await signal_interceptor.intercept_signal(data, user_id)
+                logger.info(f"Signal {signal_id} stored successfully via SignalInterceptor")
             else:
-                logger.error(f"Failed to process signal via webhook URL: {webhook_url}")
-                return {"status": "error", "message": "Failed to process signal"}
+                logger.warning("Signal interceptor not available - signal will not be stored for persistence")
                 
-        except ImportError as ie:
-            logger.error(f"Import error in signal endpoint: {str(ie)}")
-            return {"status": "error", "message": "Internal service error"}
-        except Exception as e:
-            logger.error(f"Error processing signal: {str(e)}")
-            return {"status": "error", "message": str(e)}
+            # Queue the signal for background delivery and acknowledge right away
+            queue_id = await get_signal_queue().enqueue_async(data)
+        except Exception:
+            # Let the sender's retry through since this attempt was not accepted
+            await deduplicator.forget(fingerprint)
+            raise
+        logger.info(f"Signal queued for delivery with queue ID {queue_id}")
+        
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "accepted",
+                "message": f"Signal {signal_id if signal_interceptor else 'unknown'} queued for delivery",
+                "queue_id": queue_id
+            }
+        )
             
     except Exception as e:
+        # A 5xx makes the sender retry the alert, which the forgotten fingerprint lets through
         logger.error(f"Error in signal endpoint: {str(e)}")
-        return {"status": "error", "message": str(e)} 
\ No newline at end of file
+        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+
+@app.get("/db/stats")
+async def db_stats():
+    """Per-query latency of the async database clients and per-method Database statistics in this process"""
+    db = getattr(telegram_service, "db", None) if telegram_service else None
+    if db is None or not hasattr(db, "get_query_stats"):
+        return {"status": "unavailable", "message": "Database not initialized in this process"}
+    return db.get_query_stats()
+
+@app.get("/db/slow-queries")
+async def db_slow_queries():
+    """Recent Database calls slower than DB_SLOW_QUERY_MS, newest first"""
+    db = getattr(telegram_service, "db", None) if telegram_service else None
+    if db is None or not hasattr(db, "instrumentation"):
+        return {"status": "unavailable", "message": "Database not initialized in this process"}
+    return db.instrumentation.get_slow_queries()
+
+@app.get("/signal/queue")
+async def signal_queue_stats():
+    """Queue depth, delivery lag, consumer throughput and suppressed duplicates of the signal queue"""
+    stats = signal_consumer.get_stats() if signal_consumer else get_signal_queue().get_stats()
+    stats["dedup"] = (await get_signal_deduplicator()).get_stats()
+    
+    # Include recent fan-out throughput when the bot lives in this process
+    fanout = getattr(telegram_service, "signal_fanout", None) if telegram_service else None
+    if fanout:
+        stats["fanout"] = fanout.get_stats()
+    signal_cache = getattr(telegram_service, "signal_cache", None) if telegram_service else None
+    if signal_cache:
+        stats["signal_cache"] = signal_cache.get_stats()
+    signal_digest = getattr(telegram_service, "signal_digest", None) if telegram_service else None
+    if signal_digest:
+        stats["digest"] = signal_digest.get_stats()
+    return stats
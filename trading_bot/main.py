@@ -92,8 +92,8 @@ import os
 import json
 import asyncio
 import traceback
-from typing import Dict, Any, List, Optional, Union, Set
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Union, Set, Tuple
+from datetime import datetime, timedelta, timezone
 import logging
 import copy
 import re
@@ -121,6 +121,7 @@ import telegram.error  # Add this import for BadRequest error handling
 
 from trading_bot.services.database.db import Database
 from trading_bot.services.chart_service.chart import ChartService
+from trading_bot.services.chart_service.prerender import ChartPrerenderer
 from trading_bot.services.sentiment_service.sentiment import MarketSentimentService
 from trading_bot.services.calendar_service import EconomicCalendarService
 from trading_bot.services.payment_service.stripe_service import StripeService
@@ -133,10 +134,20 @@ from trading_bot.services.telegram_service.states import (
     CALLBACK_SIGNALS_MANAGE, CALLBACK_BACK_MENU
 )
 import trading_bot.services.telegram_service.gif_utils as gif_utils
+from trading_bot.services.telegram_service.media_registry import MEDIA_REGISTRY
+from trading_bot.services.telegram_service.fanout import SignalFanout, unique_chat_ids
+from trading_bot.services.telegram_service.digest import SignalDigestBuffer
+from trading_bot.services.signal_log import SignalLog
+from trading_bot.services.signal_cache import SignalCache
+from trading_bot.utils.instrument_registry import INSTRUMENTS, INSTRUMENT_TIMEFRAME_MAP
+from trading_bot.utils.timeframes import STYLE_TIMEFRAME_MAP
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Written to the signal log directory once legacy JSON signal files are imported
+LEGACY_IMPORT_MARKER = ".legacy_imported"
+
 # Major currencies to focus on
 MAJOR_CURRENCIES = ["USD", "EUR", "GBP", "JPY", "CHF", "AUD", "NZD", "CAD"]
 
@@ -488,69 +499,6 @@ STYLE_KEYBOARD = [
     [InlineKeyboardButton("⬅️ Back", callback_data="back_instrument")]
 ]
 
-# Timeframe mapping
-STYLE_TIMEFRAME_MAP = {
-    "test": "1m",
-    "scalp": "15m",
-    "intraday": "1h",
-    "swing": "4h"
-}
-
-# Mapping of instruments to their allowed timeframes - updated 2023-03-23
-INSTRUMENT_TIMEFRAME_MAP = {
-    # H1 timeframe only
-    "AUDJPY": "H1", 
-    "AUDCHF": "H1",
-    "EURCAD": "H1",
-    "EURGBP": "H1",
-    "GBPCHF": "H1",
-    "HK50": "H1",
-    "NZDJPY": "H1",
-    "USDCHF": "H1",
-    "USDJPY": "H1",  # USDJPY toegevoegd voor signaalabonnementen
-    "XRPUSD": "H1",
-    
-    # H4 timeframe only
-    "AUDCAD": "H4",
-    "AU200": "H4", 
-    "CADCHF": "H4",
-    "EURCHF": "H4",
-    "EURUSD": "H4",
-    "GBPCAD": "H4",
-    "LINKUSD": "H4",
-    "NZDCHF": "H4",
-    
-    # M15 timeframe only
-    "DOGEUSD": "M15",
-    "GBPNZD": "M15",
-    "NZDUSD": "M15",
-    "SOLUSD": "M15",
-    "UK100": "M15",
-    "XAUUSD": "M15",
-    
-    # M30 timeframe only
-    "BNBUSD": "M30",
-    "DOTUSD": "M30",
-    "ETHUSD": "M30",
-    "EURAUD": "M30",
-    "EURJPY": "M30",
-    "GBPAUD": "M30",
-    "GBPUSD": "M30",
-    "NZDCAD": "M30",
-    "US30": "M30",
-    "US500": "M30",
-    "USDCAD": "M30",
-    "XLMUSD": "M30",
-    "XTIUSD": "M30",
-    "DE40": "M30",
-    "BTCUSD": "M30",  # Added for consistency with CRYPTO_KEYBOARD_SIGNALS
-    "US100": "M30",   # Added for consistency with INDICES_KEYBOARD_SIGNALS
-    "XAGUSD": "M15",  # Added for consistency with COMMODITIES_KEYBOARD_SIGNALS
-    "USOIL": "M30"    # Added for consistency with COMMODITIES_KEYBOARD_SIGNALS
-    
-    # Removed as requested: EU50, FR40, LTCUSD
-}
-
 # Map common timeframe notations
 TIMEFRAME_DISPLAY_MAP = {
     "M15": "15 Minutes",
@@ -562,39 +510,7 @@ TIMEFRAME_DISPLAY_MAP = {
 # Voeg deze functie toe aan het begin van bot.py, na de imports
 def _detect_market(instrument: str) -> str:
     """Detecteer market type gebaseerd op instrument"""
-    instrument = instrument.upper()
-    
-    # Commodities eerst checken
-    commodities = [
-        "XAUUSD",  # Gold
-        "XAGUSD",  # Silver
-        "WTIUSD",  # Oil WTI
-        "BCOUSD",  # Oil Brent
-        "USOIL",   # Oil WTI (alternative symbol)
-    ]
-    if instrument in commodities:
-        logger.info(f"Detected {instrument} as commodity")
-        return "commodities"
-    
-    # Crypto pairs
-    crypto_base = ["BTC", "ETH", "XRP", "SOL", "BNB", "ADA", "DOT", "LINK"]
-    if any(c in instrument for c in crypto_base):
-        logger.info(f"Detected {instrument} as crypto")
-        return "crypto"
-    
-    # Major indices
-    indices = [
-        "US30", "US500", "US100",  # US indices
-        "UK100", "DE40", "FR40",   # European indices
-        "JP225", "AU200", "HK50"   # Asian indices
-    ]
-    if instrument in indices:
-        logger.info(f"Detected {instrument} as index")
-        return "indices"
-    
-    # Forex pairs als default
-    logger.info(f"Detected {instrument} as forex")
-    return "forex"
+    return INSTRUMENTS.market(instrument)
 
 # Voeg dit toe als decorator functie bovenaan het bestand na de imports
 def require_subscription(func):
@@ -714,13 +630,20 @@ class TelegramService:
         
         # Setup configuration 
         self.stripe_service = stripe_service
-        self.user_signals = {}
         self.signals_dir = "data/signals"
         self.user_signals_dir = "data/signals/users"
 
         # Create necessary directories
         os.makedirs(self.signals_dir, exist_ok=True)
         os.makedirs(self.user_signals_dir, exist_ok=True)
+        
+        # Every signal is stored once; users hold references to it
+        self.signal_log = SignalLog(os.path.join(self.signals_dir, "log"))
+        self.signal_cache = SignalCache(loader=self.signal_log.get)
+        
+        # Optionally coalesce bursts of signals into one digest per user
+        self.signal_digest = SignalDigestBuffer(self._send_signal_digests)
+        self.signal_log_retention_days = float(os.getenv("SIGNAL_LOG_RETENTION_DAYS", 30))
 
         self.signals_enabled_val = True
         self.polling_started = False
@@ -765,6 +688,8 @@ class TelegramService:
         
         # Initialize API services
         self.chart_service = ChartService()  # Initialize chart service
+        # Keeps charts of hot instruments cached after candle closes and between them
+        self.chart_prerenderer = ChartPrerenderer(self.chart_service, self.db.get_instrument_subscriber_counts)
         # Lazy load services only when needed
         self._calendar_service = None
         self._sentiment_service = None
@@ -788,15 +713,15 @@ class TelegramService:
             
             # Initialize the bot
             self.bot = Bot(token=self.bot_token)
+            
+            # Rate-aware fan-out engine for signal broadcasts
+            self.signal_fanout = SignalFanout(self.bot)
         
             # Initialize the application
             self.application = Application.builder().bot(self.bot).build()
         
             # Register the handlers
             self._register_handlers(self.application)
-            
-            # Initialize signals dictionary but don't load them yet (will be done in initialize_services)
-            self.user_signals = {}
         
             logger.info("Telegram service initialized")
             
@@ -817,10 +742,37 @@ class TelegramService:
             # Load stored signals
             await self._load_signals()
             logger.info("Signals loaded")
+            
+            # The subscriber_preferences index has no periodic reconcile task: signals are sent
+            # from signal_subscriptions, and a stale index is rebuilt in the background on use
+            
+            # Keep the local mirror of subscriber and subscription tables current
+            if hasattr(self.db, 'start_mirror_sync'):
+                self.db.start_mirror_sync()
+            
+            # Expire and refresh the in-memory set of active subscribers
+            if hasattr(self.db, 'start_active_subscriber_sync'):
+                self.db.start_active_subscriber_sync()
+            
+            # Pre-render charts of hot instruments after each candle close
+            self.chart_prerenderer.start()
+            
+            # Compact the signal log in the background
+            self._signal_log_task = asyncio.create_task(self._compact_signal_log_periodically())
         except Exception as e:
             logger.error(f"Error initializing services: {str(e)}")
             raise
             
+    async def _compact_signal_log_periodically(self, interval: int = 24 * 60 * 60):
+        """Drop expired signals from the signal log once per interval"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.signal_log.compact, self.signal_log_retention_days)
+            except Exception as e:
+                logger.error(f"Error compacting signal log: {str(e)}")
+            
     # Calendar service helpers
     @property
     def calendar_service(self):
@@ -1364,16 +1316,10 @@ class TelegramService:
     def _save_user_signal(self, user_id: str, signal_id: str, signal_data: Dict[str, Any]) -> None:
         # Save a signal specifically for a user to ensure persistence
         try:
-            # Create user's signal directory if it doesn't exist
-            user_signal_dir = os.path.join(self.user_signals_dir, user_id)
-            os.makedirs(user_signal_dir, exist_ok=True)
-            
-            # Save the signal data to the user's directory
-            signal_path = os.path.join(user_signal_dir, f"{signal_id}.json")
-            with open(signal_path, 'w') as f:
-                json.dump(signal_data, f, indent=4)
-                
-            logger.info(f"Saved signal for user {user_id}: {signal_path}")
+            # The signal body is stored once in the signal log; the user only gets a reference
+            signal_data = dict(signal_data, id=signal_data.get('id', signal_id))
+            self.signal_log.append(signal_data, [user_id])
+            logger.info(f"Saved signal {signal_id} for user {user_id} in signal log")
         except Exception as e:
             logger.error(f"Error saving user signal: {str(e)}")
 
@@ -2558,12 +2504,13 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             signal_data = None
             
             # First try with signal_id if available (most reliable)
-            if signal_id and str(user_id) in self.user_signals and signal_id in self.user_signals[str(user_id)]:
-                signal_data = self.user_signals[str(user_id)][signal_id]
-                logger.info(f"Found signal directly by ID: {signal_id}")
+            if signal_id:
+                signal_data = self._get_user_signal(user_id, signal_id)
+                if signal_data:
+                    logger.info(f"Found signal directly by ID: {signal_id}")
             # Otherwise find matching signal based on instrument and direction
-            elif str(user_id) in self.user_signals:
-                user_signal_dict = self.user_signals[str(user_id)]
+            user_signal_dict = self.signal_cache.get_user_signals(user_id) if not signal_data else {}
+            if user_signal_dict:
                 # Find signals matching instrument, direction and timeframe
                 matching_signals = []
                 
@@ -2600,8 +2547,15 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             
             # If not found in memory cache, try to load from storage
             if not signal_data:
-                # First try user-specific storage
-                if signal_id:
+                # First try the newest signal the user received for this instrument
+                if signal_instrument:
+                    latest = self._get_latest_user_signal(user_id, signal_instrument)
+                    if latest:
+                        signal_id, signal_data = latest
+                        logger.info(f"Loaded latest {signal_instrument} signal {signal_id} from signal log")
+                
+                # Then try legacy user-specific storage
+                if not signal_data and signal_id:
                     user_signal_path = os.path.join(self.user_signals_dir, str(user_id), f"{signal_id}.json")
                     if os.path.exists(user_signal_path):
                         try:
@@ -2660,9 +2614,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             
             # Store this signal in memory for future use
             if signal_id:
-                if str(user_id) not in self.user_signals:
-                    self.user_signals[str(user_id)] = {}
-                self.user_signals[str(user_id)][signal_id] = signal_data
+                self.signal_cache.put(dict(signal_data, id=signal_id), user_id)
                 
                 # Also persist to user's signal directory
                 self._save_user_signal(str(user_id), signal_id, signal_data)
@@ -2715,13 +2667,14 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                     signal_found = False
                     signal_data = None
                     
-                    # Look in user signals memory cache
-                    if user_id in self.user_signals and signal_id in self.user_signals[user_id]:
-                        signal_data = self.user_signals[user_id][signal_id]
-                        signal_found = True
-                        logger.info(f"Found signal {signal_id} in user memory cache")
+                    # Look in user signals memory cache, loading from the signal log on first access
+                    if signal_id:
+                        signal_data = self._get_user_signal(user_id, signal_id)
+                        if signal_data:
+                            signal_found = True
+                            logger.info(f"Found signal {signal_id} for user {user_id}")
                     
-                    # If not found, try to load from file
+                    # If not found, try to load from legacy file storage
                     if not signal_found:
                         user_signal_path = os.path.join(self.user_signals_dir, user_id, f"{signal_id}.json")
                         if os.path.exists(user_signal_path):
@@ -2732,9 +2685,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                                 logger.info(f"Found signal {signal_id} in user file storage")
                                 
                                 # Update memory cache
-                                if user_id not in self.user_signals:
-                                    self.user_signals[user_id] = {}
-                                self.user_signals[user_id][signal_id] = signal_data
+                                self.signal_cache.put(dict(signal_data, id=signal_id), user_id)
                             except Exception as e:
                                 logger.error(f"Error loading user signal file: {str(e)}")
                     
@@ -2749,9 +2700,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                                 logger.info(f"Found signal {signal_id} in central storage")
                                 
                                 # Add to user signals for future use
-                                if user_id not in self.user_signals:
-                                    self.user_signals[user_id] = {}
-                                self.user_signals[user_id][signal_id] = signal_data
+                                self.signal_cache.put(dict(signal_data, id=signal_id), user_id)
                                 
                                 # Save to user specific storage
                                 self._save_user_signal(user_id, signal_id, signal_data)
@@ -2897,9 +2846,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                 
                 try:
                     # Delete the signal subscription
-                    response = self.db.supabase.table('signal_subscriptions').delete().eq('id', signal_id).execute()
-                    
-                    if response and response.data:
+                    if await self.db.delete_signal_subscription(signal_id):
                         # Successfully deleted
                         await query.answer("Signal subscription removed successfully")
                     else:
@@ -2920,9 +2867,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                 
                 try:
                     # Delete all signal subscriptions for this user
-                    response = self.db.supabase.table('signal_subscriptions').delete().eq('user_id', user_id).execute()
-                    
-                    if response and response.data:
+                    if await self.db.delete_all_signal_subscriptions(user_id):
                         # Successfully deleted
                         await query.answer("All signal subscriptions removed successfully")
                     else:
@@ -3185,7 +3130,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             
             try:
                 # Check if subscription already exists
-                response = self.db.supabase.table('signal_subscriptions').select('*').eq('user_id', user_id).eq('instrument', instrument).eq('timeframe', timeframe).execute()
+                response = await self.db.db_client.table('signal_subscriptions').select('*').eq('user_id', user_id).eq('instrument', instrument).eq('timeframe', timeframe).execute()
                 
                 if response and response.data and len(response.data) > 0:
                     # Subscription already exists
@@ -3194,15 +3139,17 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                     # Create new subscription
                     market = _detect_market(instrument)
                     
+                    now = datetime.now(timezone.utc).isoformat()
                     subscription_data = {
                         'user_id': user_id,
                         'instrument': instrument,
                         'timeframe': timeframe,
                         'market': market,
-                        'created_at': datetime.now().isoformat()
+                        'created_at': now,
+                        'updated_at': now
                     }
                     
-                    insert_response = self.db.supabase.table('signal_subscriptions').insert(subscription_data).execute()
+                    insert_response = await self.db.db_client.table('signal_subscriptions').insert(subscription_data).execute()
                     
                     if insert_response and insert_response.data:
                         message = f"✅ Successfully subscribed to <b>{instrument}</b> signals on {timeframe_display} timeframe!"
@@ -3412,11 +3359,10 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                 
                 try:
                     # Try to show animated GIF for loading
-                    await query.edit_message_media(
-                        media=InputMediaAnimation(
-                            media=loading_gif,
-                            caption=loading_text
-                        )
+                    await MEDIA_REGISTRY.edit(
+                        query.edit_message_media,
+                        lambda media: InputMediaAnimation(media=media, caption=loading_text),
+                        loading_gif
                     )
                     logger.info(f"Successfully showed loading GIF for {instrument} technical analysis")
                 except Exception as gif_error:
@@ -3486,10 +3432,10 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             try:
                 logger.info(f"Sending chart image for {instrument} {timeframe}")
                 
-                # Send the chart with the caption
-                await context.bot.send_photo(
+                # Send the chart with the caption; identical renders reuse the file_id of their first upload
+                await MEDIA_REGISTRY.send(
+                    context.bot.send_photo, "photo", chart_image,
                     chat_id=update.effective_chat.id,
-                    photo=chart_image,
                     caption=caption,
                     parse_mode=ParseMode.HTML,
                     reply_markup=InlineKeyboardMarkup(keyboard)
@@ -3512,9 +3458,9 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                         logger.info("Trying to send chart with Markdown formatting")
                         markdown_caption = self._convert_html_to_markdown(caption)
                         
-                        await context.bot.send_photo(
+                        await MEDIA_REGISTRY.send(
+                            context.bot.send_photo, "photo", chart_image,
                             chat_id=update.effective_chat.id,
-                            photo=chart_image,
                             caption=markdown_caption,
                             parse_mode=ParseMode.MARKDOWN_V2,
                             reply_markup=InlineKeyboardMarkup(keyboard)
@@ -3532,9 +3478,9 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                             logger.info("Trying to send chart with plain text (no HTML)")
                             plain_text_caption = self._strip_all_html(caption)
                             
-                            await context.bot.send_photo(
+                            await MEDIA_REGISTRY.send(
+                                context.bot.send_photo, "photo", chart_image,
                                 chat_id=update.effective_chat.id,
-                                photo=chart_image,
                                 caption=plain_text_caption,
                                 parse_mode=None,  # No parsing, plain text
                                 reply_markup=InlineKeyboardMarkup(keyboard)
@@ -4456,31 +4402,20 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                 logger.warning(f"No subscribers found for {instrument}")
                 return []
                 
-            # Filter out subscribers that don't have an active subscription
-            active_subscribers = []
-            for subscriber in subscribers:
-                user_id = subscriber['user_id']
-                
-                # Check if user is subscribed
-                is_subscribed = await self.db.is_user_subscribed(user_id)
-                
-                # Check if payment has failed
-                payment_failed = await self.db.has_payment_failed(user_id)
-                
-                if is_subscribed and not payment_failed:
-                    active_subscribers.append(user_id)
-                else:
-                    logger.info(f"User {user_id} doesn't have an active subscription, skipping signal")
+            # Filter out subscribers that don't have an active subscription, in one bulk lookup
+            user_ids = [subscriber['user_id'] for subscriber in subscribers]
+            active_subscribers = await self.db.filter_active_subscribers(user_ids)
+            
+            skipped = len(set(user_ids)) - len(active_subscribers)
+            if skipped:
+                logger.info(f"{skipped} subscribers of {instrument} don't have an active subscription, skipping signal")
             
             return active_subscribers
             
         except Exception as e:
+            # Raised so the signal queue retries instead of delivering to admins only
             logger.error(f"Error getting subscribers: {str(e)}")
-            # FOR TESTING: Add admin users if available
-            if hasattr(self, 'admin_users') and self.admin_users:
-                logger.info(f"Returning admin users for testing: {self.admin_users}")
-                return self.admin_users
-            return []
+            raise
 
     async def process_signal(self, signal_data: Dict[str, Any]) -> bool:
         """
@@ -4491,177 +4426,340 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
         2. Custom format: instrument, direction, entry, stop_loss, take_profit, timeframe
         
         Returns:
-            bool: True if signal was processed successfully, False otherwise
+            bool: True if signal was processed successfully, False if it is invalid
+        
+        Raises:
+            Exception: When subscribers cannot be loaded or no recipient could be
+                reached, so the signal queue retries the delivery
         """
         try:
             # Log the incoming signal data
             logger.info(f"Processing signal: {signal_data}")
             
-            # Check which format we're dealing with and normalize it
-            instrument = signal_data.get('instrument')
-            
-            # Handle TradingView format (price, sl, interval)
-            if 'price' in signal_data and 'sl' in signal_data:
-                price = signal_data.get('price')
-                sl = signal_data.get('sl')
-                tp1 = signal_data.get('tp1')
-                tp2 = signal_data.get('tp2')
-                tp3 = signal_data.get('tp3')
-                interval = signal_data.get('interval', '1h')
-                
-                # Determine signal direction based on price and SL relationship
-                direction = "BUY" if float(sl) < float(price) else "SELL"
-                
-                # Create normalized signal data
-                normalized_data = {
-                    'instrument': instrument,
-                    'direction': direction,
-                    'entry': price,
-                    'stop_loss': sl,
-                    'take_profit': tp1,  # Use first take profit level
-                    'timeframe': interval
-                }
-                
-                # Add optional fields if present
-                normalized_data['tp1'] = tp1
-                normalized_data['tp2'] = tp2
-                normalized_data['tp3'] = tp3
-            
-            # Handle custom format (direction, entry, stop_loss, timeframe)
-            elif 'direction' in signal_data and 'entry' in signal_data:
-                direction = signal_data.get('direction')
-                entry = signal_data.get('entry')
-                stop_loss = signal_data.get('stop_loss')
-                take_profit = signal_data.get('take_profit')
-                timeframe = signal_data.get('timeframe', '1h')
-                
-                # Create normalized signal data
-                normalized_data = {
-                    'instrument': instrument,
-                    'direction': direction,
-                    'entry': entry,
-                    'stop_loss': stop_loss,
-                    'take_profit': take_profit,
-                    'timeframe': timeframe
-                }
-            else:
-                logger.error(f"Missing required signal data")
+            try:
+                normalized_data = self._normalize_signal(signal_data)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Invalid signal {signal_data}: {str(e)}")
                 return False
-            
-            # Basic validation
-            if not normalized_data.get('instrument') or not normalized_data.get('direction') or not normalized_data.get('entry'):
-                logger.error(f"Missing required fields in normalized signal data: {normalized_data}")
+            if not normalized_data:
                 return False
-                
-            # Create signal ID for tracking
-            signal_id = f"{normalized_data['instrument']}_{normalized_data['direction']}_{normalized_data['timeframe']}_{int(time.time())}"
+            instrument = normalized_data['instrument']
+            signal_id = normalized_data['id']
             
-            # Format the signal message
-            message = self._format_signal_message(normalized_data)
-            
-            # Determine market type for the instrument
-            market_type = _detect_market(instrument)
-            
-            # Store the full signal data for reference
-            normalized_data['id'] = signal_id
-            normalized_data['timestamp'] = datetime.now().isoformat()
-            normalized_data['message'] = message
-            normalized_data['market'] = market_type
-            
-            # Save signal for history tracking
-            if not os.path.exists(self.signals_dir):
-                os.makedirs(self.signals_dir, exist_ok=True)
-                
-            # Save to signals directory
-            with open(f"{self.signals_dir}/{signal_id}.json", 'w') as f:
-                json.dump(normalized_data, f)
-            
-            # FOR TESTING: Always send to admin for testing
-            if hasattr(self, 'admin_users') and self.admin_users:
-                try:
-                    logger.info(f"Sending signal to admin users for testing: {self.admin_users}")
-                    for admin_id in self.admin_users:
-                        # Prepare keyboard with analysis options
-                        keyboard = [
-                            [InlineKeyboardButton("🔍 Analyze Market", callback_data=f"analyze_from_signal_{instrument}_{signal_id}")]
-                        ]
-                        
-                        # Send the signal
-                        await self.bot.send_message(
-                            chat_id=admin_id,
-                            text=message,
-                            parse_mode=ParseMode.HTML,
-                            reply_markup=InlineKeyboardMarkup(keyboard)
-                        )
-                        logger.info(f"Test signal sent to admin {admin_id}")
-                        
-                        # Store signal reference for quick access
-                        if not hasattr(self, 'user_signals'):
-                            self.user_signals = {}
-                            
-                        admin_str_id = str(admin_id)
-                        if admin_str_id not in self.user_signals:
-                            self.user_signals[admin_str_id] = {}
-                        
-                        self.user_signals[admin_str_id][signal_id] = normalized_data
-                        
-                        # IMPROVED: Save user-specific signal
-                        self._save_user_signal(admin_str_id, signal_id, normalized_data)
-                except Exception as e:
-                    logger.error(f"Error sending test signal to admin: {str(e)}")
+            # Save signal for history tracking, once for all recipients
+            self.signal_log.append(normalized_data)
+            self.chart_prerenderer.note_signal(instrument, normalized_data.get('timeframe'))
             
             # Get subscribers for this instrument
             timeframe = normalized_data.get('timeframe', '1h')
             subscribers = await self.get_subscribers_for_instrument(instrument, timeframe)
             
-            if not subscribers:
+            # FOR TESTING: Always send to admin for testing
+            recipients = list(self.admin_users) if hasattr(self, 'admin_users') and self.admin_users else []
+            recipients.extend(subscribers or [])
+            
+            if not recipients:
                 logger.warning(f"No subscribers found for {instrument}")
                 return True  # Successfully processed, just no subscribers
             
             # Send signal to all subscribers
-            logger.info(f"Sending signal {signal_id} to {len(subscribers)} subscribers")
+            logger.info(f"Sending signal {signal_id} to {len(recipients)} recipients")
             
-            sent_count = 0
-            for user_id in subscribers:
-                try:
-                    # Prepare keyboard with analysis options
-                    keyboard = [
-                        [InlineKeyboardButton("🔍 Analyze Market", callback_data=f"analyze_from_signal_{instrument}_{signal_id}")]
-                    ]
-                    
-                    # Send the signal
-                    await self.bot.send_message(
-                        chat_id=user_id,
-                        text=message,
-                        parse_mode=ParseMode.HTML,
-                        reply_markup=InlineKeyboardMarkup(keyboard)
-                    )
-                    
-                    sent_count += 1
-                    
-                    # Store signal reference for quick access
-                    if not hasattr(self, 'user_signals'):
-                        self.user_signals = {}
-                        
-                    user_str_id = str(user_id)
-                    if user_str_id not in self.user_signals:
-                        self.user_signals[user_str_id] = {}
-                    
-                    self.user_signals[user_str_id][signal_id] = normalized_data
-                    
-                    # IMPROVED: Save user-specific signal
-                    self._save_user_signal(user_str_id, signal_id, normalized_data)
-                    
-                except Exception as e:
-                    logger.error(f"Error sending signal to user {user_id}: {str(e)}")
+            # One shared record; recipients only keep a reference to it
+            self.signal_cache.put(normalized_data)
             
-            logger.info(f"Successfully sent signal {signal_id} to {sent_count}/{len(subscribers)} subscribers")
+            if self.signal_digest.enabled:
+                # Sent together with other signals arriving within the window. The queue
+                # acks it once buffered, so digest mode does not redeliver after a crash
+                self.signal_digest.add(normalized_data, recipients)
+                logger.info(f"Buffered signal {signal_id} for a digest to {len(recipients)} recipients")
+                return True
+            
+            # Every recipient gets the same message and analysis keyboard
+            send_kwargs = self._signal_send_kwargs(normalized_data)
+            
+            def remember_signal(user_id):
+                # Store signal reference for quick access
+                self.signal_cache.add_user(user_id, signal_id)
+            
+            stats = await self.signal_fanout.broadcast(
+                recipients,
+                lambda user_id: send_kwargs,
+                on_sent=remember_signal,
+                label=signal_id
+            )
+            
+            # Persist which users received the signal in a single write
+            self.signal_log.add_members(signal_id, stats['sent_chat_ids'])
+            
+            if stats['failed'] and not stats['sent']:
+                # Nobody got the signal, so a retry cannot send duplicates
+                raise RuntimeError(f"Signal {signal_id} could not be sent to any of {stats['recipients']} recipients")
+            
+            logger.info(f"Successfully sent signal {signal_id} to {stats['sent']}/{stats['recipients']} recipients "
+                        f"in {stats['duration_seconds']}s ({stats['messages_per_second']} msg/s)")
             return True
             
         except Exception as e:
             logger.error(f"Error processing signal: {str(e)}")
             logger.exception(e)
-            return False
+            raise
+
+    async def process_signal_batch(self, signals: List[Dict[str, Any]]) -> bool:
+        """
+        Process several signals at once, e.g. all alerts emitted at one candle close
+        
+        Signals are normalized in one pass, subscribers are resolved once per
+        instrument and timeframe, and all messages go out in a single fan-out.
+        
+        Returns:
+            bool: True if at least one signal was processed, False if none is valid
+        
+        Raises:
+            Exception: When subscribers cannot be loaded or no message could be
+                sent, so the signal queue retries the delivery
+        """
+        try:
+            logger.info(f"Processing batch of {len(signals)} signals")
+            
+            batch = []
+            seen_ids = set()
+            for signal_data in signals:
+                try:
+                    normalized_data = self._normalize_signal(signal_data)
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Skipping invalid signal in batch {signal_data}: {str(e)}")
+                    continue
+                if not normalized_data:
+                    continue
+                
+                # Signal IDs have one-second resolution, keep them unique within the batch
+                base_id = normalized_data['id']
+                suffix = 1
+                while normalized_data['id'] in seen_ids:
+                    normalized_data['id'] = f"{base_id}_{suffix}"
+                    suffix += 1
+                seen_ids.add(normalized_data['id'])
+                batch.append(normalized_data)
+            
+            if not batch:
+                logger.error("No valid signals in batch")
+                return False
+            
+            # Save all signals for history tracking in one write
+            self.signal_log.append_many(batch)
+            for normalized_data in batch:
+                self.signal_cache.put(normalized_data)
+                self.chart_prerenderer.note_signal(normalized_data['instrument'], normalized_data.get('timeframe'))
+            
+            # Resolve subscribers once per instrument and timeframe
+            groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+            for normalized_data in batch:
+                key = (normalized_data['instrument'], normalized_data.get('timeframe', '1h'))
+                groups.setdefault(key, []).append(normalized_data)
+            
+            admins = list(self.admin_users) if hasattr(self, 'admin_users') and self.admin_users else []
+            messages = []
+            message_signal_ids = []
+            for (instrument, timeframe), group in groups.items():
+                subscribers = await self.get_subscribers_for_instrument(instrument, timeframe)
+                recipients = unique_chat_ids(admins + list(subscribers or []))
+                for normalized_data in group:
+                    send_kwargs = self._signal_send_kwargs(normalized_data)
+                    for user_id in recipients:
+                        messages.append((user_id, send_kwargs))
+                        message_signal_ids.append(normalized_data['id'])
+            
+            if not messages:
+                logger.warning(f"No subscribers found for batch of {len(batch)} signals")
+                return True
+            
+            delivered: Dict[str, List[Any]] = {}
+            
+            def remember_signal(index):
+                # Store signal reference for quick access
+                user_id, _ = messages[index]
+                signal_id = message_signal_ids[index]
+                self.signal_cache.add_user(user_id, signal_id)
+                delivered.setdefault(signal_id, []).append(user_id)
+            
+            stats = await self.signal_fanout.broadcast_messages(
+                messages,
+                on_sent=remember_signal,
+                label=f"batch of {len(batch)} signals"
+            )
+            
+            # Persist which users received each signal
+            for signal_id, user_ids in delivered.items():
+                self.signal_log.add_members(signal_id, user_ids)
+            
+            if stats['failed'] and not stats['sent']:
+                # Nobody got the signals, so a retry cannot send duplicates
+                raise RuntimeError(f"Batch of {len(batch)} signals could not be sent to any of {stats['recipients']} recipients")
+            
+            logger.info(f"Successfully sent {len(batch)} signals as {stats['sent']}/{stats['messages']} messages "
+                        f"to {stats['recipients']} recipients in {stats['duration_seconds']}s")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing signal batch: {str(e)}")
+            logger.exception(e)
+            raise
+
+    async def _send_signal_digests(self, pending: Dict[Any, List[Dict[str, Any]]]) -> None:
+        """Send the signals buffered during a digest window, one message per user where possible"""
+        MAX_MESSAGE_LENGTH = 4000  # Telegram message limit
+        
+        messages = []
+        message_signal_ids = []
+        built: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        for user_id, signals in pending.items():
+            # Split into as few digests as fit in a message
+            chunks = [[]]
+            for signal in signals:
+                if chunks[-1] and len(self._format_digest_message(chunks[-1] + [signal])) > MAX_MESSAGE_LENGTH:
+                    chunks.append([])
+                chunks[-1].append(signal)
+            
+            for chunk in chunks:
+                signal_ids = tuple(signal['id'] for signal in chunk)
+                # Users with the same signals share the same message
+                if signal_ids not in built:
+                    if len(chunk) == 1:
+                        built[signal_ids] = self._signal_send_kwargs(chunk[0])
+                    else:
+                        keyboard = [
+                            [InlineKeyboardButton(f"🔍 Analyze {signal['instrument']}", callback_data=f"analyze_from_signal_{signal['instrument']}_{signal['id']}")]
+                            for signal in chunk
+                        ]
+                        built[signal_ids] = {
+                            'text': self._format_digest_message(chunk),
+                            'parse_mode': ParseMode.HTML,
+                            'reply_markup': InlineKeyboardMarkup(keyboard)
+                        }
+                messages.append((user_id, built[signal_ids]))
+                message_signal_ids.append(signal_ids)
+        
+        delivered: Dict[str, List[Any]] = {}
+        
+        def remember_signals(index):
+            # Store signal references for quick access
+            user_id, _ = messages[index]
+            for signal_id in message_signal_ids[index]:
+                self.signal_cache.add_user(user_id, signal_id)
+                delivered.setdefault(signal_id, []).append(user_id)
+        
+        signal_count = len({signal_id for ids in message_signal_ids for signal_id in ids})
+        stats = await self.signal_fanout.broadcast_messages(
+            messages,
+            on_sent=remember_signals,
+            label=f"digest of {signal_count} signals"
+        )
+        
+        # Persist which users received each signal
+        for signal_id, user_ids in delivered.items():
+            self.signal_log.add_members(signal_id, user_ids)
+        
+        logger.info(f"Sent digest of {signal_count} signals as {stats['sent']}/{stats['messages']} messages "
+                    f"to {stats['recipients']} recipients")
+
+    def _format_digest_message(self, signals: List[Dict[str, Any]]) -> str:
+        """Combine several signals, each formatted by _format_signal_message, into one message"""
+        parts = [signal.get('message') or self._format_signal_message(signal) for signal in signals]
+        header = f"📬 <b>{len(signals)} new signals</b>"
+        return header + "\n\n" + "\n\n➖➖➖➖➖➖➖➖\n\n".join(parts)
+
+    def _normalize_signal(self, signal_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Normalize a TradingView or custom format signal and attach its ID, timestamp, message and market
+        
+        Returns:
+            The normalized signal data, or None if required fields are missing
+        """
+        # Check which format we're dealing with and normalize it
+        instrument = signal_data.get('instrument')
+        
+        # Handle TradingView format (price, sl, interval)
+        if 'price' in signal_data and 'sl' in signal_data:
+            price = signal_data.get('price')
+            sl = signal_data.get('sl')
+            tp1 = signal_data.get('tp1')
+            tp2 = signal_data.get('tp2')
+            tp3 = signal_data.get('tp3')
+            interval = signal_data.get('interval', '1h')
+            
+            # Determine signal direction based on price and SL relationship
+            direction = "BUY" if float(sl) < float(price) else "SELL"
+            
+            # Create normalized signal data
+            normalized_data = {
+                'instrument': instrument,
+                'direction': direction,
+                'entry': price,
+                'stop_loss': sl,
+                'take_profit': tp1,  # Use first take profit level
+                'timeframe': interval
+            }
+            
+            # Add optional fields if present
+            normalized_data['tp1'] = tp1
+            normalized_data['tp2'] = tp2
+            normalized_data['tp3'] = tp3
+        
+        # Handle custom format (direction, entry, stop_loss, timeframe)
+        elif 'direction' in signal_data and 'entry' in signal_data:
+            direction = signal_data.get('direction')
+            entry = signal_data.get('entry')
+            stop_loss = signal_data.get('stop_loss')
+            take_profit = signal_data.get('take_profit')
+            timeframe = signal_data.get('timeframe', '1h')
+            
+            # Create normalized signal data
+            normalized_data = {
+                'instrument': instrument,
+                'direction': direction,
+                'entry': entry,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit,
+                'timeframe': timeframe
+            }
+        else:
+            logger.error(f"Missing required signal data")
+            return None
+        
+        # Basic validation
+        if not normalized_data.get('instrument') or not normalized_data.get('direction') or not normalized_data.get('entry'):
+            logger.error(f"Missing required fields in normalized signal data: {normalized_data}")
+            return None
+            
+        # Create signal ID for tracking
+        signal_id = f"{normalized_data['instrument']}_{normalized_data['direction']}_{normalized_data['timeframe']}_{int(time.time())}"
+        
+        # Format the signal message
+        message = self._format_signal_message(normalized_data)
+        
+        # Determine market type for the instrument
+        market_type = _detect_market(instrument)
+        
+        # Store the full signal data for reference
+        normalized_data['id'] = signal_id
+        normalized_data['timestamp'] = datetime.now().isoformat()
+        normalized_data['message'] = message
+        normalized_data['market'] = market_type
+        
+        
+        return normalized_data
+
+    def _signal_send_kwargs(self, normalized_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the send_message arguments shared by every recipient of a signal"""
+        keyboard = [
+            [InlineKeyboardButton("🔍 Analyze Market", callback_data=f"analyze_from_signal_{normalized_data['instrument']}_{normalized_data['id']}")]
+        ]
+        return {
+            'text': normalized_data['message'],
+            'parse_mode': ParseMode.HTML,
+            'reply_markup': InlineKeyboardMarkup(keyboard)
+        }
 
     def _format_signal_message(self, signal_data: Dict[str, Any]) -> str:
         """Format signal data into a nice message for Telegram"""
@@ -4723,77 +4821,88 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
     def _save_user_signal(self, user_id: str, signal_id: str, signal_data: Dict[str, Any]) -> None:
         # Save a signal specifically for a user to ensure persistence
         try:
-            # Create user's signal directory if it doesn't exist
-            user_signal_dir = os.path.join(self.user_signals_dir, user_id)
-            os.makedirs(user_signal_dir, exist_ok=True)
-            
-            # Save the signal data to the user's directory
-            signal_path = os.path.join(user_signal_dir, f"{signal_id}.json")
-            with open(signal_path, 'w') as f:
-                json.dump(signal_data, f, indent=4)
-                
-            logger.info(f"Saved signal for user {user_id}: {signal_path}")
+            # The signal body is stored once in the signal log; the user only gets a reference
+            signal_data = dict(signal_data, id=signal_data.get('id', signal_id))
+            self.signal_log.append(signal_data, [user_id])
+            logger.info(f"Saved signal {signal_id} for user {user_id} in signal log")
         except Exception as e:
             logger.error(f"Error saving user signal: {str(e)}")
 
     async def _load_signals(self):
-        self.logger.info("Attempting to load signals from file system...")
-        self.user_signals = {}  # Initialize/clear existing
+        """Open the signal index; signal bodies are loaded lazily on first access"""
+        stats = self.signal_log.get_stats()
+        self.logger.info(f"Signal log ready: {stats['signals']} signals, {stats['memberships']} user references")
+        
+        # Signals saved as JSON files by older versions are imported once, off the startup path
+        if not os.path.exists(os.path.join(self.signal_log.log_dir, LEGACY_IMPORT_MARKER)):
+            loop = asyncio.get_running_loop()
+            self._legacy_import = loop.run_in_executor(None, self._import_legacy_signal_files)
+            self._legacy_import.add_done_callback(self._legacy_import_done)
+
+    def _legacy_import_done(self, future: asyncio.Future) -> None:
+        """Log a legacy signal import that failed as a whole"""
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Error importing legacy signal files: {future.exception()}")
 
-        # 1. Load from user-specific file storage
+    def _import_legacy_signal_files(self) -> None:
+        """Import per-user and central signal JSON files into the signal log"""
+        imported = 0
+        failed = 0
+        
+        def read_signal(file_path: str, signal_id: str) -> Optional[Dict[str, Any]]:
+            nonlocal failed
+            try:
+                with open(file_path, 'r') as f:
+                    signal_data = json.load(f)
+                return dict(signal_data, id=signal_data.get('id', signal_id))
+            except Exception as e:
+                failed += 1
+                self.logger.error(f"Error loading signal file {file_path}: {e}")
+                return None
+        
+        # 1. User-specific file storage
         if os.path.exists(self.user_signals_dir):
             for user_id_str in os.listdir(self.user_signals_dir):
                 user_dir_path = os.path.join(self.user_signals_dir, user_id_str)
-                if os.path.isdir(user_dir_path):
-                    if user_id_str not in self.user_signals:
-                        self.user_signals[user_id_str] = {}
-                    for filename in os.listdir(user_dir_path):
-                        if filename.endswith(".json"):
-                            signal_id = filename[:-5]  # Remove .json extension
-                            file_path = os.path.join(user_dir_path, filename)
-                            try:
-                                with open(file_path, 'r') as f:
-                                    signal_data = json.load(f)
-                                self.user_signals[user_id_str][signal_id] = signal_data
-                                self.logger.debug(f"Loaded signal {signal_id} for user {user_id_str} from {file_path}")
-                            except json.JSONDecodeError as jde:
-                                self.logger.error(f"JSONDecodeError loading signal file {file_path}: {jde}. File content might be corrupted or empty.")
-                            except Exception as e:
-                                self.logger.error(f"Error loading signal file {file_path}: {e}")
-        else:
-            self.logger.info(f"User signals directory not found: {self.user_signals_dir}. Skipping loading user-specific signals.")
-
-        # 2. Load from central file storage (as a fallback, primarily for admins or if not user-specific)
+                if not os.path.isdir(user_dir_path):
+                    continue
+                for filename in os.listdir(user_dir_path):
+                    if filename.endswith(".json"):
+                        signal_data = read_signal(os.path.join(user_dir_path, filename), filename[:-5])
+                        if signal_data:
+                            self.signal_log.append(signal_data, [user_id_str])
+                            imported += 1
+        
+        # 2. Central file storage, which was visible to admins
         if os.path.exists(self.signals_dir):
+            admin_ids = [str(admin_id) for admin_id in (getattr(self, 'admin_users', None) or [])]
             for filename in os.listdir(self.signals_dir):
                 if filename.endswith(".json"):
-                    signal_id = filename[:-5]  # Remove .json extension
-                    file_path = os.path.join(self.signals_dir, filename)
-                    try:
-                        with open(file_path, 'r') as f:
-                            signal_data = json.load(f)
-                        
-                        # Add to admin users if not already loaded for them from their specific directory
-                        # Also, could be a general fallback if a signal_id is requested and not found under a specific user.
-                        # For now, load them into admin users' signals, avoiding overwrite if already present.
-                        if hasattr(self, 'admin_users') and self.admin_users:
-                            for admin_id in self.admin_users:
-                                admin_str_id = str(admin_id)
-                                if admin_str_id not in self.user_signals:
-                                    self.user_signals[admin_str_id] = {}
-                                # Only add if this signal_id isn't already loaded for the admin
-                                # This prioritizes user-specific signals if they exist
-                                if signal_id not in self.user_signals[admin_str_id]:
-                                    self.user_signals[admin_str_id][signal_id] = signal_data
-                                    self.logger.debug(f"Loaded central signal {signal_id} from {file_path} for admin {admin_str_id}.")
-                    except json.JSONDecodeError as jde:
-                        self.logger.error(f"JSONDecodeError loading central signal file {file_path}: {jde}. File content might be corrupted or empty.")
-                    except Exception as e:
-                        self.logger.error(f"Error loading central signal file {file_path}: {e}")
-        else:
-            self.logger.info(f"Central signals directory not found: {self.signals_dir}. Skipping loading central signals.")
+                    signal_data = read_signal(os.path.join(self.signals_dir, filename), filename[:-5])
+                    if signal_data:
+                        self.signal_log.append(signal_data, admin_ids)
+                        imported += 1
+        
+        if failed:
+            # No marker, so the next start retries; signals already imported are skipped by ID
+            self.logger.warning(f"Imported {imported} legacy signal files, {failed} failed; retrying on next start")
+            return
         
-        self.logger.info(f"Signal loading from files complete. Total users with signals in memory: {len(self.user_signals)}")
+        with open(os.path.join(self.signal_log.log_dir, LEGACY_IMPORT_MARKER), 'w') as f:
+            f.write(datetime.now().isoformat())
+        self.logger.info(f"Imported {imported} legacy signal files into the signal log")
+
+    def _get_user_signal(self, user_id, signal_id: str) -> Optional[Dict[str, Any]]:
+        """Return a signal from memory, loading it from the signal log on first access"""
+        return self.signal_cache.get(signal_id, user_id)
+
+    def _get_latest_user_signal(self, user_id, instrument: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (signal_id, signal_data) of the newest signal a user received for an instrument"""
+        for signal_id in self.signal_log.get_user_signal_ids(user_id, instrument, limit=1):
+            signal_data = self._get_user_signal(user_id, signal_id)
+            if signal_data:
+                return signal_id, signal_data
+        return None
 
     async def back_signals_callback(self, update: Update, context=None) -> int:
         """Handle back_signals button press"""
@@ -5390,8 +5499,8 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             
             # Try to get additional signal data if available
             user_id = str(update.effective_user.id)
-            if signal_id and user_id in self.user_signals and signal_id in self.user_signals[user_id]:
-                signal_data = self.user_signals[user_id][signal_id]
+            signal_data = self._get_user_signal(user_id, signal_id) if signal_id else None
+            if signal_data:
                 
                 # Store direction and timeframe
                 if 'direction' in signal_data:
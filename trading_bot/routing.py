@@ -3,12 +3,52 @@ FastAPI route configuration for the trading bot
 This module registers all webhook routes for the bot to ensure all common webhook endpoints work.
 """
 
+import os
+import json
 import logging
+from typing import Any, Dict, List
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
+from trading_bot.services.signal_queue import get_signal_queue
+from trading_bot.services.signal_dedup import get_signal_deduplicator
+
 logger = logging.getLogger(__name__)
 
+# Largest number of signals accepted in one batch request
+MAX_BATCH_SIGNALS = int(os.getenv("SIGNAL_BATCH_MAX_ITEMS", 500))
+
+def parse_signal_batch(body: bytes) -> List[Dict[str, Any]]:
+    """
+    Parse a batch request body into a list of signals.
+    Accepts a JSON array, a single JSON object or newline-delimited JSON.
+    
+    Raises:
+        ValueError: If the body is not valid JSON or contains something other than objects
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    
+    try:
+        parsed = json.loads(text)
+        signals = parsed if isinstance(parsed, list) else [parsed]
+    except json.JSONDecodeError:
+        # Newline-delimited JSON, one signal per line
+        signals = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                signals.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+    
+    for index, signal in enumerate(signals):
+        if not isinstance(signal, dict):
+            raise ValueError(f"Signal {index} is not a JSON object")
+    return signals
+
 def register_webhook_routes(app: FastAPI):
     """
     Register all webhook routes to the FastAPI app
@@ -48,4 +88,55 @@ def register_webhook_routes(app: FastAPI):
         from trading_bot.app import receive_signal
         return await receive_signal(request)
     
+    @app.post("/signal/batch")
+    async def signal_batch_endpoint(request: Request):
+        """Batch endpoint accepting a JSON array or newline-delimited JSON of trading signals"""
+        try:
+            signals = parse_signal_batch(await request.body())
+        except ValueError as e:
+            logger.error(f"Invalid signal batch: {str(e)}")
+            return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+        
+        if not signals:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Empty signal batch"})
+        if len(signals) > MAX_BATCH_SIGNALS:
+            return JSONResponse(
+                status_code=413,
+                content={"status": "error", "message": f"Batch exceeds {MAX_BATCH_SIGNALS} signals"}
+            )
+        
+        # Drop alerts that were already received, individually or in an earlier batch
+        deduplicator = await get_signal_deduplicator()
+        accepted = []
+        fingerprints = []
+        for signal, (is_duplicate, fingerprint) in zip(signals, await deduplicator.check_many(signals)):
+            if not is_duplicate:
+                accepted.append(signal)
+                fingerprints.append(fingerprint)
+        duplicates = len(signals) - len(accepted)
+        
+        if not accepted:
+            return {"status": "duplicate", "message": "All signals already received, not processed again",
+                    "duplicates": duplicates}
+        
+        # The whole batch is one queue item so it is delivered as one combined fan-out
+        try:
+            queue_id = await get_signal_queue().enqueue_async(accepted)
+        except Exception as e:
+            await deduplicator.forget(*fingerprints)
+            logger.error(f"Error queueing signal batch: {str(e)}")
+            return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+        
+        logger.info(f"Queued batch of {len(accepted)} signals with queue ID {queue_id} ({duplicates} duplicates)")
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "accepted",
+                "message": f"{len(accepted)} signals queued for delivery",
+                "accepted": len(accepted),
+                "duplicates": duplicates,
+                "queue_id": queue_id
+            }
+        )
+    
     logger.info("Additional webhook routes registered successfully") 
\ No newline at end of file
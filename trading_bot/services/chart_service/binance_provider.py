@@ -14,6 +14,9 @@ import numpy as np
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 
+from trading_bot.utils.instrument_registry import INSTRUMENTS
+from trading_bot.utils.timeframes import provider_interval
+
 logger = logging.getLogger(__name__)
 
 class BinanceProvider:
@@ -97,18 +100,7 @@ class BinanceProvider:
             logger.info(f"Fetching {formatted_symbol} data from Binance Vision Data API: {data_endpoint_url}. API call #{BinanceProvider._api_call_count} this minute.")
             
             # Map timeframe to Binance interval
-            binance_interval = {
-                "1m": "1m", 
-                "5m": "5m", 
-                "15m": "15m", 
-                "30m": "30m",
-                "1h": "1h", 
-                "2h": "2h", 
-                "4h": "4h", 
-                "1d": "1d",
-                "1w": "1w",
-                "1M": "1M"
-            }.get(timeframe, "1h")
+            binance_interval = provider_interval(timeframe, "binance")
             
             limit = 120 # Always get enough data for indicators
                 
@@ -381,24 +373,7 @@ class BinanceProvider:
     @staticmethod
     def _format_symbol(instrument: str) -> str:
         """Format instrument symbol for Binance API"""
-        logger.info(f"[Binance] Formatting symbol: {instrument}")
-        
-        # Ensure uppercase and remove slashes
-        instrument = instrument.upper().replace("/", "")
-        
-        # Make sure crypto symbols end with USDT for Binance
-        if instrument.endswith("USD") and not instrument.endswith("USDT"):
-            instrument = instrument.replace("USD", "USDT")
-            logger.info(f"[Binance] Converted USD to USDT: {instrument}")
-        
-        # Handle common crypto symbols without USD suffix (e.g., BTC -> BTCUSDT)
-        common_crypto_symbols = ["BTC", "ETH", "XRP", "DOT", "ADA", "SOL", "DOGE", "AVAX", "MATIC"]
-        if instrument in common_crypto_symbols:
-            instrument = f"{instrument}USDT"
-            logger.info(f"[Binance] Added USDT suffix to common crypto: {instrument}")
-        
-        logger.info(f"[Binance] Final formatted symbol: {instrument}")
-        return instrument
+        return INSTRUMENTS.binance_symbol(instrument)
     
     @staticmethod
     async def create_order(symbol: str, side: str, order_type: str, quantity: float, price: float = None, 
@@ -0,0 +1,244 @@
+"""
+Long-lived Chromium with pre-authenticated, reusable pages for TradingView screenshots
+"""
+
+import os
+import time
+import asyncio
+import logging
+import contextlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_USES = 50
+DEFAULT_HEALTH_CHECK_SECONDS = 60
+DEFAULT_ACQUIRE_TIMEOUT = 30
+BROWSER_ARGS = ['--no-sandbox', '--disable-dev-shm-usage']
+VIEWPORT = {"width": 1280, "height": 800}
+
+
+class BrowserSlot:
+    """One browser context with its page, handed out to a single capture at a time"""
+
+    __slots__ = ("index", "context", "page", "uses", "last_used", "generation")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.context = None
+        self.page = None
+        self.uses = 0
+        self.last_used = 0.0
+        self.generation = 0
+
+
+class BrowserPool:
+    """
+    Pool of Playwright pages in one persistent Chromium process.
+
+    Every page lives in its own context that already carries the TradingView
+    `sessionid` cookie, so a capture only pays for navigation and rendering.
+    A page is recycled (new context and page) after `max_uses` captures or
+    when a capture fails, idle pages are probed before reuse, and the browser
+    is relaunched when it has disconnected.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_uses: Optional[int] = None,
+                 session_id: Optional[str] = None):
+        """
+        Initialize the pool; the browser is launched on first use or by start().
+
+        Args:
+            size: Number of concurrently usable pages
+            max_uses: Captures after which a page and its context are replaced
+            session_id: TradingView session cookie, defaults to TRADINGVIEW_SESSION_ID
+        """
+        self.size = max(1, int(size or os.getenv("CHART_BROWSER_POOL_SIZE", DEFAULT_POOL_SIZE)))
+        self.max_uses = max(1, int(max_uses or os.getenv("CHART_BROWSER_MAX_USES", DEFAULT_MAX_USES)))
+        self.health_check_seconds = float(os.getenv("CHART_BROWSER_HEALTH_SECONDS", DEFAULT_HEALTH_CHECK_SECONDS))
+        self.acquire_timeout = float(os.getenv("CHART_BROWSER_ACQUIRE_TIMEOUT", DEFAULT_ACQUIRE_TIMEOUT))
+        self.session_id = session_id if session_id is not None else os.environ.get('TRADINGVIEW_SESSION_ID', '')
+
+        self._playwright = None
+        self._browser = None
+        self._generation = 0
+        self._slots: List[BrowserSlot] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._lock = asyncio.Lock()
+        self._closed = False
+        self._unavailable = False
+        self.stats = {"launches": 0, "recycles": 0, "captures": 0, "failures": 0,
+                      "health_failures": 0, "wait_seconds": 0.0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self) -> bool:
+        """Launch the browser and prepare all pages; returns False when Playwright is unavailable"""
+        async with self._lock:
+            if self.is_running:
+                return True
+            try:
+                await self._launch()
+                return True
+            except ImportError as e:
+                self._unavailable = True
+                logger.error(f"Failed to import playwright: {str(e)}.")
+            except Exception as e:
+                logger.error(f"Failed to start browser pool: {str(e)}")
+            await self._shutdown()
+            return False
+
+    async def _launch(self) -> None:
+        from playwright.async_api import async_playwright
+
+        await self._shutdown()
+        self._closed = False
+        started = time.perf_counter()
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        self._generation += 1
+        self.stats["launches"] += 1
+
+        self._slots = [BrowserSlot(i) for i in range(self.size)]
+        # Keep the queue itself so captures already waiting receive the new pages
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for slot in self._slots:
+            await self._open(slot)
+            self._idle.put_nowait(slot)
+        if not self.session_id:
+            logger.warning("No TradingView session ID found in environment variables")
+        logger.info(f"Browser pool started with {self.size} pages in {time.perf_counter() - started:.2f}s")
+
+    async def _open(self, slot: BrowserSlot) -> None:
+        """Give a slot a fresh authenticated context and page"""
+        slot.context = await self._browser.new_context(viewport=VIEWPORT, device_scale_factor=1)
+        if self.session_id:
+            await slot.context.add_cookies([{
+                "name": "sessionid",
+                "value": self.session_id,
+                "domain": ".tradingview.com",
+                "path": "/",
+            }])
+        slot.page = await slot.context.new_page()
+        slot.uses = 0
+        slot.last_used = time.time()
+        slot.generation = self._generation
+
+    async def _close_slot(self, slot: BrowserSlot) -> None:
+        if slot.context is not None:
+            with contextlib.suppress(Exception):
+                await slot.context.close()
+        slot.context = slot.page = None
+
+    async def _recycle(self, slot: BrowserSlot) -> None:
+        await self._close_slot(slot)
+        self.stats["recycles"] += 1
+        await self._open(slot)
+
+    async def _healthy(self, slot: BrowserSlot) -> bool:
+        """Cheap checks for every use, plus a round trip into pages idle for longer than the check interval"""
+        if slot.generation != self._generation or slot.page is None or slot.page.is_closed():
+            return False
+        if time.time() - slot.last_used < self.health_check_seconds:
+            return True
+        try:
+            await asyncio.wait_for(slot.page.evaluate("1"), timeout=5)
+            return True
+        except Exception as e:
+            logger.warning(f"Browser page {slot.index} failed its health check: {str(e)}")
+            return False
+
+    async def _ensure_running(self) -> None:
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        if self._unavailable:
+            raise RuntimeError("Playwright is not installed")
+        if self.is_running:
+            return
+        async with self._lock:
+            if not self.is_running:
+                if self._browser is not None:
+                    logger.warning("Browser disconnected, relaunching")
+                try:
+                    await self._launch()
+                except ImportError:
+                    self._unavailable = True
+                    raise RuntimeError("Playwright is not installed")
+
+    @contextlib.asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """
+        Borrow an authenticated page for one capture.
+
+        Waits up to the acquire timeout when all pages are busy. A capture
+        that raises marks its page for replacement.
+        """
+        await self._ensure_running()
+        waited = time.perf_counter()
+        slot = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        self.stats["wait_seconds"] += time.perf_counter() - waited
+
+        failed = False
+        try:
+            if not self.is_running:
+                raise RuntimeError("Browser disconnected")
+            if not await self._healthy(slot):
+                self.stats["health_failures"] += 1
+                await self._recycle(slot)
+            yield slot.page
+        except BaseException:
+            failed = True
+            self.stats["failures"] += 1
+            raise
+        finally:
+            await self._release(slot, failed)
+
+    async def _release(self, slot: BrowserSlot, failed: bool) -> None:
+        slot.uses += 1
+        slot.last_used = time.time()
+        self.stats["captures"] += 1
+        try:
+            if self.is_running and slot.generation == self._generation and (failed or slot.uses >= self.max_uses):
+                await self._recycle(slot)
+        except Exception as e:
+            logger.error(f"Failed to recycle browser page {slot.index}: {str(e)}")
+        finally:
+            # Slots of a browser that has since been relaunched were replaced and are dropped
+            if self._idle is not None and slot in self._slots:
+                self._idle.put_nowait(slot)
+
+    async def _shutdown(self) -> None:
+        for slot in self._slots:
+            await self._close_slot(slot)
+        if self._browser is not None:
+            with contextlib.suppress(Exception):
+                await self._browser.close()
+        if self._playwright is not None:
+            with contextlib.suppress(Exception):
+                await self._playwright.stop()
+        self._browser = self._playwright = None
+
+    async def close(self) -> None:
+        """Close all pages and the browser"""
+        async with self._lock:
+            self._closed = True
+            await self._shutdown()
+            logger.info("Browser pool closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool counters"""
+        stats = dict(self.stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats.update({
+            "running": self.is_running,
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "max_uses": self.max_uses,
+        })
+        return stats
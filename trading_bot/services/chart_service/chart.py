@@ -36,9 +36,15 @@ except ImportError:
 # Import base class en providers
 from trading_bot.services.chart_service.base import TradingViewService
 from trading_bot.services.chart_service.binance_provider import BinanceProvider
+from trading_bot.services.chart_service.browser_pool import BrowserPool
+from trading_bot.services.chart_service.disk_cache import DiskChartCache
+from trading_bot.utils.instrument_registry import INSTRUMENTS
+from trading_bot.utils.timeframes import candle_start, provider_interval
+from trading_bot.utils.single_flight import SingleFlight
 # Remove Yahoo Finance imports and dependencies - Yahoo Finance is no longer used
 DIRECT_MARKET_AVAILABLE = False
 from trading_bot.services.chart_service.tradingview_provider import TradingViewProvider
+from trading_bot.utils.bounded_cache import BoundedCache
 
 # Import other utilities
 try:
@@ -84,14 +90,23 @@ class ChartService:
             # self.last_yahoo_request = 0
             
             # Initialize caches
-            self.chart_cache = {}
             self.chart_cache_ttl = 60 * 5  # 5 minutes in seconds
-            self.analysis_cache = {}
+            # Shared on disk with the other local processes, keyed per candle
+            self.chart_cache = DiskChartCache(ttl=self.chart_cache_ttl, name="chart_cache")
             self.analysis_cache_ttl = 60 * 15  # 15 minutes in seconds
+            self.analysis_cache = BoundedCache(max_items=500, ttl=self.analysis_cache_ttl, name="analysis_cache")
+            
+            # Concurrent requests for the same chart or analysis share one execution
+            self.chart_flight = SingleFlight("chart")
+            self.analysis_flight = SingleFlight("analysis")
             
             # Initialize browser service reference
             self.browser_service = None
             
+            # Persistent Chromium for TradingView screenshots, launched by initialize() or on first use
+            self.browser_pool = BrowserPool()
+            self._browser_warmup = None
+            
             # Initialize chart_providers list with TradingView first
             self.chart_providers = [TradingViewProvider()]  # TradingView als primaire data bron
             
@@ -106,69 +121,7 @@ class ChartService:
                     pass
                 
             # Initialiseer de chart links met de specifieke TradingView links
-            self.chart_links = {
-                # Commodities
-                "XAUUSD": "https://www.tradingview.com/chart/bylCuCgc/",
-                "XTIUSD": "https://www.tradingview.com/chart/PWcfBU0O/",  # Nieuwe link voor Oil
-                "USOIL": "https://www.tradingview.com/chart/PWcfBU0O/",  # Nieuwe link voor Oil
-                "XAGUSD": "https://www.tradingview.com/chart/PWcfBU0O/",  # Nieuwe link voor Silver
-                
-                # Currencies
-                "EURUSD": "https://www.tradingview.com/chart/zmsuvPgj/",  # Bijgewerkte link voor EURUSD
-                "EURGBP": "https://www.tradingview.com/chart/xt6LdUUi/",
-                "EURCHF": "https://www.tradingview.com/chart/4Jr8hVba/",
-                "EURJPY": "https://www.tradingview.com/chart/ume7H7lm/",
-                "EURCAD": "https://www.tradingview.com/chart/gbtrKFPk/",
-                "EURAUD": "https://www.tradingview.com/chart/WweOZl7z/",
-                "EURNZD": "https://www.tradingview.com/chart/bcrCHPsz/",
-                "GBPUSD": "https://www.tradingview.com/chart/jKph5b1W/",
-                "GBPCHF": "https://www.tradingview.com/chart/1qMsl4FS/",
-                "GBPJPY": "https://www.tradingview.com/chart/Zcmh5M2k/",
-                "GBPCAD": "https://www.tradingview.com/chart/CvwpPBpF/",
-                "GBPAUD": "https://www.tradingview.com/chart/neo3Fc3j/",
-                "GBPNZD": "https://www.tradingview.com/chart/egeCqr65/",
-                "CHFJPY": "https://www.tradingview.com/chart/g7qBPaqM/",
-                "USDJPY": "https://www.tradingview.com/chart/mcWuRDQv/",
-                "USDCHF": "https://www.tradingview.com/chart/e7xDgRyM/",
-                "USDCAD": "https://www.tradingview.com/chart/jjTOeBNM/",
-                "CADJPY": "https://www.tradingview.com/chart/KNsPbDME/",
-                "CADCHF": "https://www.tradingview.com/chart/XnHRKk5I/",
-                "AUDUSD": "https://www.tradingview.com/chart/h7CHetVW/",
-                "AUDCHF": "https://www.tradingview.com/chart/oooBW6HP/",
-                "AUDJPY": "https://www.tradingview.com/chart/sYiGgj7B/",
-                "AUDNZD": "https://www.tradingview.com/chart/AByyHLB4/",
-                "AUDCAD": "https://www.tradingview.com/chart/L4992qKp/",
-                "NDZUSD": "https://www.tradingview.com/chart/yab05IFU/",
-                "NZDCHF": "https://www.tradingview.com/chart/7epTugqA/",
-                "NZDJPY": "https://www.tradingview.com/chart/fdtQ7rx7/",
-                "NZDCAD": "https://www.tradingview.com/chart/mRVtXs19/",
-                
-                # Cryptocurrencies
-                "BTCUSD": "https://www.tradingview.com/chart/NWT8AI4a/",
-                "ETHUSD": "https://www.tradingview.com/chart/rVh10RLj/",
-                "XRPUSD": "https://www.tradingview.com/chart/tQu9Ca4E/",
-                "SOLUSD": "https://www.tradingview.com/chart/oTTmSjzQ/",
-                "BNBUSD": "https://www.tradingview.com/chart/wNBWNh23/",
-                "ADAUSD": "https://www.tradingview.com/chart/WcBNFrdb/",
-                "LTCUSD": "https://www.tradingview.com/chart/AoDblBMt/",
-                "DOGUSD": "https://www.tradingview.com/chart/F6SPb52v/",
-                "DOTUSD": "https://www.tradingview.com/chart/nT9dwAx2/",
-                "LNKUSD": "https://www.tradingview.com/chart/FzOrtgYw/",
-                "XLMUSD": "https://www.tradingview.com/chart/SnvxOhDh/",
-                "AVXUSD": "https://www.tradingview.com/chart/LfTlCrdQ/",
-                
-                # Indices
-                "AU200": "https://www.tradingview.com/chart/U5CKagMM/",
-                "EU50": "https://www.tradingview.com/chart/tt5QejVd/",
-                "FR40": "https://www.tradingview.com/chart/RoPe3S1Q/",
-                "HK50": "https://www.tradingview.com/chart/Rllftdyl/",
-                "JP225": "https://www.tradingview.com/chart/i562Fk6X/",
-                "UK100": "https://www.tradingview.com/chart/0I4gguQa/",
-                "US100": "https://www.tradingview.com/chart/5d36Cany/",
-                "US500": "https://www.tradingview.com/chart/VsfYHrwP/",
-                "US30": "https://www.tradingview.com/chart/heV5Zitn/",
-                "DE40": "https://www.tradingview.com/chart/OWzg0XNw/",
-            }
+            self.chart_links = INSTRUMENTS.chart_links()
             
             # Log initialization with available providers
             if DIRECT_MARKET_AVAILABLE:
@@ -180,7 +133,48 @@ class ChartService:
             raise
 
     async def get_chart(self, instrument: str, timeframe: str = "1h", fullscreen: bool = False) -> bytes:
-        """Get a chart for a specific instrument and timeframe."""
+        """Get a chart for a specific instrument and timeframe; concurrent requests share one render."""
+        cache_key = self._chart_cache_key(self._normalize_instrument_name(instrument), timeframe, fullscreen)
+        cached_chart = await self._cached_chart(cache_key)
+        if cached_chart is not None:
+            return cached_chart
+        return await self.chart_flight.do(cache_key, self._get_chart, instrument, timeframe, fullscreen)
+
+    @staticmethod
+    def _chart_cache_key(instrument: str, timeframe: str, fullscreen: bool) -> str:
+        """Cache key of a chart; a new candle never reuses the chart of the previous one"""
+        return f"{instrument}_{timeframe}_{fullscreen}_{int(candle_start(timeframe))}"
+
+    async def _cached_chart(self, cache_key: str) -> Optional[bytes]:
+        """Read a chart from the disk cache in an executor, keeping SQLite and file I/O off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.chart_cache.get, cache_key)
+
+    async def _cache_chart(self, cache_key: str, chart: bytes, ttl: Optional[float] = None) -> None:
+        """Write a chart to the disk cache in an executor"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.chart_cache.set(cache_key, chart, ttl=ttl))
+
+    async def prerender_chart(self, instrument: str, timeframe: str = "1h", fullscreen: bool = False,
+                              ttl: Optional[float] = None) -> bool:
+        """
+        Render a chart ahead of demand, replacing any cached version.
+        
+        Args:
+            instrument: Instrument symbol
+            timeframe: Chart timeframe
+            fullscreen: Fullscreen variant
+            ttl: Seconds to keep the chart cached, instead of chart_cache_ttl
+            
+        Returns:
+            bool: Whether a chart is now cached (emergency charts are never cached)
+        """
+        cache_key = self._chart_cache_key(self._normalize_instrument_name(instrument), timeframe, fullscreen)
+        await self.chart_flight.do(cache_key, self._get_chart, instrument, timeframe, fullscreen, True, ttl)
+        return await asyncio.get_running_loop().run_in_executor(None, self.chart_cache.__contains__, cache_key)
+
+    async def _get_chart(self, instrument: str, timeframe: str = "1h", fullscreen: bool = False,
+                         refresh: bool = False, ttl: Optional[float] = None) -> bytes:
+        """Render or fetch a chart, filling the chart cache; `refresh` skips the cached version"""
         start_time = time.time()
         logger.info(f"🔍 Getting chart for {instrument} with timeframe {timeframe}")
         
@@ -191,13 +185,11 @@ class ChartService:
             logger.info(f"Normalized instrument name from {orig_instrument} to {instrument}")
             
             # Controleer of we een gecachede versie hebben
-            cache_key = f"{instrument}_{timeframe}_{fullscreen}"
-            if cache_key in self.chart_cache:
-                cache_time, cached_chart = self.chart_cache[cache_key]
-                # Gebruik de cache alleen als deze nog geldig is
-                if time.time() - cache_time < self.chart_cache_ttl:
-                    logger.info(f"Using cached chart for {instrument}")
-                    return cached_chart
+            cache_key = self._chart_cache_key(instrument, timeframe, fullscreen)
+            cached_chart = None if refresh else await self._cached_chart(cache_key)
+            if cached_chart is not None:
+                logger.info(f"Using cached chart for {instrument}")
+                return cached_chart
             
             # Detecteer het markttype
             market_type = await self._detect_market_type(instrument)
@@ -217,7 +209,7 @@ class ChartService:
                     if screenshot_bytes:
                         logger.info(f"Successfully captured TradingView screenshot for {instrument}")
                         # Cache the chart
-                        self.chart_cache[cache_key] = (time.time(), screenshot_bytes)
+                        await self._cache_chart(cache_key, screenshot_bytes, ttl=ttl)
                         return screenshot_bytes
                     else:
                         logger.warning(f"TradingView screenshot capture failed for {instrument}")
@@ -240,7 +232,7 @@ class ChartService:
                                 chart_bytes = self._generate_custom_chart(market_data, instrument, timeframe, fullscreen)
                                 if chart_bytes:
                                     # Cache the chart
-                                    self.chart_cache[cache_key] = (time.time(), chart_bytes)
+                                    await self._cache_chart(cache_key, chart_bytes, ttl=ttl)
                                     return chart_bytes
                         except Exception as e:
                             logger.error(f"Error generating chart from Binance data: {str(e)}")
@@ -317,10 +309,14 @@ class ChartService:
                 
             return b''
 
+    def get_flight_stats(self) -> Dict[str, Any]:
+        """Return how many chart and analysis requests were coalesced"""
+        return {"chart": self.chart_flight.get_stats(), "analysis": self.analysis_flight.get_stats()}
+
     async def cleanup(self):
         """Clean up resources"""
         try:
-            # Er zijn nu geen specifieke resources meer om op te schonen
+            await self.browser_pool.close()
             logger.info("Chart service resources cleaned up")
         except Exception as e:
             logger.error(f"Error cleaning up chart service: {str(e)}")
@@ -383,14 +379,17 @@ class ChartService:
                 # Set browser_service to True to enable TradingView screenshots
                 # This will allow the screenshot code path to be executed
                 self.browser_service = True
+                # Warm the browser pool in the background so startup is not delayed
+                if self._browser_warmup is None:
+                    self._browser_warmup = asyncio.create_task(self.browser_pool.start())
                 logger.info("Browser service initialized for chart screenshots")
             except Exception as browser_e:
                 logger.error(f"Failed to initialize browser service: {str(browser_e)}")
                 self.browser_service = None
             
             # Initialize technical analysis cache
-            self.analysis_cache = {}
             self.analysis_cache_ttl = 60 * 15  # 15 minutes in seconds
+            self.analysis_cache = BoundedCache(max_items=500, ttl=self.analysis_cache_ttl, name="analysis_cache")
             
             # Always return True to allow the bot to continue starting
             logger.info("Chart service initialization completed")
@@ -490,126 +489,68 @@ class ChartService:
             return b''
 
     async def _capture_tradingview_screenshot(self, url: str, instrument: str) -> Optional[bytes]:
-        """Capture screenshot of TradingView chart using Playwright"""
+        """Capture screenshot of TradingView chart using a page of the persistent browser pool"""
         start_time = time.time()
         screenshot_bytes = None
         
         try:
             logger.info(f"Capturing TradingView screenshot for {instrument} from {url}")
             
-            # Import playwright
-            try:
-                import playwright
-                from playwright.async_api import async_playwright
-            except ImportError as import_e:
-                logger.error(f"Failed to import playwright: {str(import_e)}.")
-                return None
+            # Borrow a pre-authenticated page from the persistent browser
+            async with self.browser_pool.page() as page:
+                # Navigate to URL
+                await page.goto(url, timeout=45000)
                 
-            # Launch playwright
-            async with async_playwright() as p:
-                try:
-                    # Launch browser
-                    browser = await p.chromium.launch(
-                        headless=True, 
-                        args=['--no-sandbox', '--disable-dev-shm-usage']
-                    )
-                except Exception as browser_e:
-                    logger.error(f"Failed to launch browser: {str(browser_e)}")
-                    return None
-
+                # Dismiss dialogs
+                await page.keyboard.press("Escape")
+                
+                # Wait for chart to load
+                logger.info("Waiting for chart to load...")
                 try:
-                    # Create browser context
-                    context = await browser.new_context(
-                        viewport={"width": 1280, "height": 800},
-                        device_scale_factor=1
-                    )
-                    
-                    # Get the session ID from environment
-                    session_id = os.environ.get('TRADINGVIEW_SESSION_ID', '')
-                    if session_id:
-                        logger.info(f"Adding TradingView session cookie: {session_id[:5]}...")
-                        # Add session cookie
-                        await context.add_cookies([
-                            {
-                                "name": "sessionid",
-                                "value": session_id,
-                                "domain": ".tradingview.com",
-                                "path": "/"
-                            }
-                        ])
-                    else:
-                        logger.warning("No TradingView session ID found in environment variables")
+                    # Try different selectors
+                    for selector in ['.chart-container', '.chart-markup-table', '.price-axis', '.chart-widget']:
+                        try:
+                            await page.wait_for_selector(selector, timeout=5000)
+                            logger.info(f"Found chart element: {selector}")
+                            break
+                        except:
+                            continue
+                            
+                    # Wait for indicator elements to appear
+                    logger.info("Waiting for indicators to appear...")
+                    indicator_selectors = [
+                        '.pane-legend-line', 
+                        '.pane-legend-item-value-wrap',
+                        '.study-pane',
+                        '.pane-legend-line__value'
+                    ]
                     
-                    # Create page
-                    page = await context.new_page()
-                except Exception as page_e:
-                    logger.error(f"Failed to setup browser context: {str(page_e)}")
-                    await browser.close()
-                    return None
-
+                    for selector in indicator_selectors:
+                        try:
+                            await page.wait_for_selector(selector, timeout=250)
+                            logger.info(f"Found indicator element: {selector}")
+                            break
+                        except Exception as ind_e:
+                            logger.warning(f"Couldn't find indicator element {selector}: {str(ind_e)}")
+                            continue
+                except Exception as wait_e:
+                    logger.warning(f"Wait error: {str(wait_e)}, continuing anyway")
+                
+                # Give time for chart to fully render
+                logger.info("Waiting for indicators to fully render...")
+                await page.wait_for_timeout(1000)
+                
+                # Try to go fullscreen
                 try:
-                    # Navigate to URL
-                    await page.goto(url, timeout=45000)
-                    
-                    # Dismiss dialogs
-                    await page.keyboard.press("Escape")
-                    
-                    # Wait for chart to load
-                    logger.info("Waiting for chart to load...")
-                    try:
-                        # Try different selectors
-                        for selector in ['.chart-container', '.chart-markup-table', '.price-axis', '.chart-widget']:
-                            try:
-                                await page.wait_for_selector(selector, timeout=5000)
-                                logger.info(f"Found chart element: {selector}")
-                                break
-                            except:
-                                continue
-                                
-                        # Wait for indicator elements to appear
-                        logger.info("Waiting for indicators to appear...")
-                        indicator_selectors = [
-                            '.pane-legend-line', 
-                            '.pane-legend-item-value-wrap',
-                            '.study-pane',
-                            '.pane-legend-line__value'
-                        ]
-                        
-                        for selector in indicator_selectors:
-                            try:
-                                await page.wait_for_selector(selector, timeout=250)
-                                logger.info(f"Found indicator element: {selector}")
-                                break
-                            except Exception as ind_e:
-                                logger.warning(f"Couldn't find indicator element {selector}: {str(ind_e)}")
-                                continue
-                    except Exception as wait_e:
-                        logger.warning(f"Wait error: {str(wait_e)}, continuing anyway")
-                    
-                    # Give time for chart to fully render
-                    logger.info("Waiting for indicators to fully render...")
-                    await page.wait_for_timeout(1000)
-                    
-                    # Try to go fullscreen
-                    try:
-                        await page.keyboard.press("Shift+F")
-                        await page.wait_for_timeout(500)
-                    except:
-                        logger.warning("Couldn't enter fullscreen, continuing anyway")
-                    
-                    # Take screenshot
-                    logger.info(f"Taking screenshot for {instrument} now...")
-                    screenshot_bytes = await page.screenshot(type='jpeg', quality=90)
-                    logger.info(f"Screenshot taken, size: {len(screenshot_bytes) / 1024:.2f} KB")
-                    
-                    # Close browser
-                    await browser.close()
-                    logger.info("Browser closed")
-                    
-                except Exception as navigation_e:
-                    logger.error(f"Error during screenshot: {str(navigation_e)}")
-                    await browser.close() 
-                    return None
+                    await page.keyboard.press("Shift+F")
+                    await page.wait_for_timeout(500)
+                except:
+                    logger.warning("Couldn't enter fullscreen, continuing anyway")
+                
+                # Take screenshot
+                logger.info(f"Taking screenshot for {instrument} now...")
+                screenshot_bytes = await page.screenshot(type='jpeg', quality=90)
+                logger.info(f"Screenshot taken, size: {len(screenshot_bytes) / 1024:.2f} KB")
         except Exception as e:
             logger.error(f"Screenshot error: {str(e)}")
             return None
@@ -624,7 +565,15 @@ class ChartService:
             return None
 
     async def get_technical_analysis(self, instrument: str, timeframe: str = "1h") -> str:
-        """Get technical analysis for a specific instrument and timeframe."""
+        """Get technical analysis for a specific instrument and timeframe; concurrent requests share one lookup."""
+        cache_key = f"{self._normalize_instrument_name(instrument)}_{timeframe}"
+        cached_analysis = self.analysis_cache.get(cache_key)
+        if cached_analysis is not None:
+            return cached_analysis
+        return await self.analysis_flight.do(cache_key, self._get_technical_analysis, instrument, timeframe)
+
+    async def _get_technical_analysis(self, instrument: str, timeframe: str = "1h") -> str:
+        """Build technical analysis from the providers, filling the analysis cache"""
         start_time = time.time()
         logger.info(f"Generating technical analysis for {instrument} on {timeframe}")
         
@@ -636,11 +585,10 @@ class ChartService:
             
             # Check cache
             cache_key = f"{instrument}_{timeframe}"
-            if cache_key in self.analysis_cache:
-                cache_time, cached_analysis = self.analysis_cache[cache_key]
-                if time.time() - cache_time < self.analysis_cache_ttl:
-                    logger.info(f"Using cached analysis for {instrument}")
-                    return cached_analysis
+            cached_analysis = self.analysis_cache.get(cache_key)
+            if cached_analysis is not None:
+                logger.info(f"Using cached analysis for {instrument}")
+                return cached_analysis
             
             # Detect market type
             market_type = await self._detect_market_type(instrument)
@@ -729,7 +677,7 @@ class ChartService:
                 
                 # Generate analysis from mock data
                 analysis = self._generate_analysis_from_data(instrument, timeframe, df, metadata)
-                self.analysis_cache[f"{instrument}_{timeframe}"] = (time.time(), analysis)
+                self.analysis_cache.set(f"{instrument}_{timeframe}", analysis)
                 return analysis
             
             # Als alle providers falen, retourneer de standaard melding dat er geen data beschikbaar is
@@ -788,7 +736,7 @@ class ChartService:
                 if metadata_dict:
                     metadata.update(metadata_dict)
                 analysis = self._generate_analysis_from_data(instrument, timeframe, market_data, metadata)
-                self.analysis_cache[f"{instrument}_{timeframe}"] = (time.time(), analysis)
+                self.analysis_cache.set(f"{instrument}_{timeframe}", analysis)
                 return analysis
                 
             return None
@@ -806,7 +754,7 @@ class ChartService:
                 logger.info(f"Successfully got market data from DirectMarketProvider for {instrument}")
                 metadata = {"provider": "DirectMarket", "market_type": market_type}
                 analysis = self._generate_analysis_from_data(instrument, timeframe, market_data, metadata)
-                self.analysis_cache[f"{instrument}_{timeframe}"] = (time.time(), analysis)
+                self.analysis_cache.set(f"{instrument}_{timeframe}", analysis)
                 return analysis
                 
             return None
@@ -827,50 +775,8 @@ class ChartService:
         if not instrument:
             logger.warning("Empty instrument name provided to normalize_instrument_name")
             return ""
-        
-        # Remove slashes and convert to uppercase
-        normalized = instrument.upper().replace("/", "").strip()
-        
-        # Handle common aliases
-        aliases = {
-            "GOLD": "XAUUSD",
-            "OIL": "XTIUSD",
-            "CRUDE": "XTIUSD",
-            "NAS100": "US100",
-            "NASDAQ": "US100",
-            "SPX": "US500",
-            "SP500": "US500",
-            "DOW": "US30",
-            "DAX": "DE40",
-            # Add crypto aliases
-            "BTC": "BTCUSD",
-            "ETH": "ETHUSD",
-            "SOL": "SOLUSD",
-            "XRP": "XRPUSD",
-            "DOGE": "DOGEUSD",
-            "ADA": "ADAUSD",
-            "LINK": "LINKUSD",
-            "AVAX": "AVAXUSD",
-            "MATIC": "MATICUSD",
-            "DOT": "DOTUSD"
-        }
-        
-        # Check if the input is a pure crypto symbol without USD suffix
-        crypto_symbols = ["BTC", "ETH", "XRP", "SOL", "ADA", "LINK", "DOT", "DOGE", "AVAX", "BNB", "MATIC"]
-        if normalized in crypto_symbols:
-            logger.info(f"Normalized pure crypto symbol {normalized} to {normalized}USD")
-            normalized = f"{normalized}USD"
-        
-        # Handle USDT suffix for crypto (normalize to USD for consistency)
-        if normalized.endswith("USDT"):
-            base = normalized[:-4]
-            if any(base == crypto for crypto in crypto_symbols):
-                usd_version = f"{base}USD"
-                logger.info(f"Normalized {normalized} to {usd_version}")
-                normalized = usd_version
-        
-        # Return alias if found, otherwise return the normalized instrument
-        return aliases.get(normalized, normalized)
+
+        return INSTRUMENTS.normalize(instrument)
         
     async def _detect_market_type(self, instrument: str) -> str:
         """
@@ -882,60 +788,7 @@ class ChartService:
         Returns:
             str: Market type - "crypto", "forex", "commodity", or "index"
         """
-        logger.info(f"Detecting market type for {instrument}")
-        
-        # Cryptocurrency detection
-        crypto_symbols = ["BTC", "ETH", "XRP", "LTC", "BCH", "EOS", "XLM", "TRX", "ADA", "XMR", 
-                         "DASH", "ZEC", "ETC", "NEO", "XTZ", "LINK", "ATOM", "ONT", "BAT", "SOL", 
-                         "DOT", "AVAX", "DOGE", "SHIB", "MATIC", "UNI", "AAVE", "COMP", "YFI", "SNX"]
-        
-        # Check if it's a known crypto symbol
-        if any(crypto in instrument for crypto in crypto_symbols):
-            logger.info(f"{instrument} detected as crypto (by symbol)")
-            return "crypto"
-            
-        # Check common crypto suffixes
-        if instrument.endswith("BTC") or instrument.endswith("ETH") or instrument.endswith("USDT") or instrument.endswith("USDC"):
-            logger.info(f"{instrument} detected as crypto (by trading pair)")
-            return "crypto"
-            
-        # Specific check for USD-paired crypto
-        if instrument.endswith("USD"):
-            base = instrument[:-3]
-            if any(base == crypto for crypto in crypto_symbols):
-                logger.info(f"{instrument} detected as crypto (USD pair)")
-                return "crypto"
-                
-        # Commodity detection
-        commodity_symbols = ["XAU", "XAG", "XPT", "XPD", "XTI", "XBR", "XNG"]
-        if any(instrument.startswith(comm) for comm in commodity_symbols):
-            logger.info(f"{instrument} detected as commodity")
-            return "commodity"
-            
-        # Index detection
-        index_symbols = ["US30", "US500", "US100", "UK100", "DE40", "FR40", "EU50", "JP225", "AUS200", "HK50"]
-        if instrument in index_symbols:
-            logger.info(f"{instrument} detected as index")
-            return "index"
-            
-        # Specific known instruments
-        if instrument == "XAUUSD" or instrument == "XAGUSD" or instrument == "XTIUSD" or instrument == "WTIUSD" or instrument == "USOIL":
-            logger.info(f"{instrument} detected as commodity (specific check)")
-            return "commodity"
-            
-        # Forex detection (default for 6-char symbols with alphabetic chars)
-        if len(instrument) == 6 and instrument.isalpha():
-            currency_codes = ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD"]
-            # Check if it's made of valid currency pairs
-            base = instrument[:3]
-            quote = instrument[3:]
-            if base in currency_codes and quote in currency_codes:
-                logger.info(f"{instrument} detected as forex")
-                return "forex"
-                
-        # Default to forex for unknown instruments
-        logger.info(f"{instrument} market type unknown, defaulting to forex")
-        return "forex"
+        return INSTRUMENTS.market_type(instrument)
 
     def _get_instrument_precision(self, instrument: str) -> int:
         """
@@ -947,46 +800,7 @@ class ChartService:
         Returns:
             int: Number of decimal places to display
         """
-        # Detect market type
-        market_type = "crypto"  # Default to crypto if we can't run the async method
-        
-        # XRP uses 5 decimal places
-        if "XRP" in instrument:
-            return 5  # XRP specifieke precisie voor meer decimalen
-            
-        # Bitcoin and major cryptos
-        if instrument in ["BTCUSD", "BTCUSDT"]:
-            return 0  # Bitcoin displayed with 0 decimal places
-            
-        # Ethereum and high-value cryptos
-        if instrument in ["ETHUSD", "ETHUSDT"]:
-            return 1  # Ethereum displayed with 1 decimal place
-            
-        if instrument in ["BNBUSD", "BNBUSDT", "SOLUSD", "SOLUSDT"]:
-            return 2  # These often shown with 2 decimal places
-        
-        # Other cryptos
-        if "BTC" in instrument or "ETH" in instrument or "USD" in instrument and any(c in instrument for c in ["XRP", "ADA", "DOT", "AVAX", "MATIC"]):
-            return 4  # Most altcoins use 4-5 decimal places
-            
-        # Indices typically use 2 decimal places
-        if instrument in ["US30", "US500", "US100", "UK100", "DE40", "JP225"]:
-            return 2
-            
-        # Gold and silver use 2-3 decimal places
-        if instrument in ["XAUUSD", "GOLD", "XAGUSD", "SILVER"]:
-            return 2
-            
-        # Crude oil uses 2 decimal places
-        if instrument in ["XTIUSD", "WTIUSD", "OIL", "USOIL"]:
-            return 2
-            
-        # JPY pairs use 3 decimal places
-        if "JPY" in instrument:
-            return 3
-            
-        # Default for forex is 5 decimal places
-        return 5
+        return INSTRUMENTS.precision(instrument)
 
     async def _fetch_crypto_price(self, symbol: str) -> Optional[float]:
         """
@@ -1322,41 +1136,7 @@ Moving Averages: {ma_analysis}
         """
         Non-async version of _detect_market_type
         """
-        # List of common forex pairs
-        forex_pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'AUDUSD', 'USDCAD', 'NZDUSD', 'EURGBP', 'EURJPY']
-        
-        # List of common indices
-        indices = ['US30', 'US500', 'US100', 'DE40', 'UK100', 'FR40', 'JP225', 'AU200', 'EU50']
-        
-        # List of common commodities
-        commodities = ['XAUUSD', 'XAGUSD', 'XTIUSD', 'XBRUSD', 'XCUUSD', 'USOIL']
-        
-        # Crypto prefixes and common cryptos
-        crypto_prefixes = ['BTC', 'ETH', 'XRP', 'LTC', 'BCH', 'BNB', 'ADA', 'DOT', 'LINK', 'XLM']
-        common_cryptos = ['BTCUSD', 'ETHUSD', 'XRPUSD', 'LTCUSD', 'BCHUSD', 'BNBUSD', 'ADAUSD', 'DOTUSD', 'LINKUSD', 'XLMUSD']
-        
-        # Check if the instrument is a forex pair
-        if instrument in forex_pairs or (
-                len(instrument) == 6 and 
-            instrument[:3] in ['EUR', 'GBP', 'USD', 'AUD', 'NZD', 'CAD', 'CHF', 'JPY'] and
-            instrument[3:] in ['EUR', 'GBP', 'USD', 'AUD', 'NZD', 'CAD', 'CHF', 'JPY']
-            ):
-            return "forex"
-        
-        # Check if the instrument is an index
-        if instrument in indices:
-            return "index"
-        
-        # Check if the instrument is a commodity
-        if instrument in commodities:
-            return "commodity"
-        
-        # Check if the instrument is a cryptocurrency
-        if instrument in common_cryptos or any(instrument.startswith(prefix) for prefix in crypto_prefixes):
-            return "crypto"
-        
-        # Default to forex for unknown instruments
-        return "forex"
+        return INSTRUMENTS.market_type(instrument)
 
     def get_tradingview_url(self, instrument: str, timeframe: str = '1h') -> str:
         """Get TradingView URL for a specific instrument and timeframe.
@@ -1377,16 +1157,7 @@ Moving Averages: {ma_analysis}
         base_url = self.chart_links[instrument]
         
         # Map timeframe to TradingView format
-        tv_timeframe_map = {
-            '1h': '60',
-            '4h': '240',
-            '1d': 'D',
-            '5m': '5',
-            '15m': '15',
-            '30m': '30',
-            '1w': 'W'
-        }
-        tv_timeframe = tv_timeframe_map.get(timeframe, timeframe)
+        tv_timeframe = provider_interval(timeframe, "tradingview_chart", default=None) or timeframe
         
         # Parse URL components to properly add parameters
         url_parts = base_url.split('?')
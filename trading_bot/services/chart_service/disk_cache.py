@@ -0,0 +1,267 @@
+"""
+Bounded, content-addressed chart cache on disk, shared by all local processes
+"""
+
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import contextlib
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'cache', 'charts')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Access times are written back at most this often per key
+TOUCH_INTERVAL_SECONDS = 30
+
+
+class DiskChartCache:
+    """
+    Chart images stored once per content hash, with a SQLite index of keys.
+
+    Every process using the same directory sees the same entries: the bot
+    and the API process share renders, and the cache survives restarts.
+    Each process keeps an in-memory copy of the index entries it has seen,
+    reads images through a memory map and only asks SQLite on a miss. When
+    the distinct images exceed `max_bytes`, expired keys go first and then
+    the least recently used ones; files no key refers to are removed. The
+    size of the stored images is a counter in the index, updated in the same
+    transaction as the images it counts, so checking the limit costs one read.
+
+    Exposes the get/set/pop/`in` interface of BoundedCache. Every call does
+    blocking SQLite and file I/O; async callers run it in an executor.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, name: str = "chart_cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory, shared by the processes that should share charts
+            max_bytes: Upper bound of the stored images in bytes
+            ttl: Default seconds an entry stays valid
+            name: Label used in logs and statistics
+        """
+        self.directory = directory or os.getenv("CHART_DISK_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes or os.getenv("CHART_DISK_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.ttl = ttl
+        self.name = name
+        self.blob_dir = os.path.join(self.directory, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=10,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, blob TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_blob ON entries (blob)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS blobs (blob TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        with self._transaction():
+            # Count images of entries written before the counter existed, then recount once per start
+            self._conn.execute("INSERT OR IGNORE INTO blobs (blob, size) SELECT blob, MAX(size) FROM entries GROUP BY blob")
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) "
+                               "SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM blobs")
+
+        # key -> (blob, size, expires_at), as last seen by this process
+        self._index: Dict[str, Tuple[str, int, float]] = {}
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Serialize a read-modify-write of the index with the other processes"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _blob_path(self, blob: str) -> str:
+        return os.path.join(self.blob_dir, f"{blob}.img")
+
+    def _read(self, blob: str) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(blob), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[:]
+        except FileNotFoundError:
+            return None
+
+    def _lookup(self, key: str, now: float) -> Optional[Tuple[str, int, float]]:
+        entry = self._index.get(key)
+        if entry is not None and entry[2] > now:
+            return entry
+        # Another process may have written or refreshed the key
+        row = self._conn.execute("SELECT blob, size, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[2] <= now:
+            self._index.pop(key, None)
+            return None
+        entry = self._index[key] = (row[0], row[1], row[2])
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the image stored under a key, or `default` when missing or expired"""
+        key = str(key)
+        now = time.time()
+        with self._lock:
+            entry = self._lookup(key, now)
+            data = self._read(entry[0]) if entry is not None else None
+            if data is None:
+                if entry is not None:
+                    # Image evicted by another process
+                    self._index.pop(key, None)
+                self.misses += 1
+                return default
+            self.hits += 1
+            if now - self._touched.get(key, 0.0) >= TOUCH_INTERVAL_SECONDS:
+                self._touched[key] = now
+                self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return data
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._lookup(str(key), time.time())
+            return entry is not None and os.path.exists(self._blob_path(entry[0]))
+
+    def set(self, key: Hashable, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store an image under a key, evicting least recently used images beyond the size limit"""
+        key = str(key)
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else float("inf")
+        blob = hashlib.sha1(value).hexdigest()
+        path = self._blob_path(blob)
+        with self._lock:
+            if not os.path.exists(path):
+                # Write under a private name first so readers never see a partial file
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(value)
+                os.replace(tmp_path, path)
+            with self._transaction():
+                row = self._conn.execute("SELECT blob FROM entries WHERE key = ?", (key,)).fetchone()
+                if self._conn.execute("INSERT OR IGNORE INTO blobs (blob, size) VALUES (?, ?)",
+                                      (blob, len(value))).rowcount:
+                    self._add_bytes(len(value))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, blob, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(value), expires_at, now)
+                )
+                if row is not None and row[0] != blob:
+                    self._release_blobs({row[0]})
+            self._index[key] = (blob, len(value), expires_at)
+            self._touched[key] = now
+            self.writes += 1
+            self._evict(now)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its image"""
+        key = str(key)
+        with self._lock:
+            value = self.get(key, default)
+            with self._transaction():
+                self._delete_keys([key])
+            return value
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _add_bytes(self, delta: int) -> None:
+        self._conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_bytes'", (delta,))
+
+    def _release_blobs(self, blobs) -> None:
+        """Remove images no key refers to any more and subtract them from the counter"""
+        for blob in blobs:
+            if self._conn.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob,)).fetchone() is not None:
+                continue
+            row = self._conn.execute("SELECT size FROM blobs WHERE blob = ?", (blob,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM blobs WHERE blob = ?", (blob,))
+                self._add_bytes(-row[0])
+            try:
+                os.remove(self._blob_path(blob))
+            except FileNotFoundError:
+                pass
+
+    def _delete_keys(self, keys) -> None:
+        """Delete keys and their unreferenced images; call inside a transaction"""
+        blobs = set()
+        for key in keys:
+            row = self._conn.execute("SELECT blob FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._index.pop(key, None)
+            self._touched.pop(key, None)
+            if row is not None:
+                blobs.add(row[0])
+        self._release_blobs(blobs)
+
+    def _evict(self, now: float) -> None:
+        if self._total_bytes() <= self.max_bytes:
+            return
+        with self._transaction():
+            expired = [row[0] for row in self._conn.execute("SELECT key FROM entries WHERE expires_at <= ?", (now,))]
+            if expired:
+                self._delete_keys(expired)
+                self.evictions += len(expired)
+            total = self._total_bytes()
+            while total > self.max_bytes:
+                oldest = [row[0] for row in self._conn.execute(
+                    "SELECT key FROM entries ORDER BY accessed_at LIMIT 1")]
+                if not oldest:
+                    break
+                self._delete_keys(oldest)
+                self.evictions += len(oldest)
+                total = self._total_bytes()
+        logger.info(f"[{self.name}] Evicted down to {total / 1024 / 1024:.1f} MB")
+
+    def clear(self) -> None:
+        """Remove every entry and image"""
+        with self._lock:
+            with self._transaction():
+                keys = [row[0] for row in self._conn.execute("SELECT key FROM entries")]
+                self._delete_keys(keys)
+
+    def close(self) -> None:
+        """Close the index connection"""
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return size and hit statistics"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self._total_bytes()
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "directory": self.directory,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
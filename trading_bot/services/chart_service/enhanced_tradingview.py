@@ -7,6 +7,9 @@ from typing import Dict, Any, Optional, Tuple, List
 # TradingView TA bibliotheek
 from tradingview_ta import TA_Handler, Interval, Exchange
 
+from trading_bot.utils.instrument_registry import INSTRUMENTS
+from trading_bot.utils.timeframes import provider_interval
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -16,90 +19,20 @@ class EnhancedTradingView:
     en andere technische analyse data van TradingView.
     """
     
-    # Mapping van timeframes naar TradingView intervallen
-    TIMEFRAME_MAP = {
-        "1m": Interval.INTERVAL_1_MINUTE,
-        "5m": Interval.INTERVAL_5_MINUTES,
-        "15m": Interval.INTERVAL_15_MINUTES,
-        "30m": Interval.INTERVAL_30_MINUTES,
-        "1h": Interval.INTERVAL_1_HOUR,
-        "4h": Interval.INTERVAL_4_HOURS,
-        "1d": Interval.INTERVAL_1_DAY,
-        "1w": Interval.INTERVAL_1_WEEK,
-        "1M": Interval.INTERVAL_1_MONTH,
-    }
-    
-    # Mapping van symbolen naar TradingView format voor screener en exchange
-    SYMBOL_MAP = {
-        # Forex paren
-        "EURUSD": ("forex", "FX_IDC"),
-        "GBPUSD": ("forex", "FX_IDC"),
-        "USDJPY": ("forex", "FX_IDC"),
-        "AUDUSD": ("forex", "FX_IDC"),
-        "USDCAD": ("forex", "FX_IDC"),
-        "USDCHF": ("forex", "FX_IDC"),
-        "NZDUSD": ("forex", "FX_IDC"),
-        # Commodities - Using different formats for TradingView compatibility
-        "XAUUSD": ("cfd", "TVC", "GOLD"),       # Gold on TVC
-        "XAGUSD": ("cfd", "TVC", "SILVER"),     # Silver on TVC
-        "XTIUSD": ("cfd", "TVC", "USOIL"),      # WTI Oil on TVC
-        "USOIL": ("cfd", "TVC", "USOIL"),       # Explicit WTI Oil mapping
-        "WTICL": ("america", "NYMEX", "CL1!"),  # WTI Crude Oil Futures alternative
-        "XBRUSD": ("cfd", "TVC", "UKOIL"),      # Brent Oil on TVC
-        # Aandelen
-        "AAPL": ("america", "NASDAQ"),
-        "MSFT": ("america", "NASDAQ"),
-        "GOOGL": ("america", "NASDAQ"),
-        "AMZN": ("america", "NASDAQ"),
-        # Indices - note: technische analyse voor indices is niet ondersteund door TradingView
-        "US500": ("america", "CBOE", "SPX"),  # S&P 500 index via CBOE - Changed SPX500 to SPX
-        "NAS100": ("america", "NASDAQ", "NDX"),  # Nasdaq 100 index
-        "US30": ("america", "DJ", "DJI"),        # Dow Jones index
-        "US100": ("america", "NASDAQ", "NDX"),   # NASDAQ 100 index (added for US100 compatibility)
-        # Crypto
-        "BTCUSD": ("crypto", "BINANCE"),
-        "ETHUSD": ("crypto", "BINANCE"),
-        "XRPUSD": ("crypto", "BINANCE", "XRPUSDT"),
-    }
-
     @staticmethod
     def _format_symbol(symbol: str) -> Tuple[str, str, str]:
         """Format een handelssymbool voor gebruik met TradingView API"""
-        if symbol in EnhancedTradingView.SYMBOL_MAP:
-            mapping = EnhancedTradingView.SYMBOL_MAP[symbol]
-            if len(mapping) == 3:
-                # Speciale gevallen met alternatieve symbool namen
-                screener, exchange, alt_symbol = mapping
-                return screener, exchange, alt_symbol
-            else:
-                # Normale gevallen zonder symbool wijziging
-                screener, exchange = mapping
-                return screener, exchange, symbol
-        
-        # Fallback: probeer een standaard mapping
-        if symbol.endswith("USD") and symbol.startswith("X"):
-            # Metaal/commodities in cfd format
-            metal_symbol = "GOLD" if "XAU" in symbol else "SILVER" if "XAG" in symbol else symbol
-            return "cfd", "TVC", metal_symbol
-        elif symbol.endswith("USD") and not symbol.startswith("X"):
-            # Crypto format aanname
-            return "crypto", "BINANCE", symbol
-        elif len(symbol) <= 5 and not symbol.startswith("X"):
-            # Aandeel formaat aanname
-            return "america", "NASDAQ", symbol
-        else:
-            # Forex formaat aanname
-            return "forex", "FX_IDC", symbol
+        tv_symbol, screener, exchange = INSTRUMENTS.tradingview(symbol)
+        return screener, exchange, tv_symbol
 
     @staticmethod
     def _map_timeframe(timeframe: str) -> str:
         """Converteer timeframe naar TradingView interval"""
-        if timeframe in EnhancedTradingView.TIMEFRAME_MAP:
-            return EnhancedTradingView.TIMEFRAME_MAP[timeframe]
-        
-        # Fallback to default
-        logger.warning(f"[EnhancedTradingView] Onbekend timeframe '{timeframe}', valt terug op 1h")
-        return EnhancedTradingView.TIMEFRAME_MAP["1h"]
+        interval = provider_interval(timeframe, "tradingview_ta", default=None)
+        if interval is None:
+            logger.warning(f"[EnhancedTradingView] Onbekend timeframe '{timeframe}', valt terug op 1h")
+            return provider_interval("1h", "tradingview_ta")
+        return interval
 
     @staticmethod
     def get_multiple_timeframes(symbol: str, timeframes: List[str] = ["1d", "1h", "15m"]) -> Dict[str, Any]:
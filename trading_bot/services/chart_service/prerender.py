@@ -0,0 +1,219 @@
+"""
+Background pre-rendering of charts for hot instruments, after candle closes and between them
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from trading_bot.utils.instrument_registry import INSTRUMENTS
+from trading_bot.utils.timeframes import TIMEFRAMES, candle_end, candle_start, normalize_timeframe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEFRAMES = "1h"
+DEFAULT_MAX_INSTRUMENTS = 10
+DEFAULT_CONCURRENCY = 1
+DEFAULT_DELAY_SECONDS = 20
+DEFAULT_SIGNAL_WINDOW_SECONDS = 6 * 60 * 60
+# Shorter candles are covered by the regular chart cache TTL
+MIN_TIMEFRAME_SECONDS = 15 * 60
+# Refreshes start this long before the cached chart expires, so its successor is ready in time
+REFRESH_LEAD_SECONDS = 30
+MIN_REFRESH_SECONDS = 60
+# A recent signal outranks any subscriber count
+SIGNAL_SCORE = 1_000_000
+MAX_SLEEP_SECONDS = 60
+
+
+class ChartPrerenderer:
+    """
+    Keeps charts of hot instruments in the ChartService cache.
+
+    Hot instruments are those with a chart layout in `chart_links` that had a
+    signal recently or have the most signal subscribers. Shortly after each
+    candle close of a tracked timeframe their charts are captured under a
+    concurrency budget, and captured again every `refresh_interval` seconds
+    while the candle is open. Charts are cached for the regular
+    `chart_cache_ttl`, so a pre-rendered chart is never older than a chart
+    rendered on demand, and user clicks are served from the cache.
+    """
+
+    def __init__(self, chart_service, subscriber_counts: Optional[Callable[[], Awaitable[Dict[str, int]]]] = None):
+        """
+        Initialize the scheduler; call start() from a running event loop.
+
+        Args:
+            chart_service: ChartService whose cache is filled
+            subscriber_counts: Coroutine function returning signal subscribers per instrument
+        """
+        self.chart_service = chart_service
+        self.subscriber_counts = subscriber_counts
+        self.enabled = os.getenv("CHART_PRERENDER", "true").lower() == "true"
+        self.timeframes = [tf for tf in (normalize_timeframe(t) for t in
+                                         os.getenv("CHART_PRERENDER_TIMEFRAMES", DEFAULT_TIMEFRAMES).split(","))
+                           if self._eligible(tf)]
+        self.max_instruments = int(os.getenv("CHART_PRERENDER_MAX_INSTRUMENTS", DEFAULT_MAX_INSTRUMENTS))
+        self.concurrency = max(1, int(os.getenv("CHART_PRERENDER_CONCURRENCY", DEFAULT_CONCURRENCY)))
+        self.delay = float(os.getenv("CHART_PRERENDER_DELAY_SECONDS", DEFAULT_DELAY_SECONDS))
+        self.signal_window = float(os.getenv("CHART_PRERENDER_SIGNAL_WINDOW_SECONDS", DEFAULT_SIGNAL_WINDOW_SECONDS))
+        self.ttl = float(getattr(chart_service, "chart_cache_ttl", 300))
+        self.refresh_interval = float(os.getenv("CHART_PRERENDER_REFRESH_SECONDS",
+                                                max(MIN_REFRESH_SECONDS, self.ttl - REFRESH_LEAD_SECONDS)))
+
+        # instrument -> (last signal time, timeframes seen in its signals)
+        self._signals: Dict[str, Tuple[float, Set[str]]] = {}
+        # timeframe -> (open time of the candle last pre-rendered for, time of that render)
+        self._rendered: Dict[str, Tuple[float, float]] = {}
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"runs": 0, "rendered": 0, "failed": 0, "last_run_seconds": 0.0}
+
+    @staticmethod
+    def _eligible(timeframe: str) -> bool:
+        tf = TIMEFRAMES.get(timeframe)
+        return tf is not None and tf.seconds >= MIN_TIMEFRAME_SECONDS
+
+    def note_signal(self, instrument: str, timeframe: Optional[str] = None) -> None:
+        """Mark an instrument as hot because a signal for it just arrived"""
+        symbol = INSTRUMENTS.normalize(instrument)
+        if not symbol:
+            return
+        _, timeframes = self._signals.get(symbol, (0.0, set()))
+        timeframe = normalize_timeframe(timeframe)
+        if self._eligible(timeframe):
+            timeframes.add(timeframe)
+        self._signals[symbol] = (time.time(), timeframes)
+
+    def _recent_signals(self, now: float) -> Dict[str, Set[str]]:
+        for symbol in [s for s, (seen, _) in self._signals.items() if now - seen > self.signal_window]:
+            del self._signals[symbol]
+        return {symbol: timeframes for symbol, (_, timeframes) in self._signals.items()}
+
+    async def hot_instruments(self) -> List[str]:
+        """Instruments with a chart layout, ranked by recent signals and then subscriber count"""
+        counts: Dict[str, int] = {}
+        if self.subscriber_counts is not None:
+            try:
+                counts = await self.subscriber_counts() or {}
+            except Exception as e:
+                logger.warning(f"Could not load subscriber counts for chart pre-rendering: {str(e)}")
+
+        chart_links = self.chart_service.chart_links
+        scores: Dict[str, int] = {}
+        for instrument, count in counts.items():
+            symbol = INSTRUMENTS.normalize(instrument)
+            if symbol in chart_links:
+                scores[symbol] = scores.get(symbol, 0) + count
+        for symbol in self._recent_signals(time.time()):
+            if symbol in chart_links:
+                scores[symbol] = scores.get(symbol, 0) + SIGNAL_SCORE
+        ranked = sorted((symbol for symbol, score in scores.items() if score > 0),
+                        key=lambda symbol: scores[symbol], reverse=True)
+        return ranked[:self.max_instruments]
+
+    def _tracked_timeframes(self, now: float) -> Set[str]:
+        timeframes = set(self.timeframes)
+        for signal_timeframes in self._recent_signals(now).values():
+            timeframes |= signal_timeframes
+        return timeframes
+
+    def _due_timeframes(self, now: float) -> List[str]:
+        """Timeframes whose candle opened at least `delay` seconds ago and was not rendered for recently"""
+        due = []
+        for timeframe in sorted(self._tracked_timeframes(now)):
+            opened = candle_start(timeframe, now)
+            if now - opened < self.delay:
+                # TradingView may not show the new candle yet
+                continue
+            last = self._rendered.get(timeframe)
+            if last is None or last[0] != opened or now - last[1] >= self.refresh_interval:
+                due.append(timeframe)
+        return due
+
+    def _next_wakeup(self, now: float) -> float:
+        wakeups = [now + MAX_SLEEP_SECONDS]
+        for timeframe in self._tracked_timeframes(now):
+            opened = candle_start(timeframe, now)
+            wakeups.append(candle_end(timeframe, now) + self.delay)
+            last = self._rendered.get(timeframe)
+            if last is not None and last[0] == opened:
+                wakeups.append(last[1] + self.refresh_interval)
+            else:
+                wakeups.append(opened + self.delay)
+        return min(wakeups)
+
+    async def _render(self, instrument: str, timeframe: str, ttl: float) -> None:
+        async with self._semaphore:
+            try:
+                if await self.chart_service.prerender_chart(instrument, timeframe, ttl=ttl):
+                    self.stats["rendered"] += 1
+                else:
+                    self.stats["failed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Error pre-rendering chart for {instrument} {timeframe}: {str(e)}")
+
+    async def run_once(self, now: Optional[float] = None) -> int:
+        """Pre-render every due timeframe; returns the number of charts attempted"""
+        now = time.time() if now is None else now
+        due = self._due_timeframes(now)
+        if not due:
+            return 0
+        started = time.perf_counter()
+        hot = await self.hot_instruments()
+        signals = self._recent_signals(now)
+
+        jobs = []
+        for timeframe in due:
+            self._rendered[timeframe] = (candle_start(timeframe, now), now)
+            for instrument in hot:
+                if timeframe in self.timeframes or timeframe in signals.get(instrument, ()):
+                    jobs.append(self._render(instrument, timeframe, self.ttl))
+        await asyncio.gather(*jobs)
+
+        self.stats["runs"] += 1
+        self.stats["last_run_seconds"] = round(time.perf_counter() - started, 2)
+        logger.info(f"Pre-rendered {len(jobs)} charts for {', '.join(due)} in {self.stats['last_run_seconds']}s")
+        return len(jobs)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Chart pre-rendering failed: {str(e)}")
+            now = time.time()
+            await asyncio.sleep(min(MAX_SLEEP_SECONDS, max(1.0, self._next_wakeup(now) - now)))
+
+    def start(self) -> None:
+        """Start the scheduler (requires a running event loop); the first run warms the cache"""
+        if not self.enabled:
+            logger.info("Chart pre-rendering disabled")
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Chart pre-rendering started for timeframes {self.timeframes}, "
+                    f"{self.max_instruments} instruments, concurrency {self.concurrency}, "
+                    f"refresh every {self.refresh_interval:.0f}s")
+
+    async def stop(self) -> None:
+        """Stop the scheduler"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return run counters and the current configuration"""
+        return {**self.stats, "timeframes": list(self.timeframes), "hot_signals": len(self._signals),
+                "refresh_interval": self.refresh_interval, "ttl": self.ttl,
+                "running": self._task is not None and not self._task.done()}
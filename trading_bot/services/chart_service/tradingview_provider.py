@@ -8,6 +8,9 @@ from datetime import datetime, timedelta
 import os
 import traceback
 
+from trading_bot.utils.instrument_registry import INSTRUMENTS
+from trading_bot.utils.timeframes import provider_interval
+
 # Import de historische data provider
 try:
     from trading_bot.services.chart_service.tradingview_historical import TradingViewHistorical
@@ -39,85 +42,19 @@ data_download_cache = {}
 class TradingViewProvider:
     """Provider class voor TradingView data als alternatief voor forex en andere marktdata"""
     
-    # Mapping van timeframes naar TradingView intervallen
-    TIMEFRAME_MAP = {
-        "1m": Interval.INTERVAL_1_MINUTE if HAS_TRADINGVIEW_TA else "1m",
-        "5m": Interval.INTERVAL_5_MINUTES if HAS_TRADINGVIEW_TA else "5m",
-        "15m": Interval.INTERVAL_15_MINUTES if HAS_TRADINGVIEW_TA else "15m",
-        "30m": Interval.INTERVAL_30_MINUTES if HAS_TRADINGVIEW_TA else "30m",
-        "1h": Interval.INTERVAL_1_HOUR if HAS_TRADINGVIEW_TA else "1h",
-        "4h": Interval.INTERVAL_4_HOURS if HAS_TRADINGVIEW_TA else "4h",
-        "1d": Interval.INTERVAL_1_DAY if HAS_TRADINGVIEW_TA else "1d",
-        "1w": Interval.INTERVAL_1_WEEK if HAS_TRADINGVIEW_TA else "1w",
-        "1M": Interval.INTERVAL_1_MONTH if HAS_TRADINGVIEW_TA else "1M",
-    }
-    
-    # Mapping van symbolen naar TradingView format
-    SYMBOL_MAP = {
-        # Forex paren
-        "EURUSD": ("EURUSD", "forex", "FX_IDC"),
-        "GBPUSD": ("GBPUSD", "forex", "FX_IDC"),
-        "USDJPY": ("USDJPY", "forex", "FX_IDC"),
-        "AUDUSD": ("AUDUSD", "forex", "FX_IDC"),
-        "USDCAD": ("USDCAD", "forex", "FX_IDC"),
-        "USDCHF": ("USDCHF", "forex", "FX_IDC"),
-        "NZDUSD": ("NZDUSD", "forex", "FX_IDC"),
-        # Commodities - Using different formats for TradingView compatibility
-        "XAUUSD": ("GOLD", "cfd", "TVC"),       # Gold on TVC
-        "XAGUSD": ("SILVER", "cfd", "TVC"),     # Silver on TVC 
-        "XTIUSD": ("USOIL", "cfd", "TVC"),      # WTI Oil on TVC
-        "USOIL": ("USOIL", "cfd", "TVC"),       # Explicit WTI Oil mapping
-        "WTICL": ("CL1!", "america", "NYMEX"),  # WTI Crude Oil Futures alternative
-        "XBRUSD": ("UKOIL", "cfd", "TVC"),      # Brent Oil on TVC
-        # Aandelen
-        "AAPL": ("AAPL", "america", "NASDAQ"),
-        "MSFT": ("MSFT", "america", "NASDAQ"),
-        "GOOGL": ("GOOGL", "america", "NASDAQ"),
-        "AMZN": ("AMZN", "america", "NASDAQ"),
-        # Indices
-        "US500": ("SPX", "america", "CBOE"),  # S&P 500 index via CBOE
-        "NAS100": ("NDX", "america", "NASDAQ"),  # Nasdaq 100 index
-        "US30": ("DJI", "america", "DJ"),        # Dow Jones index
-        "US100": ("NDX", "america", "NASDAQ"),   # NASDAQ 100 index (added for US100 compatibility)
-        # Crypto
-        "BTCUSD": ("BTCUSD", "crypto", "BINANCE"),
-        "ETHUSD": ("ETHUSD", "crypto", "BINANCE"),
-        "XRPUSD": ("XRPUSDT", "crypto", "BINANCE"),
-    }
-
     @staticmethod
     def _format_symbol(symbol: str) -> Tuple[str, str, str]:
         """Format een handelssymbool voor gebruik met TradingView API"""
-        if symbol in TradingViewProvider.SYMBOL_MAP:
-            return TradingViewProvider.SYMBOL_MAP[symbol]
-        
-        # Fallback: probeer een standaard mapping
-        if symbol.endswith("USD") and symbol.startswith("X"):
-            # Metaal/commodities in cfd format
-            metal_symbol = "GOLD" if "XAU" in symbol else "SILVER" if "XAG" in symbol else symbol
-            return (metal_symbol, "cfd", "TVC")
-        elif symbol.endswith("USD") and not symbol.startswith("X"):
-            # Crypto format aanname
-            return (symbol, "crypto", "BINANCE")
-        elif len(symbol) <= 5 and not symbol.startswith("X"):
-            # Aandeel formaat aanname
-            return (symbol, "america", "NASDAQ")
-        elif symbol.startswith("US") or symbol in ["SPX", "DJI", "NDX"]:
-            # Index format
-            return (symbol, "america", "INDEX")
-        else:
-            # Forex formaat aanname
-            return (symbol, "forex", "FX_IDC")
+        return INSTRUMENTS.tradingview(symbol)
 
     @staticmethod
     def _map_timeframe(timeframe: str) -> str:
         """Converteer timeframe naar TradingView interval"""
-        if timeframe in TradingViewProvider.TIMEFRAME_MAP:
-            return TradingViewProvider.TIMEFRAME_MAP[timeframe]
-        
-        # Fallback to default
-        logger.warning(f"[TradingView] Onbekend timeframe '{timeframe}', valt terug op 1h")
-        return TradingViewProvider.TIMEFRAME_MAP["1h"]
+        interval = provider_interval(timeframe, "tradingview_ta", default=None)
+        if interval is None:
+            logger.warning(f"[TradingView] Onbekend timeframe '{timeframe}', valt terug op 1h")
+            return provider_interval("1h", "tradingview_ta")
+        return interval
 
     @staticmethod
     async def get_technical_analysis(symbol: str, timeframe: str = "1h") -> Dict[str, Any]:
@@ -0,0 +1,110 @@
+import time
+import heapq
+import logging
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from trading_bot.services.database.subscription_cache import _period_end_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveSubscriberSet:
+    """
+    In-memory set of users with an active, unexpired subscription.
+
+    Members are kept with their period end in a min-heap, so the sweeper can
+    drop expired users in order without scanning the whole set. Users whose
+    subscription changed are marked stale and must be rechecked against the
+    database before they are trusted again.
+    """
+
+    def __init__(self):
+        self.period_ends: Dict[int, float] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self.stale: Set[int] = set()
+        self.built_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.period_ends)
+
+    def __contains__(self, user_id: Any) -> bool:
+        return int(user_id) in self.period_ends
+
+    @property
+    def is_built(self) -> bool:
+        return self.built_at > 0
+
+    def _add(self, row: Dict[str, Any], now: float) -> None:
+        period_end = _period_end_timestamp(row.get('current_period_end'))
+        if period_end is None or period_end <= now:
+            return
+        user_id = int(row['user_id'])
+        self.period_ends[user_id] = period_end
+        heapq.heappush(self._heap, (period_end, user_id))
+
+    def rebuild(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Replace the set with all active subscription rows"""
+        now = time.time()
+        self.period_ends = {}
+        self._heap = []
+        self.stale.clear()
+        for row in rows:
+            self._add(row, now)
+        self.built_at = now
+        logger.info(f"Active subscriber set rebuilt with {len(self.period_ends)} users")
+
+    def update(self, user_ids: Iterable[Any], rows: Iterable[Dict[str, Any]]) -> None:
+        """Apply a recheck of `user_ids`; users without an active row in `rows` are removed"""
+        now = time.time()
+        for user_id in user_ids:
+            user_id = int(user_id)
+            self.period_ends.pop(user_id, None)
+            self.stale.discard(user_id)
+        for row in rows:
+            self._add(row, now)
+
+    def mark_stale(self, user_id: Any) -> None:
+        """Require a recheck of a user whose subscription changed"""
+        user_id = int(user_id)
+        self.period_ends.pop(user_id, None)
+        self.stale.add(user_id)
+
+    def invalidate(self) -> None:
+        """Force a full rebuild on next use"""
+        self.built_at = 0.0
+
+    def sweep(self) -> List[int]:
+        """Remove members whose period has ended and return their IDs"""
+        now = time.time()
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            period_end, user_id = heapq.heappop(self._heap)
+            # Skip heap entries superseded by a later update
+            if self.period_ends.get(user_id) == period_end:
+                del self.period_ends[user_id]
+                expired.append(user_id)
+        return expired
+
+    def split(self, user_ids: Iterable[Any]) -> Tuple[List[Any], List[Any]]:
+        """
+        Split user IDs into those known to be active and those that need a recheck.
+
+        Returns:
+            Tuple of (active, stale) user IDs, in input order
+        """
+        active, stale = [], []
+        for user_id in user_ids:
+            key = int(user_id)
+            if key in self.stale:
+                stale.append(user_id)
+            elif key in self.period_ends:
+                active.append(user_id)
+        return active, stale
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return set size, pending rechecks and age"""
+        return {
+            "active_users": len(self.period_ends),
+            "stale_users": len(self.stale),
+            "age_seconds": round(time.time() - self.built_at, 1) if self.built_at else None,
+        }
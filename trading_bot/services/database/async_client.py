@@ -0,0 +1,255 @@
+"""
+Non-blocking data access for Database: a pooled async PostgREST client and per-query latency stats
+"""
+
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from trading_bot.services.database.instrumentation import add_payload_bytes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_TIMEOUT = 10.0
+
+
+class PostgrestError(Exception):
+    """Raised when PostgREST answers with an error status"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"PostgREST error {status_code}: {message}")
+        self.status_code = status_code
+
+
+class APIResponse:
+    """Query result with the same `data` and `count` attributes as supabase-py responses"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"APIResponse(data={self.data!r}, count={self.count!r})"
+
+
+class QueryStats:
+    """Latency of every query, aggregated per table and operation"""
+
+    def __init__(self):
+        self.queries: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def record(self, table: str, operation: str, seconds: float, ok: bool = True) -> None:
+        entry = self.queries.setdefault((table, operation), {
+            "count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0
+        })
+        entry["count"] += 1
+        entry["total_seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        entry["last_seconds"] = seconds
+        if not ok:
+            entry["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return count and average/max/last latency in milliseconds per table and operation"""
+        stats = {}
+        for (table, operation), entry in sorted(self.queries.items()):
+            stats[f"{table}.{operation}"] = {
+                "count": int(entry["count"]),
+                "errors": int(entry["errors"]),
+                "avg_ms": round(entry["total_seconds"] / entry["count"] * 1000, 2) if entry["count"] else 0.0,
+                "max_ms": round(entry["max_seconds"] * 1000, 2),
+                "last_ms": round(entry["last_seconds"] * 1000, 2),
+            }
+        return stats
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _quote(value: Any) -> str:
+    # Values containing PostgREST reserved characters must be double-quoted inside lists
+    text = _format_value(value)
+    if any(ch in text for ch in ',.:()" '):
+        return '"' + text.replace('"', '\\"') + '"'
+    return text
+
+
+class AsyncQuery:
+    """
+    Query builder covering the subset of the supabase-py interface used by Database.
+
+    Filters and modifiers are accumulated and sent as one request by `execute()`.
+    """
+
+    def __init__(self, client: "AsyncPostgrestClient", table: str):
+        self.client = client
+        self.table = table
+        self.method = "GET"
+        self.operation = "select"
+        self.params: List[Tuple[str, str]] = []
+        self.body: Any = None
+        self.prefer: List[str] = []
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "AsyncQuery":
+        self.params.append(("select", columns))
+        if count:
+            self.prefer.append(f"count={count}")
+        return self
+
+    def insert(self, data: Any) -> "AsyncQuery":
+        self.method, self.operation, self.body = "POST", "insert", data
+        self.prefer.append("return=representation")
+        return self
+
+    def update(self, data: Dict[str, Any]) -> "AsyncQuery":
+        self.method, self.operation, self.body = "PATCH", "update", data
+        self.prefer.append("return=representation")
+        return self
+
+    def delete(self) -> "AsyncQuery":
+        self.method, self.operation = "DELETE", "delete"
+        self.prefer.append("return=representation")
+        return self
+
+    def _filter(self, column: str, operator: str, value: Any) -> "AsyncQuery":
+        self.params.append((column, f"{operator}.{_format_value(value)}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "AsyncQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "AsyncQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "AsyncQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "AsyncQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "AsyncQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "AsyncQuery":
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: List[Any]) -> "AsyncQuery":
+        self.params.append((column, "in.(" + ",".join(_quote(v) for v in values) + ")"))
+        return self
+
+    def or_(self, filters: str) -> "AsyncQuery":
+        self.params.append(("or", f"({filters})"))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "AsyncQuery":
+        self.params.append(("order", f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    def limit(self, size: int) -> "AsyncQuery":
+        self.params.append(("limit", str(int(size))))
+        return self
+
+    async def execute(self) -> APIResponse:
+        """Send the query and return its rows"""
+        return await self.client.request(self)
+
+
+class AsyncPostgrestClient:
+    """
+    Pooled async client for the Supabase PostgREST endpoint.
+
+    One httpx.AsyncClient, with HTTP/2 when the `h2` package is installed,
+    is shared by all queries so connections are reused instead of being
+    opened per request, and no query blocks the event loop.
+    """
+
+    def __init__(self, supabase_url: str, supabase_key: str, max_connections: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT, stats: Optional[QueryStats] = None,
+                 on_write: Optional[Callable[[str, str, List[Dict[str, Any]]], None]] = None):
+        """
+        Initialize the client.
+
+        Args:
+            supabase_url: Supabase project URL
+            supabase_key: Supabase API key
+            max_connections: Size of the connection pool
+            timeout: Request timeout in seconds
+            stats: Latency recorder shared with other clients
+            on_write: Called with (table, operation, rows) after every successful write
+        """
+        self.base_url = supabase_url.rstrip("/") + "/rest/v1"
+        self.headers = {
+            "apikey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+            "Content-Type": "application/json",
+        }
+        self.max_connections = int(max_connections or os.getenv("DB_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS))
+        self.timeout = timeout
+        self.stats = stats or QueryStats()
+        self.on_write = on_write
+        self.http2 = False
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool belongs to the running event loop
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            try:
+                self._client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers, http2=True,
+                                                 limits=limits, timeout=self.timeout)
+                self.http2 = True
+            except ImportError:
+                logger.info("h2 is not installed, using HTTP/1.1 for PostgREST")
+                self._client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers,
+                                                 limits=limits, timeout=self.timeout)
+        return self._client
+
+    def table(self, name: str) -> AsyncQuery:
+        """Start a query on a table"""
+        return AsyncQuery(self, name)
+
+    async def request(self, query: AsyncQuery) -> APIResponse:
+        """Execute a built query and record its latency"""
+        headers = {"Prefer": ",".join(query.prefer)} if query.prefer else None
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await self._get_client().request(
+                query.method, f"/{query.table}", params=query.params, json=query.body, headers=headers
+            )
+            if response.status_code >= 400:
+                raise PostgrestError(response.status_code, response.text)
+            ok = True
+        finally:
+            self.stats.record(query.table, query.operation, time.perf_counter() - started, ok)
+
+        add_payload_bytes(len(response.content))
+        data = response.json() if response.content else []
+        count = None
+        content_range = response.headers.get("content-range")
+        if content_range and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            count = int(total) if total.isdigit() else None
+
+        if self.on_write is not None and query.method != "GET" and isinstance(data, list):
+            try:
+                self.on_write(query.table, query.operation, data)
+            except Exception as e:
+                logger.error(f"Error in write hook for {query.table}.{query.operation}: {str(e)}")
+        return APIResponse(data, count)
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
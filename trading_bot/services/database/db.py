@@ -1,5 +1,6 @@
 from supabase import create_client, Client
 import redis
+import redis.asyncio as aioredis
 import logging
 import os
 from typing import Dict, List, Any, Optional
@@ -10,9 +11,24 @@ from datetime import timezone
 import traceback
 import json
 import time
+import asyncio
+
+from trading_bot.services.database.subscriber_index import SubscriberIndex
+from trading_bot.services.database.async_client import AsyncPostgrestClient, PostgrestError, QueryStats
+from trading_bot.services.database.local_mirror import LocalMirror, MIRROR_TABLES
+from trading_bot.services.database.memory_backend import MemoryBackend, generate_dataset
+from trading_bot.services.database.instrumentation import DatabaseInstrumentation, add_payload_bytes, instrumented
+from trading_bot.services.database.subscription_cache import SubscriptionCache, _period_end_timestamp
+from trading_bot.services.database.active_subscribers import ActiveSubscriberSet
+from trading_bot.utils.bounded_cache import BoundedCache
+from trading_bot.utils.instrument_registry import INSTRUMENTS, INSTRUMENT_TIMEFRAME_MAP
+from trading_bot.utils.timeframes import STYLE_TIMEFRAME_MAP, normalize_timeframe, timeframe_to_style
 
 logger = logging.getLogger(__name__)
 
+# User IDs per bulk subscription query, keeping the PostgREST URL well under server limits
+ACTIVE_FILTER_CHUNK_SIZE = 500
+
 class Database:
     def __init__(self):
         """Initialize the database connection."""
@@ -21,20 +37,66 @@ class Database:
         self.supabase_key = os.getenv("SUPABASE_KEY")
         self.redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
         
-        # Local caching
-        self.cache = {}
-        self.cache_expiry = {}
+        # Local caching, bounded so the fallback without Redis cannot grow without limit
         self.default_cache_ttl = 3600  # Default cache TTL in seconds
+        self.cache = BoundedCache(
+            max_items=int(os.getenv("LOCAL_CACHE_MAX_ITEMS", 10000)),
+            max_bytes=int(os.getenv("LOCAL_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+            ttl=self.default_cache_ttl,
+            sizeof=lambda value: len(json.dumps(value, default=str)),
+            name="db.local_cache"
+        )
         
         # Flags
         self.use_mock_data = os.getenv("USE_MOCK_DATA", "false").lower() == "true"
         self.using_redis = False
         self.subscriber_cache = {}
         
+        # Inverted index of subscriber_preferences for match_subscribers, kept in sync by
+        # our own writes; built on first use, then rebuilt in the background once older
+        # than the reconcile interval, or periodically after start_subscriber_index_sync()
+        self.subscriber_index = SubscriberIndex(self._normalize_timeframe)
+        self.subscriber_index_reconcile_interval = int(os.getenv("SUBSCRIBER_INDEX_RECONCILE_SECONDS", 300))
+        self._subscriber_index_task = None
+        self._subscriber_index_refresh = None
+        
+        # Call counts, latency histograms, rows and payload bytes per method, plus the slow-query log
+        self.instrumentation = DatabaseInstrumentation()
+        
+        # Async clients used by the coroutine methods, so queries never block the event loop
+        self.query_stats = QueryStats()
+        self.db_client = None
+        self.aredis = None
+        
+        # Subscription rows per user, invalidated by Stripe events and our own writes
+        self.subscription_cache = SubscriptionCache()
+        
+        # Users with an active subscription, so broadcasts filter recipients without a query per user
+        self.active_subscribers = ActiveSubscriberSet()
+        self.active_subscribers_enabled = os.getenv("ACTIVE_SUBSCRIBER_SET", "true").lower() == "true"
+        self.active_subscribers_refresh_interval = int(os.getenv("ACTIVE_SUBSCRIBERS_REFRESH_SECONDS", 300))
+        self.active_subscribers_sweep_interval = int(os.getenv("ACTIVE_SUBSCRIBERS_SWEEP_SECONDS", 60))
+        self._active_subscribers_task = None
+        
+        # Local SQLite mirror of the tables on the signal path, kept current by
+        # updated_at polling and write-through of our own writes
+        self.mirror = None
+        self.mirror_poll_interval = int(os.getenv("LOCAL_MIRROR_POLL_SECONDS", 10))
+        self.mirror_full_sync_interval = int(os.getenv("LOCAL_MIRROR_FULL_SYNC_SECONDS", 900))
+        self._mirror_full_only = set()
+        self._mirror_task = None
+        
         try:
             # Initialize Supabase client if credentials are provided
             if self.supabase_url and self.supabase_key:
                 self.supabase = create_client(self.supabase_url, self.supabase_key)
+                if os.getenv("LOCAL_MIRROR", "true").lower() == "true":
+                    try:
+                        self.mirror = LocalMirror(os.getenv("LOCAL_MIRROR_PATH", os.path.join("data", "db", "mirror.db")))
+                    except Exception as e:
+                        logger.warning(f"Local mirror unavailable, reading Supabase directly: {str(e)}")
+                self.db_client = AsyncPostgrestClient(self.supabase_url, self.supabase_key, stats=self.query_stats,
+                                                      on_write=self._mirror_write_through)
                 
                 # Test connection - will raise an exception if it fails
                 try:
@@ -63,6 +125,11 @@ class Database:
                 self.redis = redis.from_url(self.redis_url, decode_responses=True)
                 self.redis.ping()  # Test connection
                 self.using_redis = True
+                self.aredis = aioredis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 20))
+                )
                 logger.info("Successfully connected to Redis")
             except Exception as e:
                 logger.warning(f"Redis connection failed: {str(e)}. Using local caching.")
@@ -81,16 +148,12 @@ class Database:
         
         # Validatie constanten
         self.VALID_STYLES = ['test', 'scalp', 'scalp30', 'intraday', 'swing']
-        self.STYLE_TIMEFRAME_MAP = {
-            'test': '1m',
-            'scalp': '15m',
-            'scalp30': '30m',
-            'intraday': '1h',
-            'swing': '4h'
-        }
+        self.STYLE_TIMEFRAME_MAP = STYLE_TIMEFRAME_MAP
         
     def _setup_mock_data(self):
         """Set up mock data for development and testing"""
+        if getattr(self, 'memory_backend', None) is not None:
+            return
         logger.info("Setting up mock data for database")
         
         # Mock subscribers
@@ -158,30 +221,47 @@ class Database:
                 "id": 1,
                 "user_id": 12345,
                 "subscription_type": "premium",
-                "status": "active",
-                "current_period_end": (datetime.datetime.now() + datetime.timedelta(days=30)).isoformat(),
+                "subscription_status": "active",
+                "current_period_end": (datetime.datetime.now(timezone.utc) + datetime.timedelta(days=30)).isoformat(),
                 "created_at": "2023-01-01T00:00:00"
             },
             {
                 "id": 2,
                 "user_id": 67890,
                 "subscription_type": "premium",
-                "status": "active",
-                "current_period_end": (datetime.datetime.now() + datetime.timedelta(days=30)).isoformat(),
+                "subscription_status": "active",
+                "current_period_end": (datetime.datetime.now(timezone.utc) + datetime.timedelta(days=30)).isoformat(),
                 "created_at": "2023-01-01T00:00:00"
             },
             {
                 "id": 3,
                 "user_id": 54321,
                 "subscription_type": "basic",
-                "status": "active",
-                "current_period_end": (datetime.datetime.now() + datetime.timedelta(days=30)).isoformat(),
+                "subscription_status": "active",
+                "current_period_end": (datetime.datetime.now(timezone.utc) + datetime.timedelta(days=30)).isoformat(),
                 "created_at": "2023-01-01T00:00:00"
             }
         ]
         
+        # Serve every query from indexed in-memory tables, so mock mode runs the
+        # normal code paths; MOCK_DATA_USERS replaces the fixtures with a synthetic dataset
+        self.memory_backend = MemoryBackend(stats=self.query_stats)
+        synthetic_users = int(os.getenv("MOCK_DATA_USERS", 0))
+        if synthetic_users:
+            self.memory_backend.load(generate_dataset(synthetic_users, seed=int(os.getenv("MOCK_DATA_SEED", 42))))
+        else:
+            self.memory_backend.load({
+                'subscriber_preferences': self.mock_subscribers,
+                'signal_subscriptions': self.mock_subscribers,
+                'users': self.mock_users,
+                'user_subscriptions': self.mock_subscriptions,
+            })
+        if self.use_mock_data:
+            self.db_client = self.memory_backend
+        
         logger.info("Mock data setup complete")
         
+    @instrumented
     async def match_subscribers(self, signal):
         """Match subscribers to a signal"""
         try:
@@ -202,64 +282,10 @@ class Database:
             
             logger.info(f"Matching subscribers for: market={market}, instrument={instrument}, timeframe={timeframe}")
             
-            # Haal alle abonnees op
-            all_preferences = await self.get_all_preferences()
-            if not all_preferences:
-                logger.warning("No preferences found in database")
-                return []
-            
-            # Normaliseer de timeframe voor vergelijking
-            normalized_timeframe = self._normalize_timeframe(timeframe)
-            logger.info(f"Normalized timeframe: {normalized_timeframe}")
-            
-            # Filter handmatig op basis van de signaalgegevens
-            matched_subscribers = []
-            seen_user_ids = set()  # Bijhouden welke gebruikers we al hebben toegevoegd
-            
-            for pref in all_preferences:
-                # Sla ongeldige voorkeuren over
-                if not isinstance(pref, dict):
-                    logger.warning(f"Skipping invalid preference (not a dict): {pref}")
-                    continue
-                
-                # Normaliseer de timeframe in de voorkeur
-                pref_timeframe = self._normalize_timeframe(pref.get('timeframe', '1h'))
-                
-                # Debug logging
-                logger.info(f"Checking preference: market={pref.get('market')}, instrument={pref.get('instrument')}, timeframe={pref.get('timeframe')} (normalized: {pref_timeframe})")
-                
-                # Controleer of de voorkeuren overeenkomen met het signaal
-                # Check for market match
-                market_match = pref.get('market', '').lower() == market.lower()
-                
-                # Check for instrument match - either exact match or 'ALL'
-                instrument_match = (pref.get('instrument', '') == instrument) or (pref.get('instrument', '') == 'ALL')
-                
-                # Check for timeframe match - optional matching
-                timeframe_match = pref_timeframe == normalized_timeframe
-                
-                # If timeframe preference is 'ALL', it matches any signal timeframe
-                if pref.get('timeframe', '') == 'ALL':
-                    timeframe_match = True
-                    
-                # Log match details for debugging
-                logger.info(f"Match results: market={market_match}, instrument={instrument_match}, timeframe={timeframe_match}")
-                
-                # A subscriber matches if market AND (instrument OR ALL) AND (timeframe OR ALL)
-                if market_match and instrument_match:
-                    # Optionally add timeframe matching if needed
-                    # For now we'll consider a match even without matching timeframe
-                    
-                    user_id = pref.get('user_id')
-                    
-                    # Controleer of we deze gebruiker al hebben toegevoegd
-                    if user_id not in seen_user_ids:
-                        # Voeg de gebruiker toe aan de lijst met matches
-                        matched_subscribers.append(pref)
-                        seen_user_ids.add(user_id)  # Markeer deze gebruiker als gezien
-                        logger.info(f"Matched subscriber: user_id={user_id}, market={pref.get('market')}, instrument={pref.get('instrument')}, timeframe={pref.get('timeframe')}")
-                    else:
-                        logger.info(f"Skipping duplicate subscriber: user_id={user_id}, already matched")
+            # Zoek abonnees op via de index in plaats van alle voorkeuren te scannen
+            # A subscriber matches if market AND (instrument OR ALL); timeframe is not required to match
+            index = await self._get_subscriber_index()
+            matched_subscribers = index.match(market, instrument)
             
             # Log het resultaat
             logger.info(f"Found {len(matched_subscribers)} unique matching subscribers")
@@ -272,57 +298,14 @@ class Database:
 
     def _normalize_timeframe(self, timeframe):
         """Normalize timeframe for comparison (e.g., '1' and '1m' should match)"""
-        if not timeframe:
-            return '1h'  # Default
-        
-        try:
-            # Als het een dict is, probeer de waarde op te halen
-            if isinstance(timeframe, dict) and 'timeframe' in timeframe:
-                timeframe = timeframe['timeframe']
-        except:
-            # Als er iets misgaat, gebruik de default
-            return '1h'
-        
-        # Converteer naar string
-        tf_str = str(timeframe).lower()
-        
-        # Verwijder spaties en aanhalingstekens
-        tf_str = tf_str.strip().strip('"\'')
-        
-        # Normaliseer minuten
-        if tf_str in ['1', '1m', '"1m"', "'1m'"]:
-            return '1m'
-        if tf_str in ['5', '5m', '"5m"', "'5m'"]:
-            return '5m'
-        if tf_str in ['15', '15m', '"15m"', "'15m'"]:
-            return '15m'
-        if tf_str in ['30', '30m', '"30m"', "'30m'"]:
-            return '30m'
-        
-        # Normaliseer uren
-        if tf_str in ['60', '1h', '"1h"', "'1h'"]:
-            return '1h'
-        if tf_str in ['120', '2h', '"2h"', "'2h'"]:
-            return '2h'
-        if tf_str in ['240', '4h', '"4h"', "'4h'"]:
-            return '4h'
-        
-        # Normaliseer dagen
-        if tf_str in ['1440', '1d', '"1d"', "'1d'"]:
-            return '1d'
-        
-        # Als geen match, geef de originele waarde terug
-        return tf_str
+        return normalize_timeframe(timeframe)
 
+    @instrumented
     async def get_all_preferences(self):
         """Get all subscriber preferences"""
         try:
-            if self.use_mock_data:
-                logger.info("Using mock data for get_all_preferences")
-                return self.mock_subscribers
-                
             # Haal alle voorkeuren op uit de database
-            response = self.supabase.table('subscriber_preferences').select('*').execute()
+            response = await self.db_client.table('subscriber_preferences').select('*').execute()
             
             if response.data:
                 return response.data
@@ -331,18 +314,195 @@ class Database:
         except Exception as e:
             logger.error(f"Error getting all preferences: {str(e)}")
             return []
+
+    @instrumented
+    async def reconcile_subscriber_index(self) -> bool:
+        """Rebuild the subscriber index from the full subscriber_preferences table"""
+        try:
+            if self._mirror_ready('subscriber_preferences'):
+                preferences = self.mirror.select('subscriber_preferences')
+            else:
+                response = await self.db_client.table('subscriber_preferences').select('*').execute()
+                preferences = response.data or []
+            
+            self.subscriber_index.rebuild(preferences)
+            return True
+        except Exception as e:
+            # Keep serving the previous index rather than dropping every subscriber
+            logger.error(f"Error reconciling subscriber index: {str(e)}")
+            return False
+
+    async def _get_subscriber_index(self) -> SubscriberIndex:
+        """
+        Return the subscriber index, building it on first use.
+        
+        An index older than the reconcile interval is still served while a rebuild runs in
+        the background, so a stale index never puts a full-table read on the signal path.
+        """
+        index = self.subscriber_index
+        if not index.is_built:
+            await self.reconcile_subscriber_index()
+            return index
+        
+        background_sync = self._subscriber_index_task is not None and not self._subscriber_index_task.done()
+        refreshing = self._subscriber_index_refresh is not None and not self._subscriber_index_refresh.done()
+        if (not background_sync and not refreshing and
+                time.time() - index.built_at > self.subscriber_index_reconcile_interval):
+            self._subscriber_index_refresh = asyncio.create_task(self.reconcile_subscriber_index())
+        return index
+
+    def start_subscriber_index_sync(self) -> None:
+        """Start periodic reconciliation of the subscriber index (requires a running event loop)"""
+        if self._subscriber_index_task is not None and not self._subscriber_index_task.done():
+            return
+        
+        async def sync_loop():
+            while True:
+                await self.reconcile_subscriber_index()
+                await asyncio.sleep(self.subscriber_index_reconcile_interval)
+        
+        self._subscriber_index_task = asyncio.create_task(sync_loop())
+        logger.info(f"Subscriber index reconciles every {self.subscriber_index_reconcile_interval}s")
+        
+    def _mirror_ready(self, table: str) -> bool:
+        """Whether reads of a table can be served from the local mirror"""
+        return self.mirror is not None and not self.use_mock_data and self.mirror.is_ready(table)
+
+    def _mirror_write_through(self, table: str, operation: str, rows: List[Dict[str, Any]]) -> None:
+        """Apply the rows returned by one of our own writes to the local mirror"""
+        if self.mirror is None or table not in MIRROR_TABLES:
+            return
+        if operation == 'delete':
+            self.mirror.delete(table, rows)
+        else:
+            self.mirror.upsert(table, rows)
+
+    @instrumented
+    async def sync_mirror(self, full: bool = False) -> bool:
+        """
+        Bring the local mirror up to date.
+
+        Rows changed since a table's updated_at watermark are fetched and merged;
+        a full copy is taken on first use, every `mirror_full_sync_interval`
+        seconds to pick up deletions, or when `full` is set.
+        """
+        if self.mirror is None or self.use_mock_data:
+            return False
+        
+        ok = True
+        loop = asyncio.get_running_loop()
+        for table in MIRROR_TABLES:
+            try:
+                full_synced_at = self.mirror.full_synced_at(table)
+                if full or full_synced_at is None or time.time() - full_synced_at > self.mirror_full_sync_interval:
+                    response = await self.db_client.table(table).select('*').execute()
+                    await loop.run_in_executor(None, self.mirror.replace_all, table, response.data or [])
+                    continue
+                
+                watermark = self.mirror.watermark(table)
+                if not watermark or table in self._mirror_full_only:
+                    continue
+                try:
+                    response = await self.db_client.table(table).select('*') \
+                        .gt('updated_at', watermark).order('updated_at').execute()
+                except PostgrestError as e:
+                    # Tables without updated_at stay current through full copies and write-through
+                    logger.warning(f"Incremental sync of {table} unavailable, using full copies only: {str(e)}")
+                    self._mirror_full_only.add(table)
+                    continue
+                if response.data:
+                    self.mirror.upsert(table, response.data)
+                    if table == 'user_subscriptions':
+                        # Changed by another process, e.g. the Stripe webhook
+                        for row in response.data:
+                            self._subscription_changed(row['user_id'])
+            except Exception as e:
+                # The mirror keeps serving its last copy
+                logger.error(f"Error syncing local mirror of {table}: {str(e)}")
+                ok = False
+        return ok
+
+    def start_mirror_sync(self) -> None:
+        """Start polling Supabase for changes to the mirrored tables (requires a running event loop)"""
+        if self.mirror is None or self.use_mock_data:
+            return
+        if self._mirror_task is not None and not self._mirror_task.done():
+            return
+        
+        async def sync_loop():
+            while True:
+                await self.sync_mirror()
+                await asyncio.sleep(self.mirror_poll_interval)
+        
+        self._mirror_task = asyncio.create_task(sync_loop())
+        logger.info(f"Local mirror polls every {self.mirror_poll_interval}s, "
+                    f"full copy every {self.mirror_full_sync_interval}s")
+        
+    async def _redis(self, command: str, *args, **kwargs):
+        """Run a command on the async Redis pool and record its latency"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await getattr(self.aredis, command)(*args, **kwargs)
+            if isinstance(result, (bytes, str)):
+                add_payload_bytes(len(result))
+            ok = True
+            return result
+        finally:
+            self.query_stats.record("redis", command, time.perf_counter() - started, ok)
+
+    def get_query_stats(self) -> Dict[str, Any]:
+        """Return per-query latency of the async PostgREST and Redis clients"""
+        return {
+            "http2": bool(self.db_client and self.db_client.http2),
+            "queries": self.query_stats.get_stats(),
+            "methods": self.instrumentation.get_stats(),
+            "subscription_cache": self.subscription_cache.get_stats(),
+            "active_subscribers": self.active_subscribers.get_stats(),
+            "local_cache": self.cache.get_stats(),
+            "local_mirror": self.mirror.get_stats() if self.mirror is not None else None,
+        }
+
+    def invalidate_subscription(self, user_id: int = None, customer_id: str = None) -> None:
+        """
+        Drop cached subscription state after it changed outside this process's writes.
+        Without a user ID or a known customer ID the whole cache is cleared.
+        """
+        if user_id is None and customer_id:
+            user_id = self.subscription_cache.invalidate_customer(customer_id)
+        if user_id is not None:
+            self._subscription_changed(user_id)
+        else:
+            self.subscription_cache.clear()
+            self.active_subscribers.invalidate()
+
+    def _subscription_changed(self, user_id: int) -> None:
+        """Drop a user's cached subscription and recheck their active status on next use"""
+        self.subscription_cache.invalidate(user_id)
+        self.active_subscribers.mark_stale(user_id)
+
+    async def close(self) -> None:
+        """Close the pooled async connections"""
+        if self.db_client:
+            await self.db_client.close()
+        if self.aredis:
+            await self.aredis.close()
+        if self.mirror is not None:
+            self.mirror.close()
         
+    @instrumented
     async def get_cached_sentiment(self, symbol: str) -> str:
         """Get cached sentiment analysis"""
-        if self.redis:
-            return self.redis.get(f"sentiment:{symbol}")
+        if self.aredis:
+            return await self._redis("get", f"sentiment:{symbol}")
         return None
         
+    @instrumented
     async def cache_sentiment(self, symbol: str, sentiment: str) -> None:
         """Cache sentiment analysis"""
         try:
-            if self.redis:
-                self.redis.set(f"sentiment:{symbol}", sentiment, ex=self.CACHE_TIMEOUT)
+            if self.aredis:
+                await self._redis("set", f"sentiment:{symbol}", sentiment, ex=self.CACHE_TIMEOUT)
         except Exception as e:
             logger.error(f"Error caching sentiment: {str(e)}")
             
@@ -366,6 +526,7 @@ class Database:
         
         return True 
 
+    @instrumented
     async def save_preferences(self, user_id: int, market: str, instrument: str, style: str):
         """Save user preferences with validation"""
         try:
@@ -385,22 +546,25 @@ class Database:
                 'style': style  # Keep style as database still requires it
             }
             
-            response = self.supabase.table('subscriber_preferences').insert(data).execute()
+            response = await self.db_client.table('subscriber_preferences').insert(data).execute()
+            for row in (response.data or []):
+                self.subscriber_index.add(row)
             return response
             
         except Exception as e:
             logger.error(f"Error saving preferences: {str(e)}")
             raise 
 
+    @instrumented
     async def get_subscribers(self, instrument: str = None, timeframe: str = None):
         """Get all subscribers for an instrument and timeframe"""
         # If no instrument is provided, get all subscribers
         if not instrument:
-            query = self.supabase.table('subscribers').select('*')
-            return query.execute()
+            query = self.db_client.table('subscribers').select('*')
+            return await query.execute()
             
         # Filter by instrument if provided
-        query = self.supabase.table('subscriber_preferences')\
+        query = self.db_client.table('subscriber_preferences')\
             .select('*')\
             .eq('instrument', instrument)
         
@@ -410,13 +574,14 @@ class Database:
             normalized_timeframe = self._normalize_timeframe_for_db(timeframe)
             query = query.eq('timeframe', normalized_timeframe)
         
-        return query.execute()
+        return await query.execute()
 
+    @instrumented
     async def get_user_preferences(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user preferences from database"""
         try:
             # Haal voorkeuren op uit de database
-            response = self.supabase.table('subscriber_preferences').select('*').eq('user_id', user_id).execute()
+            response = await self.db_client.table('subscriber_preferences').select('*').eq('user_id', user_id).execute()
             
             if response.data:
                 return response.data
@@ -426,6 +591,7 @@ class Database:
             logger.error(f"Error getting user preferences: {str(e)}")
             return []
 
+    @instrumented
     async def save_preference(self, user_id: int, market: str, instrument: str, timeframe: str) -> bool:
         """Save user preference to database"""
         try:
@@ -445,9 +611,10 @@ class Database:
             }
             
             # Sla op in de database
-            response = self.supabase.table('subscriber_preferences').insert(new_preference).execute()
+            response = await self.db_client.table('subscriber_preferences').insert(new_preference).execute()
             
             if response.data:
+                self.subscriber_index.add(response.data[0])
                 logger.info(f"Saved preference for user {user_id}: {instrument} ({timeframe}, style: {style})")
                 return True
             else:
@@ -457,13 +624,15 @@ class Database:
             logger.error(f"Error saving preference: {str(e)}")
             return False
 
+    @instrumented
     async def delete_preference(self, user_id: int, instrument: str) -> bool:
         """Delete user preference from database"""
         try:
             # Verwijder de voorkeur
-            response = self.supabase.table('subscriber_preferences').delete().eq('user_id', user_id).eq('instrument', instrument).execute()
+            response = await self.db_client.table('subscriber_preferences').delete().eq('user_id', user_id).eq('instrument', instrument).execute()
             
             if response.data:
+                self.subscriber_index.remove_user(user_id, instrument)
                 logger.info(f"Deleted preference for user {user_id}: {instrument}")
                 return True
             else:
@@ -473,13 +642,15 @@ class Database:
             logger.error(f"Error deleting preference: {str(e)}")
             return False
 
+    @instrumented
     async def delete_all_preferences(self, user_id: int) -> bool:
         """Delete all preferences for a user"""
         try:
             # Delete all preferences for this user using Supabase
-            response = self.supabase.table('subscriber_preferences').delete().eq('user_id', user_id).execute()
+            response = await self.db_client.table('subscriber_preferences').delete().eq('user_id', user_id).execute()
             
             if response.data:
+                self.subscriber_index.remove_user(user_id)
                 logger.info(f"Deleted all preferences for user {user_id}")
                 return True
             else:
@@ -489,13 +660,15 @@ class Database:
             logger.error(f"Error deleting preferences: {str(e)}")
             return False
 
+    @instrumented
     async def delete_preference_by_id(self, preference_id: int) -> bool:
         """Delete a specific preference by ID"""
         try:
-            response = self.supabase.table('subscriber_preferences').delete().eq('id', preference_id).execute()
+            response = await self.db_client.table('subscriber_preferences').delete().eq('id', preference_id).execute()
             
             # Check if any rows were affected
             if response and response.data:
+                self.subscriber_index.remove_id(preference_id)
                 logger.info(f"Successfully deleted preference with ID {preference_id}")
                 return True
             else:
@@ -506,10 +679,11 @@ class Database:
             logger.error(f"Error deleting preference by ID: {str(e)}")
             return False
             
+    @instrumented
     async def get_subscriber_preferences(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all signal preferences for a specific user"""
         try:
-            response = self.supabase.table('subscriber_preferences').select('*').eq('user_id', user_id).execute()
+            response = await self.db_client.table('subscriber_preferences').select('*').eq('user_id', user_id).execute()
             
             if response and response.data:
                 logger.info(f"Found {len(response.data)} preferences for user {user_id}")
@@ -522,6 +696,7 @@ class Database:
             logger.error(f"Error getting subscriber preferences: {str(e)}")
             return []
             
+    @instrumented
     async def add_subscriber_preference(self, user_id: int, market: str, instrument: str, timeframe: str = None) -> bool:
         """Add a new signal preference for a user
         
@@ -536,15 +711,12 @@ class Database:
         """
         try:
             # Check if preference already exists
-            existing = self.supabase.table('subscriber_preferences').select('*').eq('user_id', user_id).eq('instrument', instrument).execute()
+            existing = await self.db_client.table('subscriber_preferences').select('*').eq('user_id', user_id).eq('instrument', instrument).execute()
             
             if existing and existing.data:
                 logger.info(f"User {user_id} already has a preference for {instrument}")
                 return True
             
-            # Import here to avoid circular imports
-            from trading_bot.services.telegram_service.bot import INSTRUMENT_TIMEFRAME_MAP, STYLE_TIMEFRAME_MAP
-            
             # Get the instrument's default timeframe from the mapping if not provided
             if timeframe is None or timeframe.upper() == "ALL":
                 instrument_timeframe = INSTRUMENT_TIMEFRAME_MAP.get(instrument)
@@ -583,9 +755,10 @@ class Database:
             logger.info(f"Inserting preference data: {new_preference}")
             
             # Insert new preference
-            response = self.supabase.table('subscriber_preferences').insert(new_preference).execute()
+            response = await self.db_client.table('subscriber_preferences').insert(new_preference).execute()
             
             if response and response.data:
+                self.subscriber_index.add(response.data[0])
                 logger.info(f"Successfully added preference for user {user_id}: {instrument} (original timeframe: {timeframe}, stored as: {fixed_timeframe}, style: {style})")
                 return True
             else:
@@ -625,59 +798,16 @@ class Database:
         Returns:
             str: The corresponding trading style ('test', 'scalp', 'intraday', 'swing')
         """
-        if not timeframe:
-            return 'intraday'  # Default
-        
-        # Normalize the input by removing spaces and converting to lowercase
-        tf_str = str(timeframe).strip().lower()
-        
-        # Handle M15 format (MT4/MT5 style)
-        if tf_str in ['m15'] or timeframe in ['M15']:
-            return 'scalp'
-        
-        # Handle M30 format (MT4/MT5 style)
-        if tf_str in ['m30'] or timeframe in ['M30']:
-            return 'intraday'
-        
-        # Handle H1 format (MT4/MT5 style)
-        if tf_str in ['h1'] or timeframe in ['H1']:
-            return 'intraday'
-        
-        # Handle H4 format (MT4/MT5 style)
-        if tf_str in ['h4'] or timeframe in ['H4']:
-            return 'swing'
-        
-        # Handle 15m format (TradingView style)
-        if tf_str in ['15m', '15min']:
-            return 'scalp'
-        
-        # Handle 30m format (TradingView style)
-        if tf_str in ['30m', '30min']:
-            return 'intraday'
-        
-        # Handle 1h format (TradingView style)
-        if tf_str in ['1h', '60m']:
-            return 'intraday'
-        
-        # Handle 4h format (TradingView style)
-        if tf_str in ['4h', '240m']:
-            return 'swing'
-        
-        # Special case - test timeframe (1m)
-        if tf_str in ['1m', 'm1']:
-            return 'test'
-        
-        # If no match found, default to 'intraday'
-        logger.warning(f"Could not map timeframe '{timeframe}' to a style, defaulting to 'intraday'")
-        return 'intraday'
+        return timeframe_to_style(timeframe)
 
+    @instrumented
     async def execute_query(self, query: str) -> List[Dict[str, Any]]:
         """Execute a query on Supabase (simplified version)"""
         try:
             logger.info(f"Executing query: {query}")
             
             # Eenvoudige implementatie: haal alle subscriber_preferences op en filter handmatig
-            result = self.supabase.table('subscriber_preferences').select('*').execute()
+            result = await self.db_client.table('subscriber_preferences').select('*').execute()
             
             # Log het resultaat
             logger.info(f"Raw query result: {result.data}")
@@ -711,6 +841,7 @@ class Database:
             logger.exception(e)
             return []
 
+    @instrumented
     async def get_all_users(self):
         """Get all users from the database"""
         try:
@@ -733,25 +864,23 @@ class Database:
             # Fallback naar test gebruiker
             return [{'user_id': 2004519703}]  # Vervang met je eigen user ID 
 
+    @instrumented
     async def get_user_subscription(self, user_id: int):
         """Get user subscription information"""
         try:
-            if self.use_mock_data:
-                logger.info(f"Using mock data for get_user_subscription: {user_id}")
-                for subscription in self.mock_subscriptions:
-                    if subscription["user_id"] == user_id:
-                        return subscription
-                return None
+            found, subscription = self.subscription_cache.get(user_id)
+            if found:
+                return subscription
                 
-            response = self.supabase.table('user_subscriptions').select('*').eq('user_id', user_id).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            else:
-                return None
+            response = await self.db_client.table('user_subscriptions').select('*').eq('user_id', user_id).execute()
+            subscription = response.data[0] if response.data else None
+            self.subscription_cache.set(user_id, subscription)
+            return subscription
         except Exception as e:
             logger.error(f"Error getting user subscription: {str(e)}")
             return None
 
+    @instrumented
     async def create_or_update_subscription(self, user_id: int, stripe_customer_id: str = None, 
                                            stripe_subscription_id: str = None, status: str = 'inactive',
                                            subscription_type: str = 'basic', current_period_end: datetime.datetime = None):
@@ -778,10 +907,11 @@ class Database:
             
             if existing:
                 # Update bestaand abonnement
-                response = self.supabase.table('user_subscriptions').update(subscription_data).eq('user_id', user_id).execute()
+                response = await self.db_client.table('user_subscriptions').update(subscription_data).eq('user_id', user_id).execute()
             else:
                 # Maak nieuw abonnement
-                response = self.supabase.table('user_subscriptions').insert(subscription_data).execute()
+                response = await self.db_client.table('user_subscriptions').insert(subscription_data).execute()
+            self._subscription_changed(user_id)
             
             if response.data:
                 logger.info(f"Subscription updated for user {user_id}: {status}")
@@ -793,19 +923,10 @@ class Database:
             logger.error(f"Error updating subscription: {str(e)}")
             return False
     
+    @instrumented
     async def is_user_subscribed(self, user_id: int) -> bool:
         """Check if a user has an active subscription"""
         try:
-            if self.use_mock_data:
-                logger.info(f"Using mock data for is_user_subscribed: {user_id}")
-                for subscription in self.mock_subscriptions:
-                    if subscription["user_id"] == user_id and subscription["status"] == "active":
-                        # Check if subscription is still valid
-                        end_date = datetime.datetime.fromisoformat(subscription["current_period_end"])
-                        if end_date > datetime.datetime.now():
-                            return True
-                return False
-                
             subscription = await self.get_user_subscription(user_id)
             if not subscription:
                 return False
@@ -826,6 +947,8 @@ class Database:
                 except:
                     # If parsing fails, assume subscription is expired
                     return False
+            if current_period_end.tzinfo is None:
+                current_period_end = current_period_end.replace(tzinfo=timezone.utc)
             
             # Compare with current time
             current_time = datetime.datetime.now(timezone.utc)
@@ -838,6 +961,7 @@ class Database:
             logger.error(f"Error checking if user is subscribed: {str(e)}")
             return False
             
+    @instrumented
     async def has_payment_failed(self, user_id: int) -> bool:
         """Check if user's subscription payment has failed"""
         try:
@@ -857,6 +981,113 @@ class Database:
             logger.error(f"Error checking payment failure status: {str(e)}")
             return False
             
+    async def _query_active_subscriptions(self, user_ids: List[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch active subscription rows, for all users or only for `user_ids`.
+        Large ID lists are split into chunks that are queried concurrently.
+        """
+        def query():
+            return self.db_client.table('user_subscriptions').select('user_id,current_period_end') \
+                .eq('subscription_status', 'active')
+        
+        chunk_size = ACTIVE_FILTER_CHUNK_SIZE
+        if self._mirror_ready('user_subscriptions'):
+            filters = {'subscription_status': 'active'}
+            if user_ids is None:
+                return self.mirror.select('user_subscriptions', filters)
+            return [row for i in range(0, len(user_ids), chunk_size)
+                    for row in self.mirror.select('user_subscriptions', filters, 'user_id', user_ids[i:i + chunk_size])]
+        
+        if user_ids is None:
+            response = await query().execute()
+            return response.data or []
+        
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+        responses = await asyncio.gather(*(query().in_('user_id', chunk).execute() for chunk in chunks))
+        return [row for response in responses for row in (response.data or [])]
+
+    @instrumented
+    async def refresh_active_subscribers(self) -> bool:
+        """Rebuild the active subscriber set from all active subscriptions"""
+        try:
+            self.active_subscribers.rebuild(await self._query_active_subscriptions())
+            return True
+        except Exception as e:
+            # Keep serving the previous set; stale users are still rechecked per call
+            logger.error(f"Error refreshing active subscribers: {str(e)}")
+            return False
+
+    @instrumented
+    async def filter_active_subscribers(self, user_ids: List[int]) -> List[int]:
+        """
+        Return the users in `user_ids` with an active, unexpired subscription whose
+        payment has not failed, in input order.
+
+        Answered from the in-memory active subscriber set when enabled; only users
+        whose subscription changed since the last refresh are rechecked. Otherwise
+        all users are checked with one bulk query, which is also the fallback
+        when the set cannot be built or rechecked.
+
+        Raises:
+            Exception: When the bulk query fails too, so callers can retry
+                instead of broadcasting to nobody
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        if self.active_subscribers_enabled:
+            try:
+                active_set = self.active_subscribers
+                background_sync = self._active_subscribers_task is not None and not self._active_subscribers_task.done()
+                if not active_set.is_built or (not background_sync and
+                                               time.time() - active_set.built_at > self.active_subscribers_refresh_interval):
+                    await self.refresh_active_subscribers()
+                
+                if active_set.is_built:
+                    _, stale = active_set.split(user_ids)
+                    if stale:
+                        active_set.update(stale, await self._query_active_subscriptions(stale))
+                    return active_set.split(user_ids)[0]
+                logger.warning("Active subscriber set unavailable, checking subscribers with a bulk query")
+            except Exception as e:
+                logger.error(f"Error filtering active subscribers from the set, using a bulk query: {str(e)}")
+        
+        now = time.time()
+        active = {
+            int(row['user_id']) for row in await self._query_active_subscriptions(user_ids)
+            if (_period_end_timestamp(row.get('current_period_end')) or 0) > now
+        }
+        return [user_id for user_id in user_ids if int(user_id) in active]
+
+    def start_active_subscriber_sync(self) -> None:
+        """Start the sweeper that expires and refreshes the active subscriber set (requires a running event loop)"""
+        if not self.active_subscribers_enabled:
+            return
+        if self._active_subscribers_task is not None and not self._active_subscribers_task.done():
+            return
+        
+        async def sweep_loop():
+            await self.refresh_active_subscribers()
+            while True:
+                await asyncio.sleep(self.active_subscribers_sweep_interval)
+                if time.time() - self.active_subscribers.built_at > self.active_subscribers_refresh_interval:
+                    await self.refresh_active_subscribers()
+                    continue
+                # Users whose period ended may already have renewed
+                expired = self.active_subscribers.sweep()
+                if expired:
+                    try:
+                        self.active_subscribers.update(expired, await self._query_active_subscriptions(expired))
+                    except Exception as e:
+                        logger.error(f"Error rechecking {len(expired)} expired subscribers: {str(e)}")
+                        for user_id in expired:
+                            self.active_subscribers.mark_stale(user_id)
+        
+        self._active_subscribers_task = asyncio.create_task(sweep_loop())
+        logger.info(f"Active subscribers sweep every {self.active_subscribers_sweep_interval}s, "
+                    f"refresh every {self.active_subscribers_refresh_interval}s")
+
+    @instrumented
     async def get_user_subscription_type(self, user_id: int):
         """Haal het type abonnement op voor een gebruiker"""
         try:
@@ -870,6 +1101,7 @@ class Database:
             logger.error(f"Error getting subscription type: {str(e)}")
             return None
 
+    @instrumented
     async def save_user(self, user_id: int, first_name: str, last_name: str = None, username: str = None) -> bool:
         """Sla een gebruiker op in de database"""
         try:
@@ -881,6 +1113,7 @@ class Database:
             logger.error(f"Error saving user: {str(e)}")
             return False
 
+    @instrumented
     async def save_user_subscription(self, user_id: int, subscription_type: str, start_date: datetime.datetime, end_date: datetime.datetime) -> bool:
         """Save a user subscription with custom start and end dates"""
         try:
@@ -904,10 +1137,11 @@ class Database:
             
             if existing:
                 # Update existing subscription
-                response = self.supabase.table('user_subscriptions').update(subscription_data).eq('user_id', user_id).execute()
+                response = await self.db_client.table('user_subscriptions').update(subscription_data).eq('user_id', user_id).execute()
             else:
                 # Create new subscription
-                response = self.supabase.table('user_subscriptions').insert(subscription_data).execute()
+                response = await self.db_client.table('user_subscriptions').insert(subscription_data).execute()
+            self._subscription_changed(user_id)
             
             if response.data:
                 logger.info(f"Subscription saved for user {user_id}: {status}")
@@ -919,6 +1153,7 @@ class Database:
             logger.error(f"Error saving subscription: {str(e)}")
             return False
 
+    @instrumented
     async def set_payment_failed(self, user_id: int) -> bool:
         """Set a user's subscription status to payment failed (past_due)"""
         try:
@@ -938,10 +1173,11 @@ class Database:
             
             if existing:
                 # Update existing subscription
-                response = self.supabase.table('user_subscriptions').update(subscription_data).eq('user_id', user_id).execute()
+                response = await self.db_client.table('user_subscriptions').update(subscription_data).eq('user_id', user_id).execute()
             else:
                 # Create new subscription
-                response = self.supabase.table('user_subscriptions').insert(subscription_data).execute()
+                response = await self.db_client.table('user_subscriptions').insert(subscription_data).execute()
+            self._subscription_changed(user_id)
             
             if response.data:
                 logger.info(f"Payment failed status set for user {user_id}")
@@ -955,39 +1191,9 @@ class Database:
 
     def _detect_market(self, instrument: str) -> str:
         """Detect market type from instrument name"""
-        instrument = instrument.upper()
-         
-        # Common forex pairs
-        forex_pairs = ["EUR", "USD", "GBP", "JPY", "AUD", "NZD", "CAD", "CHF"]
-         
-        # Check if it's a forex pair (contains two currency codes)
-        for base in forex_pairs:
-            if instrument.startswith(base):
-                for quote in forex_pairs:
-                    if instrument == base + quote:
-                        return "forex"
-         
-        # Check if it's a crypto pair
-        crypto_pairs = ["BTC", "ETH", "XRP", "LTC", "BCH", "EOS", "BNB", "XLM", "ADA", "TRX"]
-        for crypto in crypto_pairs:
-            if crypto in instrument:
-                return "crypto"
-         
-        # Check if it's an index
-        indices = ["SPX", "NDX", "DJI", "FTSE", "DAX", "CAC", "NIKKEI", "HSI"]
-        for index in indices:
-            if index in instrument:
-                return "indices"
-         
-        # Check if it's a commodity
-        commodities = ["GOLD", "SILVER", "OIL", "GAS", "XAU", "XAG", "USOIL"]
-        for commodity in commodities:
-            if commodity in instrument:
-                return "commodities"
-         
-        # Default to forex if we can't determine
-        return "forex" 
+        return INSTRUMENTS.market(instrument)
 
+    @instrumented
     async def subscribe_to_instrument(self, user_id: int, instrument: str, timeframe: str = None) -> bool:
         """Subscribe a user to receive signals for a specific instrument
         
@@ -1011,42 +1217,34 @@ class Database:
             logger.error(f"Error in subscribe_to_instrument: {str(e)}")
             return False
             
+    @instrumented
     async def get_subscribers_for_instrument(self, instrument: str, timeframe: str = None) -> List[int]:
         """Get list of user IDs subscribed to a specific instrument and timeframe"""
         try:
-            if self.use_mock_data:
-                logger.info(f"Using mock data for get_subscribers_for_instrument: {instrument}, {timeframe}")
-                subscribers = []
-                for pref in self.mock_subscribers:
-                    if (pref["instrument"] == instrument or pref["instrument"] == "ALL") and \
-                       (timeframe is None or pref["timeframe"] == timeframe or pref["timeframe"] == "ALL"):
-                        subscribers.append(pref["user_id"])
-                return subscribers
-            
-            # Get subscribers from database
-            query = self.supabase.table('subscriber_preferences').select('user_id')
-            
-            # Filter by instrument (either specific instrument or ALL)
-            query = query.or_(f"instrument.eq.{instrument},instrument.eq.ALL")
-            
-            # Filter by timeframe if specified
-            if timeframe:
-                normalized_timeframe = self._normalize_timeframe(timeframe)
-                query = query.or_(f"timeframe.eq.{normalized_timeframe},timeframe.eq.ALL")
-                
-            response = query.execute()
-            
-            # Extract user IDs
-            subscribers = []
-            if response.data:
-                for pref in response.data:
-                    subscribers.append(pref.get('user_id'))
-                    
-            return list(set(subscribers))  # Return unique user IDs
+            # Resolve via the index: instrument (or ALL) and timeframe (or ALL) in any market
+            index = await self._get_subscriber_index()
+            return index.match_user_ids(instrument, timeframe)
         except Exception as e:
             logger.error(f"Error getting subscribers for instrument: {str(e)}")
             return []
 
+    @instrumented
+    async def get_instrument_subscriber_counts(self) -> Dict[str, int]:
+        """Get the number of users per instrument in signal_subscriptions, the table signals are sent from"""
+        try:
+            if self._mirror_ready('signal_subscriptions'):
+                return self.mirror.count_distinct('signal_subscriptions', 'instrument', 'user_id')
+            
+            response = await self.db_client.table('signal_subscriptions').select('instrument,user_id').execute()
+            users: Dict[str, set] = {}
+            for row in response.data or []:
+                users.setdefault(row.get('instrument'), set()).add(row.get('user_id'))
+            return {instrument: len(user_ids) for instrument, user_ids in users.items() if instrument}
+        except Exception as e:
+            logger.error(f"Error counting subscribers per instrument: {str(e)}")
+            return {}
+
+    @instrumented
     async def add_signal_subscription(self, user_id: int, market: str, instrument: str, timeframe: str = None) -> bool:
         """Add a new signal subscription using the new signal_subscriptions table
         
@@ -1061,15 +1259,12 @@ class Database:
         """
         try:
             # Check if subscription already exists
-            existing = self.supabase.table('signal_subscriptions').select('*').eq('user_id', user_id).eq('instrument', instrument).execute()
+            existing = await self.db_client.table('signal_subscriptions').select('*').eq('user_id', user_id).eq('instrument', instrument).execute()
             
             if existing and existing.data:
                 logger.info(f"User {user_id} already has a subscription for {instrument}")
                 return True
             
-            # Import here to avoid circular imports
-            from trading_bot.services.telegram_service.bot import INSTRUMENT_TIMEFRAME_MAP
-            
             # Get the instrument's default timeframe from the mapping if not provided
             if timeframe is None or timeframe.upper() == "ALL":
                 instrument_timeframe = INSTRUMENT_TIMEFRAME_MAP.get(instrument)
@@ -1092,14 +1287,15 @@ class Database:
                 'market': str(market),
                 'instrument': str(instrument),
                 'timeframe': str(timeframe),  # Use the actual timeframe as is
-                'created_at': current_time
+                'created_at': current_time,
+                'updated_at': current_time
             }
             
             # Log the data being inserted for debugging
             logger.info(f"Inserting subscription data: {new_subscription}")
             
             # Insert new subscription
-            response = self.supabase.table('signal_subscriptions').insert(new_subscription).execute()
+            response = await self.db_client.table('signal_subscriptions').insert(new_subscription).execute()
             
             if response and response.data:
                 logger.info(f"Successfully added subscription for user {user_id}: {instrument} with timeframe: {timeframe}")
@@ -1114,6 +1310,39 @@ class Database:
             traceback.print_exc()  # Print the full traceback for better debugging
             return False
 
+    @instrumented
+    async def delete_signal_subscription(self, subscription_id) -> bool:
+        """Delete a specific signal subscription by ID"""
+        try:
+            response = await self.db_client.table('signal_subscriptions').delete().eq('id', subscription_id).execute()
+            
+            if response and response.data:
+                logger.info(f"Deleted signal subscription with ID {subscription_id}")
+                return True
+            else:
+                logger.warning(f"No signal subscription found with ID {subscription_id}")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting signal subscription: {str(e)}")
+            return False
+
+    @instrumented
+    async def delete_all_signal_subscriptions(self, user_id: int) -> bool:
+        """Delete all signal subscriptions for a user"""
+        try:
+            response = await self.db_client.table('signal_subscriptions').delete().eq('user_id', user_id).execute()
+            
+            if response and response.data:
+                logger.info(f"Deleted all signal subscriptions for user {user_id}")
+                return True
+            else:
+                logger.warning(f"No signal subscriptions found for user {user_id}")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting signal subscriptions: {str(e)}")
+            return False
+
+    @instrumented
     async def get_signal_subscriptions(self, instrument: str, timeframe: str = None) -> List[Dict]:
         """Get all signal subscriptions for a specific instrument, ignoring timeframe
         
@@ -1123,14 +1352,20 @@ class Database:
             
         Returns:
             List[Dict]: List of subscription records with user_id, instrument, timeframe, etc.
+            
+        Raises:
+            Exception: When the subscriptions cannot be read
         """
         try:
             result = []
             
+            if self._mirror_ready('signal_subscriptions'):
+                return self.mirror.select('signal_subscriptions', {'instrument': instrument})
+            
             # Only get subscriptions from the signal_subscriptions table matching instrument
-            query = self.supabase.table('signal_subscriptions').select('*').eq('instrument', instrument)
+            query = self.db_client.table('signal_subscriptions').select('*').eq('instrument', instrument)
             
-            response = query.execute()
+            response = await query.execute()
             
             if response and response.data:
                 result.extend(response.data)
@@ -1141,18 +1376,16 @@ class Database:
             return result
             
         except Exception as e:
+            # Raised so a failed lookup is retried by the signal queue, not read as "no subscribers"
             logger.error(f"Error getting signal subscriptions for instrument {instrument}: {str(e)}")
-            traceback.print_exc()
-            return []
+            raise
 
+    @instrumented
     async def get_all_active_users(self) -> List[Dict]:
         """Get all active users from the database"""
         try:
-            if self.use_mock_data:
-                return self.mock_users
-            
             # Get users from Supabase
-            data = self.supabase.table("users").select("*").eq("is_active", True).execute()
+            data = await self.db_client.table("users").select("*").eq("is_active", True).execute()
             return data.data
         except Exception as e:
             logger.error(f"Error getting active users: {str(e)}")
@@ -1176,6 +1409,7 @@ class Database:
             logger.error(f"Error checking bot instance: {str(e)}")
             return False
 
+    @instrumented
     async def save_signal_page(self, user_id: int, instrument: str, signal_page_data: Dict) -> bool:
         """Save a signal page to persistent storage for later retrieval.
         
@@ -1193,19 +1427,19 @@ class Database:
             
             if self.using_redis:
                 # Store in Redis with 24-hour expiry (86400 seconds)
-                self.redis.setex(key, 86400, json.dumps(signal_page_data))
+                await self._redis("setex", key, 86400, json.dumps(signal_page_data))
                 logger.info(f"Saved signal page for user {user_id}, instrument {instrument} to Redis")
                 return True
             else:
                 # Local cache fallback with 1-hour expiry
-                self.cache[key] = signal_page_data
-                self.cache_expiry[key] = time.time() + 3600  # 1 hour expiry
+                self.cache.set(key, signal_page_data)
                 logger.info(f"Saved signal page for user {user_id}, instrument {instrument} to local cache")
                 return True
         except Exception as e:
             logger.error(f"Error saving signal page: {str(e)}")
             return False
 
+    @instrumented
     async def get_signal_page(self, user_id: int, instrument: str) -> Optional[Dict]:
         """Retrieve a signal page from persistent storage.
         
@@ -1222,15 +1456,16 @@ class Database:
             
             if self.using_redis:
                 # Try to get from Redis
-                data = self.redis.get(key)
+                data = await self._redis("get", key)
                 if data:
                     logger.info(f"Retrieved signal page for user {user_id}, instrument {instrument} from Redis")
                     return json.loads(data)
             else:
                 # Try local cache
-                if key in self.cache and self.cache_expiry.get(key, 0) > time.time():
+                signal_page_data = self.cache.get(key)
+                if signal_page_data is not None:
                     logger.info(f"Retrieved signal page for user {user_id}, instrument {instrument} from local cache")
-                    return self.cache[key]
+                    return signal_page_data
             
             # Not found
             logger.warning(f"Signal page not found for user {user_id}, instrument {instrument}")
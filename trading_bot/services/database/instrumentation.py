@@ -0,0 +1,180 @@
+"""
+Per-method instrumentation of Database: call counts, latency histograms, rows, payload bytes and a slow-query log
+"""
+
+import os
+import time
+import bisect
+import asyncio
+import logging
+import datetime
+import functools
+import contextvars
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets in milliseconds; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+DEFAULT_SLOW_QUERY_MS = 500
+DEFAULT_SLOW_LOG_SIZE = 100
+
+# Bytes received by the clients during the current instrumented call
+_payload_bytes: contextvars.ContextVar = contextvars.ContextVar("db_payload_bytes", default=None)
+
+
+def add_payload_bytes(size: int) -> None:
+    """Attribute response bytes to the instrumented method currently running"""
+    counter = _payload_bytes.get()
+    if counter is not None:
+        counter[0] += size
+
+
+def _count_rows(result: Any) -> Optional[int]:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return 1
+    if result is None:
+        return 0
+    return None
+
+
+class MethodStats:
+    """Aggregates of one instrumented method"""
+
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds", "rows", "payload_bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.payload_bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_seconds / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "rows": self.rows,
+            "payload_bytes": self.payload_bytes,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class DatabaseInstrumentation:
+    """
+    Registry of per-method statistics and recent slow calls.
+
+    Calls slower than `slow_query_ms` are logged as warnings and kept in a
+    bounded slow-query log with their arguments.
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = None, slow_log_size: Optional[int] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            slow_query_ms: Latency from which a call counts as slow
+            slow_log_size: Number of slow calls kept
+        """
+        self.slow_query_ms = float(slow_query_ms or os.getenv("DB_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+        self.methods: Dict[str, MethodStats] = {}
+        self.slow_queries = deque(maxlen=int(slow_log_size or os.getenv("DB_SLOW_QUERY_LOG_SIZE",
+                                                                         DEFAULT_SLOW_LOG_SIZE)))
+
+    def record(self, method: str, seconds: float, result: Any = None, ok: bool = True,
+               payload_bytes: int = 0, args: tuple = (), kwargs: Optional[dict] = None) -> None:
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodStats()
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.payload_bytes += payload_bytes
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        rows = _count_rows(result) if ok else None
+        if rows:
+            stats.rows += rows
+        if not ok:
+            stats.errors += 1
+
+        ms = seconds * 1000
+        if ms >= self.slow_query_ms:
+            call = ", ".join([repr(a) for a in args] + [f"{k}={v!r}" for k, v in (kwargs or {}).items()])
+            if len(call) > 200:
+                call = call[:197] + "..."
+            self.slow_queries.append({
+                "method": method,
+                "ms": round(ms, 2),
+                "args": call,
+                "rows": rows,
+                "payload_bytes": payload_bytes,
+                "ok": ok,
+                "at": datetime.datetime.now().isoformat(),
+            })
+            logger.warning(f"Slow database call {method}({call}) took {ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return statistics per method, most time-consuming first"""
+        ordered = sorted(self.methods.items(), key=lambda item: item[1].total_seconds, reverse=True)
+        return {method: stats.to_dict() for method, stats in ordered}
+
+    def get_slow_queries(self) -> Dict[str, Any]:
+        """Return the threshold and the recent slow calls, newest first"""
+        return {"threshold_ms": self.slow_query_ms, "queries": list(reversed(self.slow_queries))}
+
+    def reset(self) -> None:
+        """Drop all statistics and the slow-query log"""
+        self.methods.clear()
+        self.slow_queries.clear()
+
+
+def instrumented(func: Callable) -> Callable:
+    """
+    Record latency, rows, payload bytes and errors of a Database method in
+    `self.instrumentation`. Works for coroutine and plain methods.
+    """
+    name = func.__name__
+
+    def finish(self, started, counter, token, result, ok, args, kwargs):
+        _payload_bytes.reset(token)
+        # Bytes of nested instrumented calls also count toward the caller
+        add_payload_bytes(counter[0])
+        instrumentation = getattr(self, "instrumentation", None)
+        if instrumentation is not None:
+            instrumentation.record(name, time.perf_counter() - started, result, ok, counter[0], args, kwargs)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            counter = [0]
+            token = _payload_bytes.set(counter)
+            started = time.perf_counter()
+            result, ok = None, False
+            try:
+                result = await func(self, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                finish(self, started, counter, token, result, ok, args, kwargs)
+    else:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            counter = [0]
+            token = _payload_bytes.set(counter)
+            started = time.perf_counter()
+            result, ok = None, False
+            try:
+                result = func(self, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                finish(self, started, counter, token, result, ok, args, kwargs)
+    return wrapper
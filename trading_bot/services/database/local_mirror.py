@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Mirrored tables: (key column, indexed columns, indexes)
+MIRROR_TABLES = {
+    "subscriber_preferences": ("id", ("user_id", "instrument", "timeframe"),
+                               (("instrument", "timeframe"), ("user_id",))),
+    "signal_subscriptions": ("id", ("user_id", "instrument", "timeframe"),
+                             (("instrument", "timeframe"), ("user_id",))),
+    "user_subscriptions": ("user_id", ("subscription_status", "current_period_end"),
+                           (("subscription_status",),)),
+}
+
+
+class LocalMirror:
+    """
+    Local SQLite copy of the Supabase tables on the signal path.
+
+    Each row is stored whole as JSON next to the columns it is looked up by, so
+    reads return the same dictionaries as PostgREST. The mirror is filled by a
+    full copy, kept current by `updated_at` polling and by write-through of our
+    own writes, and survives restarts, so fan-out keeps working while Supabase
+    is slow or unreachable. A table is only served once it was fully copied.
+    """
+
+    def __init__(self, path: str = os.path.join("data", "db", "mirror.db")):
+        """
+        Initialize the mirror.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        statements = [
+            """
+            CREATE TABLE IF NOT EXISTS sync_state (
+                table_name TEXT PRIMARY KEY,
+                watermark TEXT,
+                full_synced_at REAL
+            )
+            """
+        ]
+        for table, (key, columns, indexes) in MIRROR_TABLES.items():
+            key_type = "INTEGER" if key == "user_id" else "TEXT"
+            column_defs = "".join(f", {column}" for column in columns if column != key)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(key {key_type} PRIMARY KEY{column_defs}, updated_at TEXT, data TEXT NOT NULL)"
+            )
+            for index in indexes:
+                statements.append(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(index)} ON {table} ({', '.join(index)})"
+                )
+        self.conn.executescript(";\n".join(statements) + ";")
+        self.conn.commit()
+
+    @staticmethod
+    def _columns(table: str) -> List[str]:
+        key, columns, _ = MIRROR_TABLES[table]
+        return [column for column in columns if column != key]
+
+    def _row_values(self, table: str, row: Dict[str, Any]) -> Optional[tuple]:
+        key = row.get(MIRROR_TABLES[table][0])
+        if key is None:
+            return None
+        values = [key]
+        for column in self._columns(table):
+            value = row.get(column)
+            values.append(str(value) if column == "current_period_end" and value is not None else value)
+        values.append(row.get("updated_at"))
+        values.append(json.dumps(row, separators=(",", ":"), default=str))
+        return tuple(values)
+
+    def _upsert(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        columns = ["key"] + self._columns(table) + ["updated_at", "data"]
+        values = [v for v in (self._row_values(table, row) for row in rows) if v is not None]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values
+        )
+        watermark = max((v[-2] for v in values if v[-2]), default=None)
+        if watermark:
+            self.conn.execute(
+                "INSERT INTO sync_state (table_name, watermark) VALUES (?, ?) "
+                "ON CONFLICT(table_name) DO UPDATE SET watermark = MAX(COALESCE(watermark, ''), excluded.watermark)",
+                (table, watermark)
+            )
+        return len(values)
+
+    def upsert(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace rows; returns the number stored"""
+        with self._lock:
+            count = self._upsert(table, rows)
+            self.conn.commit()
+        return count
+
+    def delete(self, table: str, rows: Iterable[Dict[str, Any]]) -> None:
+        """Remove rows by their key column"""
+        key = MIRROR_TABLES[table][0]
+        keys = [(row[key],) for row in rows if row.get(key) is not None]
+        with self._lock:
+            self.conn.executemany(f"DELETE FROM {table} WHERE key = ?", keys)
+            self.conn.commit()
+
+    def replace_all(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace a table with a full copy, which also drops rows deleted upstream"""
+        with self._lock:
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute("DELETE FROM sync_state WHERE table_name = ?", (table,))
+            count = self._upsert(table, rows)
+            self.conn.execute(
+                "INSERT INTO sync_state (table_name, full_synced_at) VALUES (?, ?) "
+                "ON CONFLICT(table_name) DO UPDATE SET full_synced_at = excluded.full_synced_at",
+                (table, time.time())
+            )
+            self.conn.commit()
+        logger.info(f"Local mirror of {table} replaced with {count} rows")
+        return count
+
+    def _state(self, table: str) -> tuple:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT watermark, full_synced_at FROM sync_state WHERE table_name = ?", (table,)
+            ).fetchone()
+        return row or (None, None)
+
+    def watermark(self, table: str) -> Optional[str]:
+        """Latest updated_at seen for a table"""
+        return self._state(table)[0]
+
+    def full_synced_at(self, table: str) -> Optional[float]:
+        """Time of the last full copy of a table, or None if it never completed"""
+        return self._state(table)[1]
+
+    def is_ready(self, table: str) -> bool:
+        """Whether a table has been fully copied and can serve reads"""
+        return self.full_synced_at(table) is not None
+
+    def select(self, table: str, filters: Optional[Dict[str, Any]] = None,
+               column: Optional[str] = None, values: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Read rows matching equality filters and, optionally, `column IN values`.
+
+        Args:
+            table: Mirrored table
+            filters: {column: value} that must all match
+            column: Column for the IN filter
+            values: Allowed values of `column`
+        """
+        key = MIRROR_TABLES[table][0]
+        where, params = [], []
+        for name, value in (filters or {}).items():
+            where.append(f"{'key' if name == key else name} = ?")
+            params.append(value)
+        if column is not None:
+            if not values:
+                return []
+            where.append(f"{'key' if column == key else column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        query = f"SELECT data FROM {table}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count_distinct(self, table: str, group_column: str, column: str) -> Dict[Any, int]:
+        """Number of distinct `column` values per `group_column` value"""
+        key = MIRROR_TABLES[table][0]
+        group_column = 'key' if group_column == key else group_column
+        column = 'key' if column == key else column
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {group_column}, COUNT(DISTINCT {column}) FROM {table} GROUP BY {group_column}"
+            ).fetchall()
+        return dict(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return row counts, watermarks and full-copy age per table"""
+        stats = {}
+        now = time.time()
+        for table in MIRROR_TABLES:
+            with self._lock:
+                count = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            watermark, full_synced_at = self._state(table)
+            stats[table] = {
+                "rows": count,
+                "watermark": watermark,
+                "full_sync_age_seconds": round(now - full_synced_at, 1) if full_synced_at else None,
+            }
+        return stats
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self.conn.close()
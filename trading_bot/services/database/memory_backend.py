@@ -0,0 +1,332 @@
+"""
+Indexed in-memory storage behind the async PostgREST interface, for development and load testing
+"""
+
+import time
+import random
+import logging
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from trading_bot.services.database.async_client import (
+    APIResponse, AsyncQuery, PostgrestError, QueryStats, _format_value
+)
+
+logger = logging.getLogger(__name__)
+
+# Key column and hash-indexed columns per table; other tables are keyed on 'id' and scanned
+TABLE_INDEXES = {
+    "subscriber_preferences": ("id", ("user_id", "instrument", "market")),
+    "signal_subscriptions": ("id", ("user_id", "instrument")),
+    "user_subscriptions": ("id", ("user_id", "subscription_status", "stripe_customer_id")),
+    "users": ("id", ("is_active",)),
+}
+
+DEFAULT_INSTRUMENTS = {
+    "forex": ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "USDCAD", "USDCHF", "NZDUSD", "EURGBP", "EURJPY", "GBPJPY"],
+    "crypto": ["BTCUSD", "ETHUSD", "XRPUSD", "SOLUSD", "BNBUSD", "ADAUSD"],
+    "indices": ["US30", "US500", "US100", "DE40", "UK100"],
+    "commodities": ["XAUUSD", "XAGUSD", "USOIL"],
+}
+DEFAULT_TIMEFRAMES = ["1m", "15m", "30m", "1h", "4h"]
+
+
+def _split_list(text: str) -> List[str]:
+    """Split a PostgREST list body `a,"b,c",d` into its values"""
+    values, current, quoted, escaped = [], [], False, False
+    for ch in text:
+        if escaped:
+            current.append(ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif ch == "," and not quoted:
+            values.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    values.append("".join(current))
+    return values
+
+
+def _compare(value: Any, operator: str, text: str) -> bool:
+    if operator == "eq":
+        return _format_value(value) == text
+    if operator == "neq":
+        return _format_value(value) != text
+    if operator == "in":
+        return _format_value(value) in set(_split_list(text[1:-1]))
+    if value is None:
+        return False
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            other = float(text)
+        except ValueError:
+            return False
+        value = float(value)
+    else:
+        value, other = str(value), text
+    if operator == "gt":
+        return value > other
+    if operator == "gte":
+        return value >= other
+    if operator == "lt":
+        return value < other
+    if operator == "lte":
+        return value <= other
+    raise PostgrestError(400, f"Unsupported operator {operator}")
+
+
+class MemoryTable:
+    """Rows of one table by key, with a hash index per indexed column"""
+
+    def __init__(self, name: str, key: str = "id", indexed: Iterable[str] = ()):
+        self.name = name
+        self.key = key
+        self.rows: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, Set[Any]]] = {column: {} for column in indexed}
+        self.next_id = 1
+
+    def _index(self, key: Any, row: Dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            index.setdefault(_format_value(row.get(column)), set()).add(key)
+
+    def _unindex(self, key: Any, row: Dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            value = _format_value(row.get(column))
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+
+    def insert(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        inserted = []
+        for row in rows:
+            row = dict(row)
+            if row.get(self.key) is None:
+                row[self.key] = self.next_id
+            if isinstance(row[self.key], int):
+                self.next_id = max(self.next_id, row[self.key] + 1)
+            key = row[self.key]
+            if key in self.rows:
+                raise PostgrestError(409, f"Duplicate key {self.key}={key} in {self.name}")
+            self.rows[key] = row
+            self._index(key, row)
+            inserted.append(row)
+        return inserted
+
+    def update(self, keys: Iterable[Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        updated = []
+        for key in keys:
+            row = self.rows[key]
+            self._unindex(key, row)
+            row.update(data)
+            self._index(key, row)
+            updated.append(row)
+        return updated
+
+    def delete(self, keys: Iterable[Any]) -> List[Dict[str, Any]]:
+        deleted = []
+        for key in list(keys):
+            row = self.rows.pop(key)
+            self._unindex(key, row)
+            deleted.append(row)
+        return deleted
+
+    def find(self, filters: List[Tuple[str, str, str]], any_of: List[List[Tuple[str, str, str]]] = ()) -> List[Any]:
+        """
+        Return the keys of rows matching every filter and at least one filter of each `any_of` group.
+
+        The smallest candidate set among eq/in filters on indexed columns is
+        taken from the hash indexes; only those rows are checked against the
+        remaining filters.
+        """
+        candidates: Optional[Set[Any]] = None
+        used = None
+        for position, (column, operator, text) in enumerate(filters):
+            index = self.indexes.get(column)
+            if index is None or operator not in ("eq", "in"):
+                continue
+            if operator == "eq":
+                keys = index.get(text, set())
+            else:
+                keys = set()
+                for value in _split_list(text[1:-1]):
+                    keys |= index.get(value, set())
+            if candidates is None or len(keys) < len(candidates):
+                candidates, used = keys, position
+        pool = self.rows.keys() if candidates is None else candidates
+        # The filter answered by the index holds for every candidate
+        remaining = [f for position, f in enumerate(filters) if position != used]
+
+        matched = []
+        for key in pool:
+            row = self.rows[key]
+            if all(_compare(row.get(column), operator, text) for column, operator, text in remaining) and \
+                    all(any(_compare(row.get(c), o, t) for c, o, t in group) for group in any_of):
+                matched.append(key)
+        return matched
+
+
+class MemoryBackend:
+    """
+    In-memory replacement for AsyncPostgrestClient.
+
+    Accepts the same query builder, so every Database method runs its normal
+    code path, and answers eq/in filters on indexed columns from hash indexes
+    instead of scanning. Rows can be loaded from fixtures or from
+    `generate_dataset()` to test at production scale without Supabase.
+    """
+
+    http2 = False
+
+    def __init__(self, stats: Optional[QueryStats] = None):
+        """
+        Initialize an empty backend.
+
+        Args:
+            stats: Latency recorder shared with the Database
+        """
+        self.stats = stats or QueryStats()
+        self.tables: Dict[str, MemoryTable] = {}
+
+    def _table(self, name: str) -> MemoryTable:
+        table = self.tables.get(name)
+        if table is None:
+            key, indexed = TABLE_INDEXES.get(name, ("id", ()))
+            table = self.tables[name] = MemoryTable(name, key, indexed)
+        return table
+
+    def load(self, tables: Dict[str, Iterable[Dict[str, Any]]]) -> None:
+        """Insert fixture rows per table"""
+        for name, rows in tables.items():
+            count = len(self._table(name).insert(rows))
+            logger.info(f"Loaded {count} rows into in-memory {name}")
+
+    def table(self, name: str) -> AsyncQuery:
+        """Start a query on a table"""
+        return AsyncQuery(self, name)
+
+    @staticmethod
+    def _parse_filter(column: str, expression: str) -> Tuple[str, str, str]:
+        operator, _, text = expression.partition(".")
+        return column, operator, text
+
+    async def request(self, query: AsyncQuery) -> APIResponse:
+        """Execute a built query against the in-memory tables"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = self._execute(query)
+            ok = True
+            return response
+        finally:
+            self.stats.record(query.table, query.operation, time.perf_counter() - started, ok)
+
+    def _execute(self, query: AsyncQuery) -> APIResponse:
+        table = self._table(query.table)
+        filters, any_of, columns, order, limit = [], [], "*", [], None
+        for name, value in query.params:
+            if name == "select":
+                columns = value
+            elif name == "order":
+                column, _, direction = value.rpartition(".")
+                order.append((column, direction == "desc"))
+            elif name == "limit":
+                limit = int(value)
+            elif name == "or":
+                any_of.append([self._parse_filter(*part.split(".", 1)) for part in _split_list(value[1:-1])])
+            else:
+                filters.append(self._parse_filter(name, value))
+
+        if query.method == "POST":
+            rows = table.insert(query.body if isinstance(query.body, list) else [query.body])
+        else:
+            keys = table.find(filters, any_of)
+            if query.method == "PATCH":
+                rows = table.update(keys, query.body)
+            elif query.method == "DELETE":
+                rows = table.delete(keys)
+            else:
+                rows = [table.rows[key] for key in keys]
+
+        for column, desc in reversed(order):
+            rows.sort(key=lambda row: (row.get(column) is None, str(row.get(column))), reverse=desc)
+        count = len(rows) if any(p.startswith("count=") for p in query.prefer) else None
+        if limit is not None:
+            rows = rows[:limit]
+        if columns == "*":
+            data = [dict(row) for row in rows]
+        else:
+            wanted = [c.strip() for c in columns.split(",")]
+            data = [{c: row.get(c) for c in wanted} for row in rows]
+        return APIResponse(data, count)
+
+    async def close(self) -> None:
+        """Nothing to release; present for interface parity"""
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return row counts per table"""
+        return {name: len(table.rows) for name, table in sorted(self.tables.items())}
+
+
+def generate_dataset(users: int, seed: int = 42, active_ratio: float = 0.7,
+                     max_instruments_per_user: int = 5,
+                     instruments: Optional[Dict[str, List[str]]] = None,
+                     now: Optional[datetime.datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate reproducible synthetic users, preferences and subscriptions.
+
+    Args:
+        users: Number of users
+        seed: Random seed; the same seed and `now` always yield the same dataset
+        active_ratio: Share of users with an active, unexpired subscription
+        max_instruments_per_user: Upper bound of instruments each user follows
+        instruments: Instruments per market
+        now: Time subscription periods are relative to, defaults to the current UTC time
+             so active subscriptions are unexpired when the data is loaded
+
+    Returns:
+        Rows per table name, ready for MemoryBackend.load()
+    """
+    rng = random.Random(seed)
+    instruments = instruments or DEFAULT_INSTRUMENTS
+    markets = list(instruments)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    created_at = "2024-01-01T00:00:00"
+
+    tables: Dict[str, List[Dict[str, Any]]] = {
+        "users": [], "subscriber_preferences": [], "signal_subscriptions": [], "user_subscriptions": []
+    }
+    for i in range(users):
+        user_id = 100_000_000 + i
+        tables["users"].append({
+            "id": user_id, "first_name": f"User{i}", "username": f"user{i}",
+            "is_active": True, "created_at": created_at,
+        })
+
+        market = rng.choice(markets)
+        followed = rng.sample(instruments[market], min(rng.randint(1, max_instruments_per_user),
+                                                       len(instruments[market])))
+        for instrument in followed:
+            timeframe = rng.choice(DEFAULT_TIMEFRAMES)
+            row = {"user_id": user_id, "market": market, "instrument": instrument,
+                   "timeframe": timeframe, "is_active": True, "created_at": created_at}
+            tables["subscriber_preferences"].append(dict(row))
+            tables["signal_subscriptions"].append(dict(row))
+
+        roll = rng.random()
+        if roll < active_ratio:
+            status, period_end = "active", now + datetime.timedelta(days=rng.randint(1, 30))
+        else:
+            status = rng.choice(["active", "past_due", "canceled", "inactive"])
+            period_end = now - datetime.timedelta(days=rng.randint(1, 30))
+        tables["user_subscriptions"].append({
+            "user_id": user_id, "subscription_type": "monthly", "subscription_status": status,
+            "stripe_customer_id": f"cus_{user_id}", "current_period_end": period_end.isoformat(),
+            "created_at": created_at, "updated_at": now.isoformat(),
+        })
+    return tables
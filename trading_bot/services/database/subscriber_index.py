@@ -0,0 +1,176 @@
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = 'ALL'
+
+
+class SubscriberIndex:
+    """
+    In-memory inverted index over subscriber_preferences rows.
+
+    Rows are bucketed by (market, instrument, normalized timeframe), where
+    instrument and timeframe may be the 'ALL' wildcard. Lookups only touch the
+    buckets that can match, so resolving subscribers costs O(matches) instead
+    of a scan over the whole table.
+    """
+
+    def __init__(self, normalize_timeframe: Callable[[Any], str]):
+        """
+        Initialize an empty index.
+
+        Args:
+            normalize_timeframe: Function mapping raw timeframes to canonical ones
+        """
+        self.normalize_timeframe = normalize_timeframe
+        self._rows: Dict[Any, Dict[str, Any]] = {}
+        self._row_bucket: Dict[Any, Tuple[str, str, str]] = {}
+        self._buckets: Dict[Tuple[str, str, str], Dict[Any, None]] = {}
+        self._timeframes: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._markets: Dict[str, Dict[str, int]] = {}
+        self._by_user: Dict[Any, Set[Any]] = {}
+        self.built_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def is_built(self) -> bool:
+        return self.built_at > 0
+
+    def _timeframe_key(self, timeframe: Any) -> str:
+        if timeframe == WILDCARD:
+            return WILDCARD
+        return self.normalize_timeframe(timeframe or '1h')
+
+    @staticmethod
+    def _row_key(pref: Dict[str, Any]) -> Any:
+        if pref.get('id') is not None:
+            return pref['id']
+        return (pref.get('user_id'), pref.get('market'), pref.get('instrument'), pref.get('timeframe'))
+
+    def rebuild(self, preferences: Iterable[Dict[str, Any]]) -> None:
+        """Replace the index contents with a full set of preference rows"""
+        self._rows.clear()
+        self._row_bucket.clear()
+        self._buckets.clear()
+        self._timeframes.clear()
+        self._markets.clear()
+        self._by_user.clear()
+        for pref in preferences:
+            self.add(pref)
+        self.built_at = time.time()
+        logger.info(f"Subscriber index rebuilt with {len(self._rows)} preferences")
+
+    def add(self, pref: Dict[str, Any]) -> None:
+        """Insert or replace a single preference row"""
+        if not isinstance(pref, dict):
+            return
+        key = self._row_key(pref)
+        if key in self._rows:
+            self._discard(key)
+
+        market = str(pref.get('market') or '').lower()
+        instrument = pref.get('instrument') or ''
+        timeframe = self._timeframe_key(pref.get('timeframe'))
+        bucket = (market, instrument, timeframe)
+
+        self._rows[key] = pref
+        self._row_bucket[key] = bucket
+        self._buckets.setdefault(bucket, {})[key] = None
+
+        tf_counts = self._timeframes.setdefault((market, instrument), {})
+        tf_counts[timeframe] = tf_counts.get(timeframe, 0) + 1
+        market_counts = self._markets.setdefault(instrument, {})
+        market_counts[market] = market_counts.get(market, 0) + 1
+        self._by_user.setdefault(pref.get('user_id'), set()).add(key)
+
+    def _discard(self, key: Any) -> None:
+        pref = self._rows.pop(key, None)
+        bucket = self._row_bucket.pop(key, None)
+        if pref is None or bucket is None:
+            return
+        market, instrument, timeframe = bucket
+
+        members = self._buckets.get(bucket)
+        if members is not None:
+            members.pop(key, None)
+            if not members:
+                del self._buckets[bucket]
+
+        tf_counts = self._timeframes.get((market, instrument), {})
+        tf_counts[timeframe] = tf_counts.get(timeframe, 1) - 1
+        if tf_counts.get(timeframe, 0) <= 0:
+            tf_counts.pop(timeframe, None)
+            if not tf_counts:
+                self._timeframes.pop((market, instrument), None)
+
+        market_counts = self._markets.get(instrument, {})
+        market_counts[market] = market_counts.get(market, 1) - 1
+        if market_counts.get(market, 0) <= 0:
+            market_counts.pop(market, None)
+            if not market_counts:
+                self._markets.pop(instrument, None)
+
+        user_keys = self._by_user.get(pref.get('user_id'))
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._by_user[pref.get('user_id')]
+
+    def remove_id(self, preference_id: Any) -> None:
+        """Remove a preference by its database ID"""
+        self._discard(preference_id)
+
+    def remove_user(self, user_id: Any, instrument: Optional[str] = None) -> None:
+        """Remove all preferences of a user, optionally only for one instrument"""
+        for key in list(self._by_user.get(user_id, ())):
+            if instrument is None or self._rows[key].get('instrument') == instrument:
+                self._discard(key)
+
+    def _iter_bucket_keys(self, markets: Iterable[str], instrument: str, timeframe: Optional[str]):
+        for market in markets:
+            for inst in (instrument, WILDCARD):
+                tf_counts = self._timeframes.get((market, inst))
+                if not tf_counts:
+                    continue
+                if timeframe is None:
+                    timeframes = list(tf_counts)
+                else:
+                    timeframes = [tf for tf in (self._timeframe_key(timeframe), WILDCARD) if tf in tf_counts]
+                for tf in timeframes:
+                    yield from self._buckets.get((market, inst, tf), ())
+
+    def match(self, market: str, instrument: str, timeframe: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return one matching preference per user.
+
+        Args:
+            market: Market of the signal
+            instrument: Instrument of the signal; 'ALL' preferences always match
+            timeframe: Timeframe of the signal, or None to ignore timeframes
+        """
+        matched = {}
+        for key in self._iter_bucket_keys([str(market or '').lower()], instrument, timeframe):
+            pref = self._rows[key]
+            matched.setdefault(pref.get('user_id'), pref)
+        return list(matched.values())
+
+    def match_user_ids(self, instrument: str, timeframe: Optional[str] = None) -> List[Any]:
+        """Return unique user IDs subscribed to an instrument in any market"""
+        markets = set(self._markets.get(instrument, {})) | set(self._markets.get(WILDCARD, {}))
+        user_ids = {}
+        for key in self._iter_bucket_keys(markets, instrument, timeframe):
+            user_ids.setdefault(self._rows[key].get('user_id'), None)
+        return list(user_ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and age"""
+        return {
+            "preferences": len(self._rows),
+            "users": len(self._by_user),
+            "buckets": len(self._buckets),
+            "age_seconds": round(time.time() - self.built_at, 1) if self.built_at else None,
+        }
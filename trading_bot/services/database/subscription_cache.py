@@ -0,0 +1,129 @@
+import os
+import time
+import datetime
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from trading_bot.utils.bounded_cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TTL = 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 300
+DEFAULT_MAX_ENTRIES = 50000
+_MISSING = object()
+
+
+def _period_end_timestamp(value: Any) -> Optional[float]:
+    """Convert a current_period_end value (ISO string or datetime, naive means UTC) to a Unix timestamp"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.timestamp()
+    return None
+
+
+class SubscriptionCache:
+    """
+    Per-user cache of user_subscriptions rows.
+
+    An entry expires at the subscription's current_period_end, so a renewal or
+    lapse is always read fresh, and never lives longer than `max_ttl`. Users
+    without a subscription are cached for `negative_ttl`. Entries are dropped
+    immediately when a Stripe event or a local write changes the subscription.
+    Both the users and the Stripe customer mapping are bounded, least recently
+    used first.
+    """
+
+    def __init__(self, max_ttl: Optional[float] = None, negative_ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_ttl: Longest time any subscription is cached
+            negative_ttl: How long a missing subscription is cached
+            max_entries: Maximum number of cached users
+        """
+        self.max_ttl = float(max_ttl or os.getenv("SUBSCRIPTION_CACHE_MAX_TTL", DEFAULT_MAX_TTL))
+        self.negative_ttl = float(negative_ttl or os.getenv("SUBSCRIPTION_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL))
+        self.max_entries = int(max_entries or os.getenv("SUBSCRIPTION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        # user ID -> subscription row, or None for users without one
+        self.entries = BoundedCache(max_items=self.max_entries, ttl=self.max_ttl, name="subscription_cache")
+        # Stripe customer ID -> user ID
+        self.customers = BoundedCache(max_items=self.max_entries, ttl=self.max_ttl, name="subscription_customers")
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id: Any) -> int:
+        return int(user_id)
+
+    def get(self, user_id: Any) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a user's subscription.
+
+        Returns:
+            Tuple of (found, subscription); subscription is None for users without one
+        """
+        subscription = self.entries.get(self._key(user_id), _MISSING)
+        if subscription is not _MISSING:
+            self.hits += 1
+            return True, subscription
+        self.misses += 1
+        return False, None
+
+    def set(self, user_id: Any, subscription: Optional[Dict[str, Any]]) -> None:
+        """Cache a subscription row, or None when the user has no subscription"""
+        now = time.time()
+        if subscription is None:
+            expires_at = now + self.negative_ttl
+        else:
+            expires_at = now + self.max_ttl
+            period_end = _period_end_timestamp(subscription.get('current_period_end'))
+            if period_end is not None:
+                # Past period ends are rechecked soon in case the renewal has not been written yet
+                expires_at = min(expires_at, period_end if period_end > now else now + self.negative_ttl)
+            customer_id = subscription.get('stripe_customer_id')
+            if customer_id:
+                self.customers.set(customer_id, self._key(user_id))
+        self.entries.set(self._key(user_id), subscription, ttl=expires_at - now)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop a user's cached subscription"""
+        if self.entries.pop(self._key(user_id), _MISSING) is not _MISSING:
+            self.invalidations += 1
+
+    def invalidate_customer(self, customer_id: str) -> Optional[int]:
+        """Drop the cached subscription of a Stripe customer; returns its user ID, or None if the customer is unknown"""
+        user_id = self.customers.pop(customer_id, None)
+        if user_id is not None:
+            self.invalidate(user_id)
+        return user_id
+
+    def clear(self) -> None:
+        """Drop every cached subscription"""
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+        self.customers.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return size, hit rate and invalidation count"""
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self.entries),
+            "customers": len(self.customers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
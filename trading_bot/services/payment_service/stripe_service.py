@@ -285,6 +285,24 @@ Need help? Type /help for assistance.
         except Exception as e:
             logger.error(f"Error processing webhook: {str(e)}")
             return False
+        finally:
+            # Subscription checks must see the change right away
+            self._invalidate_subscription_cache(event)
+    
+    def _invalidate_subscription_cache(self, event) -> None:
+        """Drop cached subscription state of the user a Stripe event refers to"""
+        if not hasattr(self.db, 'invalidate_subscription'):
+            return
+        try:
+            obj = (event.get('data') or {}).get('object') or {}
+            metadata = obj.get('metadata') or {}
+            user_id = metadata.get('user_id') or obj.get('client_reference_id')
+            self.db.invalidate_subscription(
+                user_id=int(user_id) if user_id else None,
+                customer_id=obj.get('customer')
+            )
+        except Exception as e:
+            logger.error(f"Error invalidating subscription cache: {str(e)}")
     
     async def handle_checkout_completed(self, event_data: Dict[str, Any]) -> bool:
         """Process a checkout.session.completed event"""
@@ -12,6 +12,7 @@ import traceback
 import openai
 from openai import AsyncOpenAI
 from trading_bot.config import AI_SERVICES_ENABLED
+from trading_bot.utils.single_flight import SingleFlight
 import re
 import time
 
@@ -82,6 +83,7 @@ class MarketSentimentService:
         self.cache_file = cache_file or os.path.join(str(Path.home()), ".market_sentiment_cache")
         self.sentiment_cache = {}
         self._load_cache()  # Load cache on initialization
+        self.sentiment_flight = SingleFlight("sentiment")
         
         # Initialize simple metrics tracking
         self.metrics = {}
@@ -101,6 +103,8 @@ class MarketSentimentService:
         """
         Get sentiment analysis for a given market instrument
         
+        Concurrent requests for the same market share one lookup.
+        
         Args:
             market: The market instrument to analyze (e.g., "GBPUSD")
             market_type: The type of market (default: "forex")
@@ -108,6 +112,15 @@ class MarketSentimentService:
         Returns:
             Dict: A nested dictionary containing sentiment analysis data
         """
+        return await self.sentiment_flight.do(f"{market}_{market_type}_sentiment",
+                                              self._get_sentiment, market, market_type)
+    
+    def get_flight_stats(self) -> Dict:
+        """Return how many sentiment requests were coalesced"""
+        return self.sentiment_flight.get_stats()
+    
+    async def _get_sentiment(self, market: str, market_type: str = "forex") -> Dict:
+        """Serve sentiment from the cache or fetch it from OpenAI"""
         try:
             self.logger.info(f"Getting sentiment for {market} (market_type: {market_type})")
             
@@ -0,0 +1,193 @@
+import os
+import sys
+import logging
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from trading_bot.utils.bounded_cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIGNALS = 2000
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_PER_USER = 100
+
+# Short, frequently repeated values are interned so all records share one string
+_INTERNED_FIELDS = ("instrument", "direction", "timeframe", "market")
+
+
+class SignalRecord(Mapping):
+    """
+    Compact, read-only view of one signal, shared by every user who received it.
+
+    Known signal fields live in slots; anything else goes into a small `extra`
+    dict. Records behave like the dictionaries they replace, so callers can
+    keep using `record.get('direction')`, `record['message']` and `dict(record)`.
+    """
+
+    FIELDS = ("id", "instrument", "direction", "entry", "stop_loss", "take_profit",
+              "timeframe", "tp1", "tp2", "tp3", "timestamp", "market", "message")
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, signal_data: Dict[str, Any]):
+        extra = {}
+        for key, value in signal_data.items():
+            if key in self.FIELDS:
+                if key in _INTERNED_FIELDS and isinstance(value, str):
+                    value = sys.intern(value)
+                object.__setattr__(self, key, value)
+            else:
+                extra[key] = value
+        for key in self.FIELDS:
+            if key not in signal_data:
+                object.__setattr__(self, key, None)
+        object.__setattr__(self, "extra", extra or None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("SignalRecord is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by the record and its values"""
+        size = sys.getsizeof(self)
+        for key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                size += sys.getsizeof(value)
+        if self.extra:
+            size += sys.getsizeof(self.extra) + sum(sys.getsizeof(v) for v in self.extra.values())
+        return size
+
+
+class SignalCache:
+    """
+    Bounded in-memory cache of recently broadcast signals.
+
+    Each signal is stored once as a SignalRecord; users only hold the signal
+    IDs they received. Records are evicted least-recently-used beyond
+    `max_signals` and expire after `ttl` seconds. Misses fall back to `loader`,
+    normally the durable signal log, so eviction never loses a signal.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+                 max_signals: Optional[int] = None, ttl: Optional[float] = None,
+                 max_per_user: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            loader: Returns the signal data for an ID from durable storage
+            max_signals: Maximum number of resident signal records
+            ttl: Seconds a record stays resident after it was loaded
+            max_per_user: Signal references remembered per user
+        """
+        self.loader = loader
+        self.max_signals = int(max_signals or os.getenv("SIGNAL_CACHE_MAX_SIGNALS", DEFAULT_MAX_SIGNALS))
+        self.ttl = float(ttl or os.getenv("SIGNAL_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.max_per_user = int(max_per_user or os.getenv("SIGNAL_CACHE_MAX_PER_USER", DEFAULT_MAX_PER_USER))
+
+        self.records = BoundedCache(max_items=self.max_signals, ttl=self.ttl,
+                                    sizeof=lambda record: record.size_bytes(), name="signal_cache")
+        self.user_refs: Dict[str, "OrderedDict[str, None]"] = {}
+
+        self.loads = 0
+
+    def put(self, signal_data: Dict[str, Any], user_id: Any = None) -> SignalRecord:
+        """
+        Store a signal and optionally reference it for a user.
+
+        Args:
+            signal_data: Signal data including its 'id'
+            user_id: User that received the signal
+        """
+        record = signal_data if isinstance(signal_data, SignalRecord) else SignalRecord(signal_data)
+        signal_id = sys.intern(str(record["id"]))
+        self.records.set(signal_id, record)
+        if user_id is not None:
+            self.add_user(user_id, signal_id)
+        return record
+
+    def add_user(self, user_id: Any, signal_id: str) -> None:
+        """Remember that a user received a signal"""
+        refs = self.user_refs.setdefault(str(user_id), OrderedDict())
+        refs[sys.intern(signal_id)] = None
+        refs.move_to_end(signal_id)
+        while len(refs) > self.max_per_user:
+            refs.popitem(last=False)
+
+    def get(self, signal_id: str, user_id: Any = None) -> Optional[SignalRecord]:
+        """
+        Return a signal, loading it through the loader on a miss.
+
+        Args:
+            signal_id: Signal ID
+            user_id: If given, the signal is also referenced for this user
+        """
+        record = self.records.get(signal_id)
+        if record is None:
+            signal_data = None
+            if self.loader is not None:
+                try:
+                    signal_data = self.loader(signal_id)
+                except Exception as e:
+                    logger.error(f"Error loading signal {signal_id} into cache: {str(e)}")
+            if not signal_data:
+                return None
+            self.loads += 1
+            record = self.put(dict(signal_data, id=signal_data.get('id', signal_id)))
+        if user_id is not None:
+            self.add_user(user_id, signal_id)
+        return record
+
+    def get_user_signals(self, user_id: Any) -> Dict[str, SignalRecord]:
+        """Return the signals remembered for a user, oldest first"""
+        signals = {}
+        for signal_id in list(self.user_refs.get(str(user_id), ())):
+            record = self.get(signal_id)
+            if record is not None:
+                signals[signal_id] = record
+        return signals
+
+    def sweep(self) -> int:
+        """Drop expired records; returns the number removed"""
+        return self.records.sweep()
+
+    def resident_bytes(self) -> int:
+        """Approximate memory held by records and user references"""
+        size = self.records.total_bytes
+        size += sum(sys.getsizeof(refs) for refs in self.user_refs.values())
+        return size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit rate, evictions and resident size"""
+        records = self.records.get_stats()
+        return {
+            "signals": records["entries"],
+            "users": len(self.user_refs),
+            "references": sum(len(refs) for refs in self.user_refs.values()),
+            "hits": records["hits"],
+            "misses": records["misses"],
+            "hit_rate": records["hit_rate"],
+            "loads": self.loads,
+            "evictions": records["evictions"] + records["expirations"],
+            "resident_bytes": self.resident_bytes(),
+        }
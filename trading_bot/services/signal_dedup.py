@@ -0,0 +1,151 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class SignalDeduplicator:
+    """
+    Content-hash deduplication for incoming signals.
+    A payload seen again within the window is reported as a duplicate so the
+    webhook can acknowledge it without broadcasting twice. Fingerprints live
+    in a bounded in-memory map and, when Redis is available, in Redis so that
+    every process sharing it agrees on what was already accepted.
+    """
+
+    def __init__(self, window_seconds: Optional[int] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 redis_client=None):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            window_seconds: How long a payload is remembered
+            max_entries: Maximum fingerprints kept in memory
+            redis_client: Optional redis.asyncio client for cross-process deduplication
+        """
+        if window_seconds is None:
+            window_seconds = os.getenv("SIGNAL_DEDUP_WINDOW_SECONDS", DEFAULT_WINDOW_SECONDS)
+        self.window_seconds = int(window_seconds)
+        self.max_entries = max_entries
+        self.redis = redis_client
+        self.seen: "OrderedDict[str, float]" = OrderedDict()
+
+        self.accepted = 0
+        self.suppressed = 0
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        """Return a stable SHA-256 hash of the payload contents"""
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _expire(self, now: float) -> None:
+        # Entries are inserted in time order with a fixed window, so the oldest are first
+        while self.seen:
+            fingerprint, expires_at = next(iter(self.seen.items()))
+            if expires_at > now and len(self.seen) < self.max_entries:
+                break
+            self.seen.popitem(last=False)
+
+    async def check(self, payload: Any) -> Tuple[bool, str]:
+        """
+        Record a payload and report whether it was already seen in the window.
+
+        Returns:
+            Tuple of (is_duplicate, fingerprint)
+        """
+        return (await self.check_many([payload]))[0]
+
+    async def check_many(self, payloads: List[Any]) -> List[Tuple[bool, str]]:
+        """
+        Record several payloads, e.g. a batch, with one Redis round-trip.
+
+        Returns:
+            (is_duplicate, fingerprint) per payload; a payload repeated within the list is a duplicate
+        """
+        fingerprints = [self.fingerprint(payload) for payload in payloads]
+        if self.window_seconds <= 0:
+            # A zero window disables deduplication
+            self.accepted += len(fingerprints)
+            return [(False, fingerprint) for fingerprint in fingerprints]
+        now = time.time()
+        self._expire(now)
+
+        duplicates = [fingerprint in self.seen for fingerprint in fingerprints]
+        unseen = list(dict.fromkeys(fp for fp, duplicate in zip(fingerprints, duplicates) if not duplicate))
+        if unseen and self.redis is not None:
+            try:
+                # SET NX only succeeds for the first process to see a payload
+                pipe = self.redis.pipeline(transaction=False)
+                for fingerprint in unseen:
+                    pipe.set(f"signal_dedup:{fingerprint}", 1, nx=True, ex=self.window_seconds)
+                claimed = dict(zip(unseen, await pipe.execute()))
+                duplicates = [duplicate or not claimed.get(fp, True) for fp, duplicate in zip(fingerprints, duplicates)]
+            except Exception as e:
+                logger.warning(f"Redis deduplication unavailable, using local window only: {str(e)}")
+
+        results = []
+        for fingerprint, duplicate in zip(fingerprints, duplicates):
+            duplicate = duplicate or fingerprint in self.seen
+            if duplicate:
+                self.suppressed += 1
+                logger.info(f"Suppressed duplicate signal {fingerprint[:12]}")
+            else:
+                self.accepted += 1
+            self.seen[fingerprint] = now + self.window_seconds
+            self.seen.move_to_end(fingerprint)
+            results.append((duplicate, fingerprint))
+        return results
+
+    async def forget(self, *fingerprints: str) -> None:
+        """Drop fingerprints, e.g. when the signals could not be accepted after all"""
+        for fingerprint in fingerprints:
+            self.seen.pop(fingerprint, None)
+        if self.redis is not None and fingerprints:
+            try:
+                await self.redis.delete(*(f"signal_dedup:{fingerprint}" for fingerprint in fingerprints))
+            except Exception as e:
+                logger.warning(f"Could not remove dedup keys from Redis: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return accepted and suppressed counts"""
+        return {
+            "window_seconds": self.window_seconds,
+            "tracked": len(self.seen),
+            "accepted": self.accepted,
+            "suppressed_duplicates": self.suppressed,
+            "redis": self.redis is not None,
+        }
+
+
+_signal_deduplicator: Optional[SignalDeduplicator] = None
+_signal_deduplicator_lock = asyncio.Lock()
+
+
+async def get_signal_deduplicator() -> SignalDeduplicator:
+    """Return the process-wide deduplicator shared by all webhook routes"""
+    global _signal_deduplicator
+    async with _signal_deduplicator_lock:
+        if _signal_deduplicator is None:
+            redis_client = None
+            if os.getenv("SIGNAL_DEDUP_USE_REDIS", "true").lower() == "true":
+                try:
+                    import redis.asyncio as aioredis
+                    redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
+                    redis_client = aioredis.from_url(redis_url, decode_responses=True, socket_connect_timeout=2)
+                    # Test the connection once without blocking the event loop
+                    await redis_client.ping()
+                except Exception as e:
+                    logger.info(f"Redis not available for signal deduplication: {str(e)}")
+                    redis_client = None
+            _signal_deduplicator = SignalDeduplicator(redis_client=redis_client)
+    return _signal_deduplicator
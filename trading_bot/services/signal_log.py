@@ -0,0 +1,272 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{8})\.log$")
+
+
+class SignalLog:
+    """
+    Append-only, segmented store for broadcast signals.
+
+    Each signal body is written once, as one JSON line in the active segment.
+    An SQLite index maps signal IDs to (segment, offset, length), and users
+    reference signals through compact membership rows, so a broadcast to N
+    users costs one segment append and one index transaction instead of N
+    JSON files. Segments rotate at a size threshold and `compact()` rewrites
+    the signals still within retention into fresh segments.
+    """
+
+    def __init__(self, log_dir: str = os.path.join("data", "signals", "log"),
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES):
+        """
+        Initialize the signal log.
+
+        Args:
+            log_dir: Directory holding the segments and the index
+            segment_max_bytes: Size at which a new segment is started
+        """
+        self.log_dir = log_dir
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.RLock()
+        os.makedirs(log_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(log_dir, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signals (
+                signal_id TEXT PRIMARY KEY,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                instrument TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS members (
+                user_id TEXT NOT NULL,
+                signal_id TEXT NOT NULL,
+                PRIMARY KEY (user_id, signal_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_members_signal ON members (signal_id);
+            CREATE INDEX IF NOT EXISTS idx_signals_created ON signals (created_at);
+            """
+        )
+        self.conn.commit()
+
+        segments = self._segments()
+        self.segment = segments[-1] if segments else 1
+        self._handle = None
+
+    def _segments(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.log_dir):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.log_dir, f"segment-{segment:08d}.log")
+
+    def _writer(self):
+        """Return the append handle of the active segment, rotating when it is full"""
+        if self._handle is not None and self._handle.tell() >= self.segment_max_bytes:
+            self._handle.close()
+            self._handle = None
+            self.segment += 1
+            logger.info(f"Rotated signal log to segment {self.segment}")
+        if self._handle is None:
+            self._handle = open(self._segment_path(self.segment), "ab")
+        return self._handle
+
+    def _write_body(self, signal_data: Dict[str, Any]):
+        line = json.dumps(signal_data, separators=(",", ":")).encode("utf-8") + b"\n"
+        handle = self._writer()
+        offset = handle.tell()
+        handle.write(line)
+        handle.flush()
+        return self.segment, offset, len(line)
+
+    def append(self, signal_data: Dict[str, Any], user_ids: Iterable[Any] = ()) -> str:
+        """
+        Store a signal once and reference it for the given users.
+
+        Args:
+            signal_data: Signal data including its 'id'
+            user_ids: Users that received the signal
+
+        Returns:
+            The signal ID
+        """
+        with self._lock:
+            signal_id = self._insert(signal_data)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO members (user_id, signal_id) VALUES (?, ?)",
+                [(str(user_id), signal_id) for user_id in user_ids]
+            )
+            self.conn.commit()
+        return signal_id
+
+    def append_many(self, signals: Iterable[Dict[str, Any]]) -> List[str]:
+        """Store several signals in a single index transaction and return their IDs"""
+        with self._lock:
+            signal_ids = [self._insert(signal_data) for signal_data in signals]
+            self.conn.commit()
+        return signal_ids
+
+    def _insert(self, signal_data: Dict[str, Any]) -> str:
+        """Write a signal body unless it is already stored; the caller commits"""
+        signal_id = str(signal_data['id'])
+        exists = self.conn.execute("SELECT 1 FROM signals WHERE signal_id = ?", (signal_id,)).fetchone()
+        if not exists:
+            segment, offset, length = self._write_body(signal_data)
+            self.conn.execute(
+                "INSERT INTO signals (signal_id, segment, offset, length, instrument, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (signal_id, segment, offset, length, signal_data.get('instrument'), time.time())
+            )
+        return signal_id
+
+    def add_members(self, signal_id: str, user_ids: Iterable[Any]) -> None:
+        """Reference an already stored signal for more users"""
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO members (user_id, signal_id) VALUES (?, ?)",
+                [(str(user_id), signal_id) for user_id in user_ids]
+            )
+            self.conn.commit()
+
+    def get(self, signal_id: str) -> Optional[Dict[str, Any]]:
+        """Read a signal body by ID, or None if it is not in the log"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT segment, offset, length FROM signals WHERE signal_id = ?", (signal_id,)
+            ).fetchone()
+            if not row:
+                return None
+            if self._handle is not None:
+                self._handle.flush()
+        segment, offset, length = row
+        try:
+            with open(self._segment_path(segment), "rb") as f:
+                f.seek(offset)
+                return json.loads(f.read(length))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading signal {signal_id} from segment {segment}: {str(e)}")
+            return None
+
+    def has_member(self, user_id: Any, signal_id: str) -> bool:
+        """Check whether a user received a signal"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM members WHERE user_id = ? AND signal_id = ?", (str(user_id), signal_id)
+            ).fetchone()
+        return row is not None
+
+    def get_user_signal_ids(self, user_id: Any, instrument: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[str]:
+        """
+        Return the IDs of signals a user received, newest first.
+
+        Args:
+            user_id: Telegram user ID
+            instrument: Only return signals for this instrument
+            limit: Maximum number of IDs
+        """
+        query = ("SELECT s.signal_id FROM members m JOIN signals s ON s.signal_id = m.signal_id "
+                 "WHERE m.user_id = ?")
+        params: List[Any] = [str(user_id)]
+        if instrument:
+            query += " AND s.instrument = ?"
+            params.append(instrument)
+        query += " ORDER BY s.created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [row[0] for row in self.conn.execute(query, params).fetchall()]
+
+    def compact(self, retention_days: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop signals older than the retention period and rewrite the rest into fresh segments.
+
+        Args:
+            retention_days: Keep signals newer than this many days; keep everything if None
+
+        Returns:
+            Dictionary with the number of signals kept and removed
+        """
+        with self._lock:
+            removed = 0
+            if retention_days is not None:
+                cutoff = time.time() - retention_days * 86400
+                expired = [row[0] for row in self.conn.execute(
+                    "SELECT signal_id FROM signals WHERE created_at < ?", (cutoff,)).fetchall()]
+                self.conn.executemany("DELETE FROM members WHERE signal_id = ?", [(s,) for s in expired])
+                self.conn.executemany("DELETE FROM signals WHERE signal_id = ?", [(s,) for s in expired])
+                removed = len(expired)
+
+            old_segments = self._segments()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            # Start compacted output after every existing segment so nothing is overwritten
+            self.segment = (old_segments[-1] + 1) if old_segments else self.segment
+
+            live = self.conn.execute(
+                "SELECT signal_id, segment, offset, length FROM signals ORDER BY created_at"
+            ).fetchall()
+            relocated = []
+            for signal_id, segment, offset, length in live:
+                with open(self._segment_path(segment), "rb") as f:
+                    f.seek(offset)
+                    line = f.read(length)
+                handle = self._writer()
+                new_offset = handle.tell()
+                handle.write(line)
+                relocated.append((self.segment, new_offset, signal_id))
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+
+            self.conn.executemany("UPDATE signals SET segment = ?, offset = ? WHERE signal_id = ?", relocated)
+            self.conn.commit()
+
+            live_segments = {row[0] for row in relocated} | {self.segment}
+            for segment in old_segments:
+                if segment not in live_segments:
+                    os.remove(self._segment_path(segment))
+
+        logger.info(f"Compacted signal log: kept {len(live)} signals, removed {removed}")
+        return {"kept": len(live), "removed": removed}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return signal, membership and segment counts"""
+        with self._lock:
+            signals = self.conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+            members = self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+        segments = self._segments()
+        return {
+            "signals": signals,
+            "memberships": members,
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(self._segment_path(s)) for s in segments),
+        }
+
+    def close(self) -> None:
+        """Close the active segment and the index"""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            self.conn.close()
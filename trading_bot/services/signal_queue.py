@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = os.path.join("data", "signal_queue.db")
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BACKOFF = 5.0
+MAX_RETRY_BACKOFF = 60.0
+
+
+class SignalQueue:
+    """
+    Durable local queue for incoming signals.
+    Signals are written to SQLite before the webhook responds, so a restart
+    never loses an accepted signal. Items left in 'processing' by a crash are
+    returned to the queue on startup.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        Initialize the signal queue.
+
+        Args:
+            db_path: Path of the SQLite file backing the queue
+            max_attempts: Deliveries attempted before an item is marked failed
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._available = None  # asyncio.Event, created on the running loop
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signal_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                started_at REAL,
+                last_error TEXT
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_signal_queue_status ON signal_queue (status, id)")
+        self.recover()
+
+    @property
+    def available(self) -> asyncio.Event:
+        """Event set whenever new work may be available"""
+        if self._available is None:
+            self._available = asyncio.Event()
+        return self._available
+
+    def recover(self) -> int:
+        """Return items left in 'processing' by a previous run to the queue"""
+        with self._lock:
+            cursor = self.conn.execute("UPDATE signal_queue SET status = 'pending' WHERE status = 'processing'")
+        if cursor.rowcount:
+            logger.warning(f"Recovered {cursor.rowcount} unfinished signals in {self.db_path}")
+        return cursor.rowcount
+
+    def enqueue(self, payload: Any) -> int:
+        """
+        Persist a signal payload and return its queue ID.
+
+        Args:
+            payload: JSON-serialisable signal data
+        """
+        queue_id = self._insert(payload)
+        if self._available is not None:
+            self._available.set()
+        return queue_id
+
+    async def enqueue_async(self, payload: Any) -> int:
+        """Persist a signal payload without blocking the event loop and return its queue ID"""
+        queue_id = await asyncio.get_running_loop().run_in_executor(None, self._insert, payload)
+        # Woken on the loop thread; asyncio.Event is not thread-safe
+        self.available.set()
+        return queue_id
+
+    def _insert(self, payload: Any) -> int:
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO signal_queue (payload, enqueued_at) VALUES (?, ?)",
+                (json.dumps(payload), time.time())
+            )
+        return cursor.lastrowid
+
+    def claim(self) -> Optional[Tuple[int, Any, float, int]]:
+        """
+        Claim the oldest pending item.
+
+        Returns:
+            Tuple of (queue ID, payload, enqueued_at, attempts) or None when the queue is empty
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id, payload, enqueued_at, attempts FROM signal_queue "
+                "WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute(
+                "UPDATE signal_queue SET status = 'processing', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), row[0])
+            )
+        return row[0], json.loads(row[1]), row[2], row[3] + 1
+
+    def ack(self, item_id: int) -> None:
+        """Remove a delivered item"""
+        with self._lock:
+            self.conn.execute("DELETE FROM signal_queue WHERE id = ?", (item_id,))
+
+    def fail(self, item_id: int, error: str, retry: bool = True) -> None:
+        """
+        Record a failed delivery.
+
+        Args:
+            item_id: Queue ID
+            error: Error description stored for inspection
+            retry: Put the item back in the queue unless max_attempts is reached
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT attempts FROM signal_queue WHERE id = ?", (item_id,)).fetchone()
+            status = 'pending' if retry and row and row[0] < self.max_attempts else 'failed'
+            self.conn.execute(
+                "UPDATE signal_queue SET status = ?, last_error = ? WHERE id = ?",
+                (status, error[:1000], item_id)
+            )
+        if status == 'pending' and self._available is not None:
+            self._available.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth per status and the age of the oldest pending item"""
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM signal_queue GROUP BY status").fetchall())
+            oldest = self.conn.execute(
+                "SELECT MIN(enqueued_at) FROM signal_queue WHERE status = 'pending'"
+            ).fetchone()[0]
+        return {
+            "depth": counts.get('pending', 0),
+            "processing": counts.get('processing', 0),
+            "failed": counts.get('failed', 0),
+            "oldest_pending_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+        }
+
+
+class SignalQueueConsumer:
+    """
+    Pool of background workers that deliver queued signals.
+    Each worker claims one item at a time and hands its payload to `processor`.
+    A processor that raises has its item retried after an exponential backoff,
+    so a Telegram or database outage delays signals instead of dropping them.
+    """
+
+    def __init__(self, queue: SignalQueue, processor: Callable[[Any], Awaitable[bool]],
+                 workers: Optional[int] = None, poll_interval: float = 1.0,
+                 retry_backoff: Optional[float] = None):
+        """
+        Initialize the consumer pool.
+
+        Args:
+            queue: Queue to consume from
+            processor: Coroutine function delivering one payload, returns False for invalid
+                signals and raises on delivery errors
+            workers: Number of concurrent consumers
+            poll_interval: Seconds between polls when no wake-up arrives
+            retry_backoff: Seconds before the first retry, doubled for every further attempt
+        """
+        self.queue = queue
+        self.processor = processor
+        self.workers = int(workers or os.getenv("SIGNAL_QUEUE_WORKERS", 2))
+        self.poll_interval = poll_interval
+        self.retry_backoff = float(retry_backoff if retry_backoff is not None
+                                   else os.getenv("SIGNAL_QUEUE_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF))
+        self.tasks: List[asyncio.Task] = []
+        self.running = False
+
+        self.processed = 0
+        self.failed = 0
+        self.last_lag_seconds = 0.0
+        self._completed_at = deque(maxlen=1000)
+
+    async def start(self) -> None:
+        """Start the worker tasks"""
+        if self.running:
+            logger.warning("Signal queue consumer is already running")
+            return
+        self.running = True
+        self.tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} signal queue consumers")
+
+    async def stop(self) -> None:
+        """Stop the worker tasks; in-flight items are recovered on next start"""
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        logger.info("Stopped signal queue consumers")
+
+    async def _worker(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        while self.running:
+            item = await loop.run_in_executor(None, self.queue.claim)
+            if item is None:
+                event = self.queue.available
+                event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            item_id, payload, enqueued_at, attempts = item
+            self.last_lag_seconds = time.time() - enqueued_at
+            try:
+                result = await self.processor(payload)
+                if result is False:
+                    # Invalid signal - retrying will not help
+                    self.queue.fail(item_id, "processor returned False", retry=False)
+                    self.failed += 1
+                else:
+                    self.queue.ack(item_id)
+                    self.processed += 1
+                    self._completed_at.append(time.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Consumer {index} failed to deliver queued signal {item_id} (attempt {attempts}): {str(e)}")
+                self.failed += 1
+                if attempts < self.queue.max_attempts:
+                    # Keep the item claimed while backing off; a restart returns it to the queue
+                    await asyncio.sleep(min(self.retry_backoff * 2 ** (attempts - 1), MAX_RETRY_BACKOFF))
+                self.queue.fail(item_id, str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth, lag and consumer throughput"""
+        now = time.time()
+        recent = sum(1 for t in self._completed_at if now - t <= 60)
+        stats = self.queue.get_stats()
+        stats.update({
+            "workers": self.workers,
+            "running": self.running,
+            "processed": self.processed,
+            "failed_deliveries": self.failed,
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "throughput_per_minute": recent,
+        })
+        return stats
+
+
+_signal_queue: Optional[SignalQueue] = None
+
+
+def get_signal_queue() -> SignalQueue:
+    """Return the process-wide signal queue shared by all webhook routes"""
+    global _signal_queue
+    if _signal_queue is None:
+        _signal_queue = SignalQueue(os.getenv("SIGNAL_QUEUE_PATH", DEFAULT_QUEUE_PATH),
+                                    int(os.getenv("SIGNAL_QUEUE_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)))
+    return _signal_queue
@@ -8,24 +8,56 @@ import aiofiles
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_FLUSH_THRESHOLD = 500
+
 class SignalStorageService:
     """
     Service for storing trading signals persistently.
     Works as an extension to the current in-memory storage system without modifying main.py.
+    
+    In write-behind mode changes are coalesced in memory and written as one
+    snapshot after `flush_interval` seconds or `flush_threshold` changes,
+    whichever comes first. Snapshots are replaced atomically, and every change
+    is appended to a write-ahead journal first, so a crash between flushes
+    loses nothing: the journal is replayed on the next load.
     """
     
-    def __init__(self, storage_dir: str = "storage"):
+    def __init__(self, storage_dir: str = "storage", write_behind: Optional[bool] = None,
+                 flush_interval: Optional[float] = None, flush_threshold: Optional[int] = None,
+                 journal: Optional[bool] = None):
         """
         Initialize the signal storage service.
         
         Args:
             storage_dir: Directory where signal data will be stored
+            write_behind: Coalesce writes and flush them in the background
+            flush_interval: Seconds a change may wait before being flushed
+            flush_threshold: Number of pending changes that forces a flush
+            journal: Append every change to a write-ahead journal
         """
         self.storage_dir = storage_dir
         self.signals_file = os.path.join(storage_dir, "signals.json")
+        self.journal_file = os.path.join(storage_dir, "signals.journal")
         self.signals_by_user: Dict[str, Dict[str, Any]] = {}
         self.loaded = False
         
+        if write_behind is None:
+            write_behind = os.getenv("SIGNAL_STORAGE_WRITE_BEHIND", "true").lower() == "true"
+        if journal is None:
+            journal = os.getenv("SIGNAL_STORAGE_JOURNAL", "true").lower() == "true"
+        self.write_behind = write_behind
+        self.journal_enabled = journal
+        self.flush_interval = float(flush_interval or os.getenv("SIGNAL_STORAGE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+        self.flush_threshold = int(flush_threshold or os.getenv("SIGNAL_STORAGE_FLUSH_THRESHOLD", DEFAULT_FLUSH_THRESHOLD))
+        
+        self.dirty_users = set()
+        self.pending_changes = 0
+        self.flush_count = 0
+        self._journal = None
+        self._flush_task = None
+        self._flush_lock = asyncio.Lock()
+        
         # Create storage directory if it doesn't exist
         if not os.path.exists(storage_dir):
             os.makedirs(storage_dir, exist_ok=True)
@@ -50,21 +82,134 @@ class SignalStorageService:
             logger.error(f"Error loading signals from {self.signals_file}: {str(e)}")
             self.signals_by_user = {}
             self.loaded = True
+        finally:
+            self._replay_journal()
+    
+    def _replay_journal(self) -> None:
+        """Apply changes journaled after the last snapshot"""
+        replayed = 0
+        entry_users = set()
+        # A journal rotated by an interrupted flush is older than the active one
+        for path in (self.journal_file + ".flushing", self.journal_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-append
+                        logger.warning(f"Skipping unreadable journal entry in {path}")
+                        continue
+                    self._apply(entry)
+                    entry_users.add(entry.get("user_id"))
+                    replayed += 1
+        if replayed:
+            # Make sure replayed changes reach the next snapshot
+            self.dirty_users.update(entry_users)
+            self.pending_changes += replayed
+            logger.info(f"Replayed {replayed} journaled signal changes")
+    
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Apply one journal entry to the in-memory signals"""
+        user_id = entry.get("user_id")
+        op = entry.get("op")
+        if op == "put":
+            self.signals_by_user.setdefault(user_id, {})[entry["signal_id"]] = entry["data"]
+        elif op == "delete":
+            self.signals_by_user.get(user_id, {}).pop(entry["signal_id"], None)
+        elif op == "delete_user":
+            self.signals_by_user.pop(user_id, None)
+    
+    def _journal_append(self, entry: Dict[str, Any]) -> None:
+        """Write a change to the journal before it is acknowledged"""
+        if not self.journal_enabled:
+            return
+        if self._journal is None:
+            self._journal = open(self.journal_file, "a")
+        self._journal.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._journal.flush()
+    
+    async def _record(self, entry: Dict[str, Any]) -> None:
+        """Apply a change, journal it and persist it according to the write mode"""
+        self._journal_append(entry)
+        self._apply(entry)
+        self.dirty_users.add(entry.get("user_id"))
+        self.pending_changes += 1
+        
+        if not self.write_behind or self.pending_changes >= self.flush_threshold:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
     
-    async def save_signals(self) -> None:
+    async def flush(self) -> None:
+        """Write pending changes as a single snapshot"""
+        async with self._flush_lock:
+            if not self.dirty_users:
+                return
+            dirty_users = self.dirty_users
+            self.dirty_users = set()
+            self.pending_changes = 0
+            
+            # Start a new journal; the rotated one only covers what this snapshot contains
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            rotated = self.journal_file + ".flushing"
+            if os.path.exists(self.journal_file):
+                if os.path.exists(rotated):
+                    # An earlier flush did not complete; keep its entries ahead of ours
+                    with open(rotated, "a") as dst, open(self.journal_file, "r") as src:
+                        dst.write(src.read())
+                    os.remove(self.journal_file)
+                else:
+                    os.replace(self.journal_file, rotated)
+            
+            if not await self.save_signals():
+                # Keep the rotated journal so the changes survive until the next flush
+                self.dirty_users |= dirty_users
+                return
+            if os.path.exists(rotated):
+                os.remove(rotated)
+            self.flush_count += 1
+            logger.debug(f"Flushed signals for {len(dirty_users)} changed users")
+    
+    async def close(self) -> None:
+        """Flush pending changes and close the journal"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+    
+    async def save_signals(self) -> bool:
         """Save signals to the persistent storage file."""
         try:
             # Ensure storage directory exists
             if not os.path.exists(self.storage_dir):
                 os.makedirs(self.storage_dir, exist_ok=True)
             
-            # Save to file
-            async with aiofiles.open(self.signals_file, "w") as f:
-                await f.write(json.dumps(self.signals_by_user, indent=2))
+            # Serialize before awaiting so the snapshot is consistent
+            content = json.dumps(self.signals_by_user, separators=(",", ":"))
+            
+            # Write to a temporary file and rename it, so readers never see a partial file
+            tmp_file = self.signals_file + ".tmp"
+            async with aiofiles.open(tmp_file, "w") as f:
+                await f.write(content)
+                await f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.signals_file)
                 
             logger.info(f"Saved {len(self.signals_by_user)} users with signals to {self.signals_file}")
+            return True
         except Exception as e:
             logger.error(f"Error saving signals to {self.signals_file}: {str(e)}")
+            return False
     
     async def store_signal(self, user_id: str, signal_id: str, signal_data: Dict) -> None:
         """
@@ -79,20 +224,13 @@ class SignalStorageService:
         if not self.loaded:
             await self.load_signals()
             
-        # Ensure user exists in the dictionary
-        if user_id not in self.signals_by_user:
-            self.signals_by_user[user_id] = {}
-        
         # Add timestamp if not present
         if "timestamp" not in signal_data:
             signal_data["timestamp"] = datetime.now().isoformat()
         
-        # Store the signal
-        self.signals_by_user[user_id][signal_id] = signal_data
+        # Store the signal; the file is written now or on the next flush
+        await self._record({"op": "put", "user_id": user_id, "signal_id": signal_id, "data": signal_data})
         logger.info(f"Stored signal {signal_id} for user {user_id}")
-        
-        # Save signals to file
-        await self.save_signals()
     
     async def get_signal(self, user_id: str, signal_id: str) -> Optional[Dict]:
         """
@@ -173,8 +311,7 @@ class SignalStorageService:
             
         # Delete the signal
         if user_id in self.signals_by_user and signal_id in self.signals_by_user[user_id]:
-            del self.signals_by_user[user_id][signal_id]
-            await self.save_signals()
+            await self._record({"op": "delete", "user_id": user_id, "signal_id": signal_id})
             logger.info(f"Deleted signal {signal_id} for user {user_id}")
             return True
             
@@ -197,8 +334,7 @@ class SignalStorageService:
             
         # Delete signals for user
         if user_id in self.signals_by_user:
-            del self.signals_by_user[user_id]
-            await self.save_signals()
+            await self._record({"op": "delete_user", "user_id": user_id})
             logger.info(f"Deleted all signals for user {user_id}")
             return True
             
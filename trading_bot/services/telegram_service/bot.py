@@ -50,6 +50,9 @@ from trading_bot.services.telegram_service.states import (
     CALLBACK_SIGNALS_MANAGE, CALLBACK_BACK_MENU
 )
 import trading_bot.services.telegram_service.gif_utils as gif_utils
+from trading_bot.services.telegram_service.fanout import SignalFanout
+from trading_bot.utils.instrument_registry import INSTRUMENTS, INSTRUMENT_TIMEFRAME_MAP
+from trading_bot.utils.timeframes import STYLE_TIMEFRAME_MAP
 # Commenting out menu_flow import to be implemented later
 # from trading_bot.services.telegram_service.menu_flow import MenuFlow
 
@@ -396,69 +399,6 @@ STYLE_KEYBOARD = [
     [InlineKeyboardButton("⬅️ Back", callback_data="back_instrument")]
 ]
 
-# Timeframe mapping
-STYLE_TIMEFRAME_MAP = {
-    "test": "1m",
-    "scalp": "15m",
-    "intraday": "1h",
-    "swing": "4h"
-}
-
-# Mapping of instruments to their allowed timeframes - updated 2023-03-23
-INSTRUMENT_TIMEFRAME_MAP = {
-    # H1 timeframe only
-    "AUDJPY": "H1", 
-    "AUDCHF": "H1",
-    "EURCAD": "H1",
-    "EURGBP": "H1",
-    "GBPCHF": "H1",
-    "HK50": "H1",
-    "NZDJPY": "H1",
-    "USDCHF": "H1",
-    "USDJPY": "H1",  # USDJPY toegevoegd voor signaalabonnementen
-    "XRPUSD": "H1",
-    
-    # H4 timeframe only
-    "AUDCAD": "H4",
-    "AU200": "H4", 
-    "CADCHF": "H4",
-    "EURCHF": "H4",
-    "EURUSD": "H4",
-    "GBPCAD": "H4",
-    "LINKUSD": "H4",
-    "NZDCHF": "H4",
-    
-    # M15 timeframe only
-    "DOGEUSD": "M15",
-    "GBPNZD": "M15",
-    "NZDUSD": "M15",
-    "SOLUSD": "M15",
-    "UK100": "M15",
-    "XAUUSD": "M15",
-    
-    # M30 timeframe only
-    "BNBUSD": "M30",
-    "DOTUSD": "M30",
-    "ETHUSD": "M30",
-    "EURAUD": "M30",
-    "EURJPY": "M30",
-    "GBPAUD": "M30",
-    "GBPUSD": "M30",
-    "NZDCAD": "M30",
-    "US30": "M30",
-    "US500": "M30",
-    "USDCAD": "M30",
-    "XLMUSD": "M30",
-    "XTIUSD": "M30",
-    "DE40": "M30",
-    "BTCUSD": "M30",  # Added for consistency with CRYPTO_KEYBOARD_SIGNALS
-    "US100": "M30",   # Added for consistency with INDICES_KEYBOARD_SIGNALS
-    "XAGUSD": "M15",  # Added for consistency with COMMODITIES_KEYBOARD_SIGNALS
-    "USOIL": "M30"    # Added for consistency with COMMODITIES_KEYBOARD_SIGNALS
-    
-    # Removed as requested: EU50, FR40, LTCUSD
-}
-
 # Map common timeframe notations
 TIMEFRAME_DISPLAY_MAP = {
     "M15": "15 Minutes",
@@ -470,39 +410,7 @@ TIMEFRAME_DISPLAY_MAP = {
 # Voeg deze functie toe aan het begin van bot.py, na de imports
 def _detect_market(instrument: str) -> str:
     """Detecteer market type gebaseerd op instrument"""
-    instrument = instrument.upper()
-    
-    # Commodities eerst checken
-    commodities = [
-        "XAUUSD",  # Gold
-        "XAGUSD",  # Silver
-        "WTIUSD",  # Oil WTI
-        "BCOUSD",  # Oil Brent
-        "USOIL",   # Oil WTI (alternative symbol)
-    ]
-    if instrument in commodities:
-        logger.info(f"Detected {instrument} as commodity")
-        return "commodities"
-    
-    # Crypto pairs
-    crypto_base = ["BTC", "ETH", "XRP", "SOL", "BNB", "ADA", "DOT", "LINK"]
-    if any(c in instrument for c in crypto_base):
-        logger.info(f"Detected {instrument} as crypto")
-        return "crypto"
-    
-    # Major indices
-    indices = [
-        "US30", "US500", "US100",  # US indices
-        "UK100", "DE40", "FR40",   # European indices
-        "JP225", "AU200", "HK50"   # Asian indices
-    ]
-    if instrument in indices:
-        logger.info(f"Detected {instrument} as index")
-        return "indices"
-    
-    # Forex pairs als default
-    logger.info(f"Detected {instrument} as forex")
-    return "forex"
+    return INSTRUMENTS.market(instrument)
 
 # Voeg dit toe als decorator functie bovenaan het bestand na de imports
 def require_subscription(func):
@@ -676,6 +584,9 @@ class TelegramService:
                 # Access the bot from the application
                 self.bot = self.application.bot
                 
+                # Rate-aware fan-out engine for signal broadcasts
+                self.signal_fanout = SignalFanout(self.bot)
+                
                 # Register handlers if not using lazy_init
                 if not lazy_init:
                     self._register_handlers(self.application)
@@ -2652,9 +2563,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                 
                 try:
                     # Delete the signal subscription
-                    response = self.db.supabase.table('signal_subscriptions').delete().eq('id', signal_id).execute()
-                    
-                    if response and response.data:
+                    if await self.db.delete_signal_subscription(signal_id):
                         # Successfully deleted
                         await query.answer("Signal subscription removed successfully")
                     else:
@@ -2675,9 +2584,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                 
                 try:
                     # Delete all signal subscriptions for this user
-                    response = self.db.supabase.table('signal_subscriptions').delete().eq('user_id', user_id).execute()
-                    
-                    if response and response.data:
+                    if await self.db.delete_all_signal_subscriptions(user_id):
                         # Successfully deleted
                         await query.answer("All signal subscriptions removed successfully")
                     else:
@@ -2935,7 +2842,7 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             
             try:
                 # Check if subscription already exists
-                response = self.db.supabase.table('signal_subscriptions').select('*').eq('user_id', user_id).eq('instrument', instrument).eq('timeframe', timeframe).execute()
+                response = await self.db.db_client.table('signal_subscriptions').select('*').eq('user_id', user_id).eq('instrument', instrument).eq('timeframe', timeframe).execute()
                 
                 if response and response.data and len(response.data) > 0:
                     # Subscription already exists
@@ -2944,15 +2851,17 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
                     # Create new subscription
                     market = _detect_market(instrument)
                     
+                    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
                     subscription_data = {
                         'user_id': user_id,
                         'instrument': instrument,
                         'timeframe': timeframe,
                         'market': market,
-                        'created_at': datetime.now().isoformat()
+                        'created_at': now,
+                        'updated_at': now
                     }
                     
-                    insert_response = self.db.supabase.table('signal_subscriptions').insert(subscription_data).execute()
+                    insert_response = await self.db.db_client.table('signal_subscriptions').insert(subscription_data).execute()
                     
                     if insert_response and insert_response.data:
                         message = f"✅ Successfully subscribed to <b>{instrument}</b> signals on {timeframe_display} timeframe!"
@@ -3217,80 +3126,47 @@ To continue using Sigmapips AI and receive trading signals, please reactivate yo
             with open(f"{self.signals_dir}/{signal_id}.json", 'w') as f:
                 json.dump(normalized_data, f)
             
-            # FOR TESTING: Always send to admin for testing
-            if hasattr(self, 'admin_users') and self.admin_users:
-                try:
-                    logger.info(f"Sending signal to admin users for testing: {self.admin_users}")
-                    for admin_id in self.admin_users:
-                        # Prepare keyboard with analysis options
-                        keyboard = [
-                            [InlineKeyboardButton("🔍 Analyze Market", callback_data=f"analyze_from_signal_{instrument}_{signal_id}")]
-                        ]
-                        
-                        # Send the signal
-                        await self.bot.send_message(
-                            chat_id=admin_id,
-                            text=message,
-                            parse_mode=ParseMode.HTML,
-                            reply_markup=InlineKeyboardMarkup(keyboard)
-                        )
-                        logger.info(f"Test signal sent to admin {admin_id}")
-                        
-                        # Store signal reference for quick access
-                        if not hasattr(self, 'user_signals'):
-                            self.user_signals = {}
-                            
-                        admin_str_id = str(admin_id)
-                        if admin_str_id not in self.user_signals:
-                            self.user_signals[admin_str_id] = {}
-                        
-                        self.user_signals[admin_str_id][signal_id] = normalized_data
-                except Exception as e:
-                    logger.error(f"Error sending test signal to admin: {str(e)}")
-            
             # Get subscribers for this instrument
             timeframe = normalized_data.get('timeframe', '1h')
             subscribers = await self.get_subscribers_for_instrument(instrument, timeframe)
             
-            if not subscribers:
+            # FOR TESTING: Always send to admin for testing
+            recipients = list(self.admin_users) if hasattr(self, 'admin_users') and self.admin_users else []
+            recipients.extend(subscribers or [])
+            
+            if not recipients:
                 logger.warning(f"No subscribers found for {instrument}")
                 return True  # Successfully processed, just no subscribers
             
             # Send signal to all subscribers
-            logger.info(f"Sending signal {signal_id} to {len(subscribers)} subscribers")
+            logger.info(f"Sending signal {signal_id} to {len(recipients)} recipients")
             
-            sent_count = 0
-            for user_id in subscribers:
-                try:
-                    # Prepare keyboard with analysis options
-                    keyboard = [
-                        [InlineKeyboardButton("🔍 Analyze Market", callback_data=f"analyze_from_signal_{instrument}_{signal_id}")]
-                    ]
-                    
-                    # Send the signal
-                    await self.bot.send_message(
-                        chat_id=user_id,
-                        text=message,
-                        parse_mode=ParseMode.HTML,
-                        reply_markup=InlineKeyboardMarkup(keyboard)
-                    )
-                    
-                    sent_count += 1
-                    
-                    # Store signal reference for quick access
-                    if not hasattr(self, 'user_signals'):
-                        self.user_signals = {}
-                        
-                    user_str_id = str(user_id)
-                    if user_str_id not in self.user_signals:
-                        self.user_signals[user_str_id] = {}
-                    
-                    self.user_signals[user_str_id][signal_id] = normalized_data
-                    
-                except Exception as e:
-                    logger.error(f"Error sending signal to user {user_id}: {str(e)}")
+            # Every recipient gets the same message and analysis keyboard
+            keyboard = [
+                [InlineKeyboardButton("🔍 Analyze Market", callback_data=f"analyze_from_signal_{instrument}_{signal_id}")]
+            ]
+            send_kwargs = {
+                'text': message,
+                'parse_mode': ParseMode.HTML,
+                'reply_markup': InlineKeyboardMarkup(keyboard)
+            }
+            
+            def remember_signal(user_id):
+                # Store signal reference for quick access
+                user_str_id = str(user_id)
+                if user_str_id not in self.user_signals:
+                    self.user_signals[user_str_id] = {}
+                self.user_signals[user_str_id][signal_id] = normalized_data
+            
+            stats = await self.signal_fanout.broadcast(
+                recipients,
+                lambda user_id: send_kwargs,
+                on_sent=remember_signal,
+                label=signal_id
+            )
             
-            logger.info(f"Successfully sent signal {signal_id} to {sent_count}/{len(subscribers)} subscribers")
+            logger.info(f"Successfully sent signal {signal_id} to {stats['sent']}/{stats['recipients']} recipients "
+                        f"in {stats['duration_seconds']}s ({stats['messages_per_second']} msg/s)")
             return True
             
         except Exception as e:
@@ -0,0 +1,99 @@
+"""
+Per-user coalescing of signal bursts into digest messages
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from trading_bot.services.telegram_service.fanout import unique_chat_ids
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 0.0
+
+
+class SignalDigestBuffer:
+    """
+    Collects signals per recipient for a short window before sending.
+
+    The first signal of a burst opens the window; every signal added before it
+    closes is appended to the pending list of each of its recipients. When the
+    window closes, `flush_callback` receives all pending signals grouped by
+    user, so a user subscribed to several instruments that fired together gets
+    one message instead of one per signal. A window of 0 disables coalescing.
+
+    Buffered signals live only in memory: a signal counts as delivered once it
+    is buffered, so digest mode gives up the signal queue's redelivery after a
+    crash. `close` sends what is still pending on a clean shutdown.
+    """
+
+    def __init__(self, flush_callback: Callable[[Dict[Any, List[Dict[str, Any]]]], Awaitable[Any]],
+                 window_seconds: Optional[float] = None):
+        """
+        Initialize the buffer.
+
+        Args:
+            flush_callback: Coroutine receiving {user_id: [signal, ...]} when a window closes
+            window_seconds: Length of the coalescing window
+        """
+        self.flush_callback = flush_callback
+        self.window_seconds = float(window_seconds if window_seconds is not None
+                                    else os.getenv("SIGNAL_DIGEST_WINDOW_SECONDS", DEFAULT_WINDOW_SECONDS))
+        self.pending: Dict[Any, List[Dict[str, Any]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Set by close() to end an open window early
+        self._closing = asyncio.Event()
+
+        self.signals_buffered = 0
+        self.windows_flushed = 0
+        self.windows_failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    def add(self, signal: Dict[str, Any], recipients: Iterable[Any]) -> None:
+        """Buffer a signal for its recipients and open a window if none is open"""
+        for user_id in unique_chat_ids(recipients):
+            self.pending.setdefault(user_id, []).append(signal)
+        self.signals_buffered += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.wait_for(self._closing.wait(), self.window_seconds)
+        except asyncio.TimeoutError:
+            pass
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Hand all pending signals to the flush callback"""
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        self.windows_flushed += 1
+        try:
+            await self.flush_callback(pending)
+        except Exception as e:
+            self.windows_failed += 1
+            logger.error(f"Error flushing signal digest for {len(pending)} users: {str(e)}")
+
+    async def close(self) -> None:
+        """Close the open window and send everything still pending, e.g. on shutdown"""
+        self._closing.set()
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the window length and buffer counters"""
+        return {
+            "window_seconds": self.window_seconds,
+            "pending_users": len(self.pending),
+            "signals_buffered": self.signals_buffered,
+            "windows_flushed": self.windows_flushed,
+            "windows_failed": self.windows_failed,
+        }
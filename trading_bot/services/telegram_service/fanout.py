@@ -0,0 +1,281 @@
+"""
+Rate-aware fan-out engine for broadcasting signals to Telegram subscribers
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly 30 messages per second across all chats and
+# about one message per second inside a single chat
+DEFAULT_GLOBAL_RATE = 30.0
+DEFAULT_PER_CHAT_RATE = 1.0
+DEFAULT_WORKERS = 16
+DEFAULT_MAX_RETRIES = 3
+
+
+def unique_chat_ids(chat_ids: Iterable[Any]) -> List[Any]:
+    """Deduplicate chat IDs in order, treating numeric strings and ints as the same chat"""
+    unique: Dict[Any, None] = {}
+    for chat_id in chat_ids:
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):
+            # Channel usernames such as "@channel" stay strings
+            pass
+        unique.setdefault(chat_id, None)
+    return list(unique)
+
+
+class TokenBucket:
+    """
+    Async token bucket limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Callers await `acquire()` until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available and consume them"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                # Sleep just long enough for the missing tokens to refill
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def drain(self, seconds: float) -> None:
+        """Block the bucket for `seconds`, e.g. after a flood-control response"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class PerChatLimiter:
+    """
+    Enforces the per-chat send rate.
+
+    Keeps only the next allowed send time per chat, and prunes chats that are
+    idle so memory stays proportional to recently used chats.
+    """
+
+    def __init__(self, rate: float = DEFAULT_PER_CHAT_RATE, prune_after: int = 10000):
+        self.interval = 1.0 / float(rate)
+        self.prune_after = prune_after
+        self.next_allowed: Dict[Any, float] = {}
+
+    def _prune(self, now: float) -> None:
+        self.next_allowed = {chat: t for chat, t in self.next_allowed.items() if t > now}
+
+    async def acquire(self, chat_id: Any) -> None:
+        """Wait until `chat_id` may receive another message"""
+        now = time.monotonic()
+        if len(self.next_allowed) > self.prune_after:
+            self._prune(now)
+
+        allowed_at = max(now, self.next_allowed.get(chat_id, 0.0))
+        # Reserve the slot before sleeping so concurrent senders queue up behind it
+        self.next_allowed[chat_id] = allowed_at + self.interval
+        if allowed_at > now:
+            await asyncio.sleep(allowed_at - now)
+
+    def delay(self, chat_id: Any, seconds: float) -> None:
+        """Push back the next allowed send for a chat"""
+        now = time.monotonic()
+        self.next_allowed[chat_id] = max(self.next_allowed.get(chat_id, now), now + seconds)
+
+
+class SignalFanout:
+    """
+    Broadcasts messages to many chats with a bounded pool of async workers.
+
+    All workers share one global token bucket and one per-chat limiter, so the
+    broadcast runs close to the Telegram API ceiling without tripping flood
+    control. Each broadcast returns its throughput and completion time.
+    """
+
+    def __init__(self, bot, workers: Optional[int] = None, global_rate: Optional[float] = None,
+                 per_chat_rate: Optional[float] = None, max_retries: Optional[int] = None):
+        """
+        Initialize the fan-out engine.
+
+        Args:
+            bot: Telegram bot used to send messages
+            workers: Number of concurrent send workers
+            global_rate: Messages per second across all chats
+            per_chat_rate: Messages per second to a single chat
+            max_retries: Retries for flood-control and transient network errors
+        """
+        self.bot = bot
+        self.workers = int(workers or os.getenv("SIGNAL_FANOUT_WORKERS", DEFAULT_WORKERS))
+        self.global_rate = float(global_rate or os.getenv("TELEGRAM_GLOBAL_RATE", DEFAULT_GLOBAL_RATE))
+        self.per_chat_rate = float(per_chat_rate or os.getenv("TELEGRAM_PER_CHAT_RATE", DEFAULT_PER_CHAT_RATE))
+        self.max_retries = int(max_retries if max_retries is not None else DEFAULT_MAX_RETRIES)
+
+        self.global_bucket = TokenBucket(self.global_rate)
+        self.chat_limiter = PerChatLimiter(self.per_chat_rate)
+
+        # Stats of the most recent broadcasts, newest last
+        self.history: List[Dict[str, Any]] = []
+        self.history_size = 50
+
+    async def _send_one(self, chat_id: Any, send_kwargs: Dict[str, Any]) -> None:
+        """Send a single message, honouring rate limits and retrying flood-control errors"""
+        attempt = 0
+        while True:
+            await self.chat_limiter.acquire(chat_id)
+            await self.global_bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=chat_id, **send_kwargs)
+                return
+            except Exception as e:
+                attempt += 1
+                # telegram.error.RetryAfter carries the number of seconds to back off
+                retry_after = getattr(e, "retry_after", None)
+                if hasattr(retry_after, "total_seconds"):
+                    retry_after = retry_after.total_seconds()
+                transient = type(e).__name__ in ("TimedOut", "NetworkError")
+
+                if attempt > self.max_retries or (retry_after is None and not transient):
+                    raise
+
+                if retry_after is not None:
+                    logger.warning(f"Flood control hit while sending to {chat_id}, backing off {retry_after}s")
+                    self.global_bucket.drain(float(retry_after))
+                    self.chat_limiter.delay(chat_id, float(retry_after))
+                else:
+                    await asyncio.sleep(min(2 ** attempt, 10))
+
+    async def broadcast(self, chat_ids: Iterable[Any],
+                        build_message: Callable[[Any], Dict[str, Any]],
+                        on_sent: Optional[Callable[[Any], Any]] = None,
+                        label: str = "broadcast") -> Dict[str, Any]:
+        """
+        Send a message to every chat in `chat_ids`.
+
+        Args:
+            chat_ids: Recipients
+            build_message: Returns the `send_message` keyword arguments for a chat
+            on_sent: Optional callback (sync or async) invoked after a successful send
+            label: Name used in logs and stats, usually the signal ID
+
+        Returns:
+            Dictionary with sent/failed counts, failed chat IDs, duration and throughput
+        """
+        recipients = unique_chat_ids(chat_ids)
+        return await self._deliver(recipients, lambda chat_id: chat_id, build_message, on_sent, label)
+
+    async def broadcast_messages(self, messages: List[Tuple[Any, Dict[str, Any]]],
+                                 on_sent: Optional[Callable[[int], Any]] = None,
+                                 label: str = "batch") -> Dict[str, Any]:
+        """
+        Send several messages, possibly to the same chat, through one worker pool.
+
+        Args:
+            messages: List of (chat_id, send_message keyword arguments)
+            on_sent: Optional callback (sync or async) invoked with the index of each delivered message
+            label: Name used in logs and stats
+
+        Returns:
+            Dictionary with sent/failed counts, failed chat IDs, duration and throughput
+        """
+        return await self._deliver(
+            list(range(len(messages))),
+            lambda index: messages[index][0],
+            lambda index: messages[index][1],
+            on_sent,
+            label
+        )
+
+    async def _deliver(self, items: List[Any], chat_of: Callable[[Any], Any],
+                       build_message: Callable[[Any], Dict[str, Any]],
+                       on_sent: Optional[Callable[[Any], Any]], label: str) -> Dict[str, Any]:
+        """Run the worker pool over `items`, where `chat_of(item)` is the chat each item goes to"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+
+        sent: List[Any] = []
+        failed: Dict[Any, str] = {}
+        started = time.monotonic()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                chat_id = chat_of(item)
+                try:
+                    try:
+                        await self._send_one(chat_id, build_message(item))
+                    except Exception as e:
+                        failed[chat_id] = str(e)
+                        logger.error(f"Error sending {label} to {chat_id}: {str(e)}")
+                        continue
+                    sent.append(chat_id)
+                    if on_sent:
+                        # The message was delivered; a failing callback must not count it as failed
+                        try:
+                            result = on_sent(item)
+                            if asyncio.iscoroutine(result):
+                                await result
+                        except Exception as e:
+                            logger.error(f"Error in on_sent callback of {label} for {chat_id}: {str(e)}")
+                finally:
+                    queue.task_done()
+
+        worker_count = max(1, min(self.workers, len(items)))
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+
+        duration = time.monotonic() - started
+        stats = {
+            "label": label,
+            "recipients": len({chat_of(item) for item in items}),
+            "messages": len(items),
+            "sent": len(sent),
+            "failed": len(failed),
+            "failed_chat_ids": list(failed.keys()),
+            "sent_chat_ids": sent,
+            "workers": worker_count,
+            "duration_seconds": round(duration, 3),
+            "messages_per_second": round(len(sent) / duration, 2) if duration > 0 else float(len(sent)),
+            "completed_at": time.time(),
+        }
+
+        self.history.append({k: v for k, v in stats.items() if k not in ("failed_chat_ids", "sent_chat_ids")})
+        del self.history[:-self.history_size]
+
+        logger.info(
+            f"Fan-out {label}: sent {stats['sent']}/{stats['messages']} to {stats['recipients']} chats "
+            f"in {stats['duration_seconds']}s ({stats['messages_per_second']} msg/s, {worker_count} workers)"
+        )
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the configuration and recent broadcast history"""
+        return {
+            "workers": self.workers,
+            "global_rate": self.global_rate,
+            "per_chat_rate": self.per_chat_rate,
+            "recent_broadcasts": list(self.history),
+        }
@@ -3,6 +3,8 @@ from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 import logging
 
+from trading_bot.services.telegram_service.media_registry import MEDIA_REGISTRY
+
 logger = logging.getLogger(__name__)
 
 # Nieuwe functies voor het ophalen van GIF URLs
@@ -43,8 +45,8 @@ async def send_gif_with_caption(update: Update, gif_url: str, caption: str, repl
     """
     try:
         # Verzend de GIF met caption en keyboard
-        await update.message.reply_animation(
-            animation=gif_url,
+        await MEDIA_REGISTRY.send(
+            update.message.reply_animation, "animation", gif_url,
             caption=caption,
             parse_mode=parse_mode,
             reply_markup=reply_markup
@@ -73,9 +75,9 @@ async def send_welcome_gif(bot, chat_id, caption=None):
         gif_url = "https://media.giphy.com/media/gSzIKNrqtotEYrZv7i/giphy.gif"
         
         # Send the GIF animation
-        await bot.send_animation(
+        await MEDIA_REGISTRY.send(
+            bot.send_animation, "animation", gif_url,
             chat_id=chat_id,
-            animation=gif_url,
             caption=caption or "🤖 <b>SigmaPips AI is Ready!</b>",
             parse_mode=ParseMode.HTML
         )
@@ -91,9 +93,9 @@ async def send_menu_gif(bot, chat_id, caption=None):
         gif_url = "https://media.giphy.com/media/gSzIKNrqtotEYrZv7i/giphy.gif"
         
         # Send the GIF animation
-        await bot.send_animation(
+        await MEDIA_REGISTRY.send(
+            bot.send_animation, "animation", gif_url,
             chat_id=chat_id,
-            animation=gif_url,
             caption=caption or "📊 <b>SigmaPips AI Menu</b>",
             parse_mode=ParseMode.HTML
         )
@@ -118,9 +120,9 @@ async def send_analyse_gif(bot, chat_id, caption=None):
         gif_url = "https://media.giphy.com/media/gSzIKNrqtotEYrZv7i/giphy.gif"
         
         # Stuur de GIF animatie
-        await bot.send_animation(
+        await MEDIA_REGISTRY.send(
+            bot.send_animation, "animation", gif_url,
             chat_id=chat_id,
-            animation=gif_url,
             caption=caption or "📈 <b>SigmaPips AI Analysis</b>",
             parse_mode=ParseMode.HTML
         )
@@ -136,9 +138,9 @@ async def send_signals_gif(bot, chat_id, caption=None):
         gif_url = "https://media.giphy.com/media/gSzIKNrqtotEYrZv7i/giphy.gif"
         
         # Stuur de GIF animatie
-        await bot.send_animation(
+        await MEDIA_REGISTRY.send(
+            bot.send_animation, "animation", gif_url,
             chat_id=chat_id,
-            animation=gif_url,
             caption=caption or "🎯 <b>SigmaPips AI Signals</b>",
             parse_mode=ParseMode.HTML
         )
@@ -154,9 +156,9 @@ async def send_loading_gif(bot, chat_id, caption=None):
         gif_url = await get_loading_gif()
         
         # Explicitly use send_animation to ensure it's treated as a GIF
-        await bot.send_animation(
+        await MEDIA_REGISTRY.send(
+            bot.send_animation, "animation", gif_url,
             chat_id=chat_id,
-            animation=gif_url,
             caption=caption or "⏳ <b>Analyzing...</b>",
             parse_mode=ParseMode.HTML
         )
@@ -280,12 +282,10 @@ async def update_message_with_gif(query: 'CallbackQuery', gif_url: str, text: st
         try:
             from telegram import InputMediaAnimation
             # Try to update the media directly
-            await query.edit_message_media(
-                media=InputMediaAnimation(
-                    media=gif_url,
-                    caption=text,
-                    parse_mode=parse_mode
-                ),
+            await MEDIA_REGISTRY.edit(
+                query.edit_message_media,
+                lambda media: InputMediaAnimation(media=media, caption=text, parse_mode=parse_mode),
+                gif_url,
                 reply_markup=reply_markup
             )
             return True
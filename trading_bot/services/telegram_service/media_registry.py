@@ -0,0 +1,171 @@
+"""
+Registry of Telegram file_ids, so identical media is uploaded only once
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from trading_bot.utils.bounded_cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+# Telegram errors meaning a stored file_id can no longer be sent
+STALE_FILE_ID_ERRORS = ("wrong file identifier", "wrong remote file", "file reference", "file_id")
+
+
+def _file_id(message: Any) -> Optional[str]:
+    """The file_id Telegram assigned to the media of a sent message"""
+    if message is None or isinstance(message, bool):
+        return None
+    for attr in ("animation", "video", "document", "sticker", "audio", "voice"):
+        media = getattr(message, attr, None)
+        if media is not None and getattr(media, "file_id", None):
+            return media.file_id
+    photo = getattr(message, "photo", None)
+    if photo:
+        # Telegram returns every generated size; the last one is the largest
+        return photo[-1].file_id
+    return None
+
+
+class MediaRegistry:
+    """
+    Maps media content to the file_id Telegram returned for its first upload.
+
+    URLs are keyed by the URL and raw bytes by their SHA-1, so a chart served
+    from the cache to many users is uploaded once and then sent by file_id.
+    Entries stay valid for `ttl` seconds. Concurrent sends of media that has
+    not been uploaded yet wait for the first upload instead of repeating it,
+    and a file_id Telegram rejects is forgotten and the media uploaded again.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None,
+                 name: str = "telegram_media"):
+        """
+        Initialize an empty registry.
+
+        Args:
+            ttl: Seconds a file_id is reused before the media is uploaded again
+            max_entries: Maximum number of remembered file_ids
+            name: Label used in logs and statistics
+        """
+        self.ttl = float(ttl if ttl is not None else os.getenv("TELEGRAM_MEDIA_FILE_ID_TTL", DEFAULT_TTL))
+        self.max_entries = int(max_entries or os.getenv("TELEGRAM_MEDIA_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.name = name
+        self._file_ids = BoundedCache(max_items=self.max_entries, ttl=self.ttl, name=name)
+        # key -> first upload in progress
+        self._uploads: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "uploads": 0, "waits": 0, "stale": 0}
+
+    @staticmethod
+    def key(media: Any) -> Optional[str]:
+        """Registry key of media content, or None for media that cannot be keyed (e.g. file_ids, streams)"""
+        if isinstance(media, str):
+            return f"url:{media}" if media.startswith(("http://", "https://")) else None
+        if isinstance(media, (bytes, bytearray, memoryview)):
+            return f"sha1:{hashlib.sha1(media).hexdigest()}"
+        return None
+
+    def resolve(self, media: Any) -> Any:
+        """Return the stored file_id for the media, or the media itself"""
+        key = self.key(media)
+        if key is None:
+            return media
+        return self._file_ids.get(key) or media
+
+    def remember(self, media: Any, message: Any) -> Optional[str]:
+        """Record the file_id of a message that carried the media"""
+        key = self.key(media)
+        file_id = _file_id(message)
+        if key is not None and file_id:
+            self._file_ids.set(key, file_id)
+        return file_id
+
+    def forget(self, media: Any) -> None:
+        """Drop the stored file_id of the media"""
+        key = self.key(media)
+        if key is not None:
+            self._file_ids.pop(key)
+
+    @staticmethod
+    def _is_stale(error: Exception) -> bool:
+        text = str(error).lower()
+        return any(marker in text for marker in STALE_FILE_ID_ERRORS)
+
+    async def _call(self, media: Any, call: Callable[[Any], Awaitable[Any]]) -> Any:
+        key = self.key(media)
+        if key is None:
+            return await call(media)
+
+        upload = self._uploads.get(key)
+        if upload is not None and key not in self._file_ids:
+            self.stats["waits"] += 1
+            try:
+                await asyncio.shield(upload)
+            except Exception:
+                pass
+
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            self.stats["hits"] += 1
+            try:
+                return await call(file_id)
+            except Exception as e:
+                if not self._is_stale(e):
+                    raise
+                self.stats["stale"] += 1
+                logger.warning(f"[{self.name}] Stored file_id rejected, uploading again: {str(e)}")
+                self._file_ids.pop(key)
+
+        # First upload of this content; concurrent senders wait for its file_id
+        owner = key not in self._uploads
+        if owner:
+            self._uploads[key] = asyncio.get_running_loop().create_future()
+        self.stats["uploads"] += 1
+        try:
+            message = await call(media)
+            self.remember(media, message)
+            return message
+        finally:
+            if owner:
+                done = self._uploads.pop(key)
+                if not done.done():
+                    done.set_result(None)
+
+    async def send(self, method: Callable[..., Awaitable[Any]], field: str, media: Any, **kwargs) -> Any:
+        """
+        Send media with a bot method, reusing a stored file_id.
+
+        Args:
+            method: Bot or message method, e.g. `bot.send_photo` or `message.reply_animation`
+            field: Name of the media argument of the method, e.g. "photo" or "animation"
+            media: URL or bytes of the media
+            kwargs: Remaining arguments of the method
+        """
+        return await self._call(media, lambda value: method(**{field: value}, **kwargs))
+
+    async def edit(self, method: Callable[..., Awaitable[Any]], input_media: Callable[[Any], Any],
+                   media: Any, **kwargs) -> Any:
+        """
+        Replace the media of a message, reusing a stored file_id.
+
+        Args:
+            method: Edit method, e.g. `query.edit_message_media`
+            input_media: Builds the InputMedia object for a URL, bytes or file_id
+            media: URL or bytes of the media
+            kwargs: Remaining arguments of the method
+        """
+        return await self._call(media, lambda value: method(media=input_media(value), **kwargs))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return reuse counters; `hits` are sends that skipped the upload"""
+        return {"name": self.name, **self.stats, "entries": len(self._file_ids), "ttl": self.ttl}
+
+
+# Shared by every sender in the process; file_ids are only valid for the bot that received them
+MEDIA_REGISTRY = MediaRegistry()
@@ -26,6 +26,7 @@ class SharedState:
         self.telegram_service = None
         self.db = None
         self.stripe_service = None
+        self.signal_consumer = None
         self.shutdown_event = asyncio.Event()
         
 
@@ -79,6 +80,13 @@ async def lifespan(app):
             
         logger.info("Bot initialized and ready")
         
+        # Deliver queued webhook signals through the shared bot instance, only once it
+        # is initialized so signals queued across a restart are not handed to a cold bot
+        api_module.telegram_service = shared_state.telegram_service
+        shared_state.signal_consumer = SignalQueueConsumer(get_signal_queue(), api_module.deliver_signal)
+        api_module.signal_consumer = shared_state.signal_consumer
+        await shared_state.signal_consumer.start()
+        
     except Exception as e:
         logger.error(f"Failed to initialize Telegram bot: {str(e)}")
         logger.exception(e)
@@ -86,6 +94,12 @@ async def lifespan(app):
     # Continue with FastAPI startup
     yield
     
+    # Stop taking queued signals and send buffered digests while the bot can still send
+    if shared_state.signal_consumer:
+        await shared_state.signal_consumer.stop()
+    if shared_state.telegram_service is not None:
+        await shared_state.telegram_service.signal_digest.close()
+    
     # Signal bot to shut down when FastAPI is shutting down
     logger.info("FastAPI shutting down, stopping Telegram bot")
     shared_state.shutdown_event.set()
@@ -104,7 +118,10 @@ from fastapi import FastAPI
 app = FastAPI(lifespan=lifespan)
 
 # Import the app routes
+import trading_bot.app as api_module
 from trading_bot.app import app as api_app
+from trading_bot.services.signal_queue import SignalQueueConsumer, get_signal_queue
+from trading_bot.services.signal_dedup import get_signal_deduplicator
 
 # Copy all routes and middleware from the original app
 app.routes.extend(api_app.routes)
@@ -116,11 +133,12 @@ app.state.shared_state = shared_state
 
 # Add a signal endpoint override that uses the existing bot instance
 from fastapi import Request, HTTPException
+from fastapi.responses import JSONResponse
 import json
 
 @app.post("/signal")
 async def process_signal(request: Request):
-    """Process signal using the existing bot instance"""
+    """Queue a signal for delivery by the existing bot instance"""
     try:
         # Parse signal data from JSON
         signal_data = await request.json()
@@ -129,21 +147,32 @@ async def process_signal(request: Request):
         if shared_state.telegram_service is None:
             raise HTTPException(status_code=503, detail="Telegram bot not initialized")
         
-        # Process signal using the existing bot instance
-        result = await shared_state.telegram_service.process_signal(signal_data)
+        # Acknowledge retried or duplicated alerts without processing them again
+        deduplicator = await get_signal_deduplicator()
+        is_duplicate, fingerprint = await deduplicator.check(signal_data)
+        if is_duplicate:
+            return {"status": "duplicate", "message": "Signal already received, not processed again"}
         
-        if result:
-            logger.info("Signal processed successfully")
-            return {"status": "success", "message": "Signal processed successfully"}
-        else:
-            logger.error("Failed to process signal")
-            raise HTTPException(status_code=500, detail="Failed to process signal")
+        # Queue the signal; background consumers deliver it with the existing bot instance
+        try:
+            queue_id = await get_signal_queue().enqueue_async(signal_data)
+        except Exception:
+            await deduplicator.forget(fingerprint)
+            raise
+        logger.info(f"Signal queued for delivery with queue ID {queue_id}")
+        
+        return JSONResponse(
+            status_code=202,
+            content={"status": "accepted", "message": "Signal queued for delivery", "queue_id": queue_id}
+        )
             
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON data")
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing signal: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error processing signal: {str(e)}")
+        logger.error(f"Error queueing signal: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queueing signal: {str(e)}")
 
 # Register additional webhook routes
 from trading_bot.routing import register_webhook_routes
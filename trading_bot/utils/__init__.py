@@ -2,6 +2,10 @@
 Utility modules for the trading bot
 """
 
-from . import browser_utils
+from .bounded_cache import BoundedCache
+from .instrument_registry import INSTRUMENTS, InstrumentInfo, InstrumentRegistry
+from .single_flight import SingleFlight
+from .timeframes import TIMEFRAMES, Timeframe, candle_end, candle_start, normalize_timeframe
 
-__all__ = ["browser_utils"] 
+__all__ = ["BoundedCache", "INSTRUMENTS", "InstrumentInfo", "InstrumentRegistry", "SingleFlight",
+           "TIMEFRAMES", "Timeframe", "candle_end", "candle_start", "normalize_timeframe"]
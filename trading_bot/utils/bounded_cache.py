@@ -0,0 +1,167 @@
+"""
+Bounded in-memory cache with TTL expiry, LRU eviction and a background sweep
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SWEEP_INTERVAL = 60.0
+
+
+def _default_sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8', errors='ignore'))
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """
+    Key/value cache bounded by entry count and total size.
+
+    Entries expire `ttl` seconds after they were set and are evicted least
+    recently used once `max_items` or `max_bytes` is exceeded. Expired entries
+    are skipped on read and removed by `sweep()`, which runs periodically in the
+    background once an event loop is available, so keys that are never read
+    again do not accumulate.
+    """
+
+    def __init__(self, max_items: int = 1000, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = 3600, sizeof: Optional[Callable[[Any], int]] = None,
+                 sweep_interval: Optional[float] = DEFAULT_SWEEP_INTERVAL, name: str = "cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_items: Maximum number of entries
+            max_bytes: Maximum total size of the values, or None for no limit
+            ttl: Default seconds an entry stays valid, or None to never expire
+            sizeof: Returns the size of a value in bytes
+            sweep_interval: Seconds between background sweeps, or None to only sweep on demand
+            name: Name used in logs and stats
+        """
+        self.max_items = int(max_items)
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.ttl = ttl
+        self.sizeof = sizeof or _default_sizeof
+        self.sweep_interval = sweep_interval
+        self.name = name
+
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self._sweep_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] > time.time()
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    def _remove(self, key: Hashable) -> Any:
+        value, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry and mark it recently used, or `default`"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._remove(key)
+            self.expirations += 1
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries beyond the limits"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else float('inf')
+        size = self.sizeof(value)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self.total_bytes += size
+        while self._entries and (len(self._entries) > self.max_items or
+                                 (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        self._ensure_sweeper()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value"""
+        if key not in self._entries:
+            return default
+        return self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def sweep(self) -> int:
+        """Remove expired entries; returns the number removed"""
+        now = time.time()
+        expired = [key for key, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def _ensure_sweeper(self) -> None:
+        # Started on first write, since caches are usually created before the event loop runs
+        if self.sweep_interval is None or (self._sweep_task is not None and not self._sweep_task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sweep_task = loop.create_task(self._sweep_periodically())
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.debug(f"{self.name}: swept {removed} expired entries")
+
+    def stop(self) -> None:
+        """Cancel the background sweep"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return size, hit rate and eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,366 @@
+"""
+Central registry of tradable instruments with precomputed metadata
+"""
+
+import functools
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from trading_bot.utils.timeframes import normalize_timeframe
+
+# Instruments per market, as used in menus and subscriptions
+MARKET_INSTRUMENTS = {
+    "forex": (
+        "EURUSD", "EURGBP", "EURCHF", "EURJPY", "EURCAD", "EURAUD", "EURNZD",
+        "GBPUSD", "GBPCHF", "GBPJPY", "GBPCAD", "GBPAUD", "GBPNZD",
+        "USDJPY", "USDCHF", "USDCAD", "CHFJPY", "CADJPY", "CADCHF",
+        "AUDUSD", "AUDCHF", "AUDJPY", "AUDNZD", "AUDCAD",
+        "NZDUSD", "NZDCHF", "NZDJPY", "NZDCAD",
+    ),
+    "crypto": (
+        "BTCUSD", "ETHUSD", "XRPUSD", "SOLUSD", "BNBUSD", "ADAUSD", "LTCUSD",
+        "DOGEUSD", "DOTUSD", "LINKUSD", "XLMUSD", "AVAXUSD", "MATICUSD",
+    ),
+    "indices": ("US30", "US500", "US100", "UK100", "DE40", "FR40", "EU50", "JP225", "AU200", "HK50"),
+    "commodities": ("XAUUSD", "XAGUSD", "XTIUSD", "USOIL", "XBRUSD", "WTIUSD", "BCOUSD"),
+}
+
+# Market names used by the chart service
+MARKET_TYPES = {"forex": "forex", "crypto": "crypto", "indices": "index", "commodities": "commodity"}
+
+# Signal timeframe per instrument (H1, H4, M15, M30)
+INSTRUMENT_TIMEFRAME_MAP = {
+    # H1 timeframe only
+    "AUDJPY": "H1",
+    "AUDCHF": "H1",
+    "EURCAD": "H1",
+    "EURGBP": "H1",
+    "GBPCHF": "H1",
+    "HK50": "H1",
+    "NZDJPY": "H1",
+    "USDCHF": "H1",
+    "USDJPY": "H1",  # USDJPY toegevoegd voor signaalabonnementen
+    "XRPUSD": "H1",
+
+    # H4 timeframe only
+    "AUDCAD": "H4",
+    "AU200": "H4",
+    "CADCHF": "H4",
+    "EURCHF": "H4",
+    "EURUSD": "H4",
+    "GBPCAD": "H4",
+    "LINKUSD": "H4",
+    "NZDCHF": "H4",
+
+    # M15 timeframe only
+    "DOGEUSD": "M15",
+    "GBPNZD": "M15",
+    "NZDUSD": "M15",
+    "SOLUSD": "M15",
+    "UK100": "M15",
+    "XAUUSD": "M15",
+
+    # M30 timeframe only
+    "BNBUSD": "M30",
+    "DOTUSD": "M30",
+    "ETHUSD": "M30",
+    "EURAUD": "M30",
+    "EURJPY": "M30",
+    "GBPAUD": "M30",
+    "GBPUSD": "M30",
+    "NZDCAD": "M30",
+    "US30": "M30",
+    "US500": "M30",
+    "USDCAD": "M30",
+    "XLMUSD": "M30",
+    "XTIUSD": "M30",
+    "DE40": "M30",
+    "BTCUSD": "M30",  # Added for consistency with CRYPTO_KEYBOARD_SIGNALS
+    "US100": "M30",   # Added for consistency with INDICES_KEYBOARD_SIGNALS
+    "XAGUSD": "M15",  # Added for consistency with COMMODITIES_KEYBOARD_SIGNALS
+    "USOIL": "M30"    # Added for consistency with COMMODITIES_KEYBOARD_SIGNALS
+
+    # Removed as requested: EU50, FR40, LTCUSD
+}
+
+# Saved TradingView layouts per instrument
+CHART_LINKS = {
+    # Commodities
+    "XAUUSD": "https://www.tradingview.com/chart/bylCuCgc/",
+    "XTIUSD": "https://www.tradingview.com/chart/PWcfBU0O/",
+    "USOIL": "https://www.tradingview.com/chart/PWcfBU0O/",
+    "XAGUSD": "https://www.tradingview.com/chart/PWcfBU0O/",
+
+    # Currencies
+    "EURUSD": "https://www.tradingview.com/chart/zmsuvPgj/",
+    "EURGBP": "https://www.tradingview.com/chart/xt6LdUUi/",
+    "EURCHF": "https://www.tradingview.com/chart/4Jr8hVba/",
+    "EURJPY": "https://www.tradingview.com/chart/ume7H7lm/",
+    "EURCAD": "https://www.tradingview.com/chart/gbtrKFPk/",
+    "EURAUD": "https://www.tradingview.com/chart/WweOZl7z/",
+    "EURNZD": "https://www.tradingview.com/chart/bcrCHPsz/",
+    "GBPUSD": "https://www.tradingview.com/chart/jKph5b1W/",
+    "GBPCHF": "https://www.tradingview.com/chart/1qMsl4FS/",
+    "GBPJPY": "https://www.tradingview.com/chart/Zcmh5M2k/",
+    "GBPCAD": "https://www.tradingview.com/chart/CvwpPBpF/",
+    "GBPAUD": "https://www.tradingview.com/chart/neo3Fc3j/",
+    "GBPNZD": "https://www.tradingview.com/chart/egeCqr65/",
+    "CHFJPY": "https://www.tradingview.com/chart/g7qBPaqM/",
+    "USDJPY": "https://www.tradingview.com/chart/mcWuRDQv/",
+    "USDCHF": "https://www.tradingview.com/chart/e7xDgRyM/",
+    "USDCAD": "https://www.tradingview.com/chart/jjTOeBNM/",
+    "CADJPY": "https://www.tradingview.com/chart/KNsPbDME/",
+    "CADCHF": "https://www.tradingview.com/chart/XnHRKk5I/",
+    "AUDUSD": "https://www.tradingview.com/chart/h7CHetVW/",
+    "AUDCHF": "https://www.tradingview.com/chart/oooBW6HP/",
+    "AUDJPY": "https://www.tradingview.com/chart/sYiGgj7B/",
+    "AUDNZD": "https://www.tradingview.com/chart/AByyHLB4/",
+    "AUDCAD": "https://www.tradingview.com/chart/L4992qKp/",
+    "NZDUSD": "https://www.tradingview.com/chart/yab05IFU/",
+    "NZDCHF": "https://www.tradingview.com/chart/7epTugqA/",
+    "NZDJPY": "https://www.tradingview.com/chart/fdtQ7rx7/",
+    "NZDCAD": "https://www.tradingview.com/chart/mRVtXs19/",
+
+    # Cryptocurrencies
+    "BTCUSD": "https://www.tradingview.com/chart/NWT8AI4a/",
+    "ETHUSD": "https://www.tradingview.com/chart/rVh10RLj/",
+    "XRPUSD": "https://www.tradingview.com/chart/tQu9Ca4E/",
+    "SOLUSD": "https://www.tradingview.com/chart/oTTmSjzQ/",
+    "BNBUSD": "https://www.tradingview.com/chart/wNBWNh23/",
+    "ADAUSD": "https://www.tradingview.com/chart/WcBNFrdb/",
+    "LTCUSD": "https://www.tradingview.com/chart/AoDblBMt/",
+    "DOGEUSD": "https://www.tradingview.com/chart/F6SPb52v/",
+    "DOTUSD": "https://www.tradingview.com/chart/nT9dwAx2/",
+    "LINKUSD": "https://www.tradingview.com/chart/FzOrtgYw/",
+    "XLMUSD": "https://www.tradingview.com/chart/SnvxOhDh/",
+    "AVAXUSD": "https://www.tradingview.com/chart/LfTlCrdQ/",
+
+    # Indices
+    "AU200": "https://www.tradingview.com/chart/U5CKagMM/",
+    "EU50": "https://www.tradingview.com/chart/tt5QejVd/",
+    "FR40": "https://www.tradingview.com/chart/RoPe3S1Q/",
+    "HK50": "https://www.tradingview.com/chart/Rllftdyl/",
+    "JP225": "https://www.tradingview.com/chart/i562Fk6X/",
+    "UK100": "https://www.tradingview.com/chart/0I4gguQa/",
+    "US100": "https://www.tradingview.com/chart/5d36Cany/",
+    "US500": "https://www.tradingview.com/chart/VsfYHrwP/",
+    "US30": "https://www.tradingview.com/chart/heV5Zitn/",
+    "DE40": "https://www.tradingview.com/chart/OWzg0XNw/",
+}
+
+# TradingView (symbol, screener, exchange) where it differs from the market default
+TRADINGVIEW_SYMBOLS = {
+    "XAUUSD": ("GOLD", "cfd", "TVC"),
+    "XAGUSD": ("SILVER", "cfd", "TVC"),
+    "XTIUSD": ("USOIL", "cfd", "TVC"),
+    "USOIL": ("USOIL", "cfd", "TVC"),
+    "WTICL": ("CL1!", "america", "NYMEX"),
+    "XBRUSD": ("UKOIL", "cfd", "TVC"),
+    "AAPL": ("AAPL", "america", "NASDAQ"),
+    "MSFT": ("MSFT", "america", "NASDAQ"),
+    "GOOGL": ("GOOGL", "america", "NASDAQ"),
+    "AMZN": ("AMZN", "america", "NASDAQ"),
+    "US500": ("SPX", "america", "CBOE"),
+    "NAS100": ("NDX", "america", "NASDAQ"),
+    "US30": ("DJI", "america", "DJ"),
+    "US100": ("NDX", "america", "NASDAQ"),
+    "XRPUSD": ("XRPUSDT", "crypto", "BINANCE"),
+}
+
+DISPLAY_NAMES = {
+    "XAUUSD": "Gold", "XAGUSD": "Silver", "XTIUSD": "WTI Oil", "USOIL": "WTI Oil", "WTIUSD": "WTI Oil",
+    "XBRUSD": "Brent Oil", "BCOUSD": "Brent Oil",
+    "US30": "Dow Jones 30", "US500": "S&P 500", "US100": "Nasdaq 100", "UK100": "FTSE 100",
+    "DE40": "DAX 40", "FR40": "CAC 40", "EU50": "Euro Stoxx 50", "JP225": "Nikkei 225",
+    "AU200": "ASX 200", "HK50": "Hang Seng 50",
+}
+
+# Alternative names resolved to the canonical symbol
+ALIASES = {
+    "GOLD": "XAUUSD", "SILVER": "XAGUSD", "OIL": "XTIUSD", "CRUDE": "XTIUSD", "WTI": "XTIUSD",
+    "NAS100": "US100", "NASDAQ": "US100", "SPX": "US500", "SP500": "US500", "DOW": "US30", "DAX": "DE40",
+    # Misspelled keys of the former chart_links table
+    "NDZUSD": "NZDUSD", "DOGUSD": "DOGEUSD", "LNKUSD": "LINKUSD", "AVXUSD": "AVAXUSD",
+}
+
+_CRYPTO_BASES = ("BTC", "ETH", "XRP", "SOL", "BNB", "ADA", "LTC", "DOGE", "DOT", "LINK", "XLM", "AVAX",
+                 "MATIC", "BCH", "EOS", "TRX", "XMR", "SHIB", "UNI", "ATOM")
+_COMMODITY_PREFIXES = ("XAU", "XAG", "XPT", "XPD", "XTI", "XBR", "XNG", "WTI", "BCO", "USOIL", "UKOIL")
+_CURRENCIES = ("USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD")
+_PRECISION = {"BTCUSD": 0, "ETHUSD": 1, "BNBUSD": 2, "SOLUSD": 2, "XRPUSD": 5}
+
+
+class InstrumentInfo(NamedTuple):
+    """Immutable metadata of one instrument"""
+    symbol: str
+    market: str                  # forex, crypto, indices, commodities
+    market_type: str             # forex, crypto, index, commodity
+    precision: int
+    display_name: str
+    tradingview_symbol: str
+    tradingview_screener: str
+    tradingview_exchange: str
+    binance_symbol: Optional[str]
+    chart_url: Optional[str]
+    signal_timeframe: Optional[str]   # e.g. "H1"
+    timeframe: str                    # e.g. "1h"
+
+
+def _infer_market(symbol: str) -> str:
+    if symbol in _MARKET_BY_SYMBOL:
+        return _MARKET_BY_SYMBOL[symbol]
+    if symbol.startswith(_COMMODITY_PREFIXES):
+        return "commodities"
+    if symbol.endswith(("USDT", "USDC")) or any(symbol.startswith(base) for base in _CRYPTO_BASES):
+        return "crypto"
+    return "forex"
+
+
+def _infer_precision(symbol: str, market: str) -> int:
+    if symbol in _PRECISION:
+        return _PRECISION[symbol]
+    if market == "crypto":
+        return 4
+    if market in ("indices", "commodities"):
+        return 2
+    if "JPY" in symbol:
+        return 3
+    return 5
+
+
+def _display_name(symbol: str, market: str) -> str:
+    if symbol in DISPLAY_NAMES:
+        return DISPLAY_NAMES[symbol]
+    if market == "forex" and len(symbol) == 6:
+        return f"{symbol[:3]}/{symbol[3:]}"
+    if market == "crypto" and symbol.endswith("USD"):
+        return f"{symbol[:-3]}/USD"
+    return symbol
+
+
+def _tradingview(symbol: str, market: str) -> Tuple[str, str, str]:
+    if symbol in TRADINGVIEW_SYMBOLS:
+        return TRADINGVIEW_SYMBOLS[symbol]
+    if market == "crypto":
+        return symbol, "crypto", "BINANCE"
+    if market == "commodities":
+        return symbol, "cfd", "TVC"
+    if market == "indices":
+        return symbol, "america", "INDEX"
+    if len(symbol) <= 5:
+        return symbol, "america", "NASDAQ"
+    return symbol, "forex", "FX_IDC"
+
+
+def _binance(symbol: str, market: str) -> Optional[str]:
+    if market != "crypto":
+        return None
+    if symbol.endswith("USD"):
+        return symbol[:-3] + "USDT"
+    return symbol
+
+
+def _build(symbol: str) -> InstrumentInfo:
+    market = _infer_market(symbol)
+    screener_symbol, screener, exchange = _tradingview(symbol, market)
+    signal_timeframe = INSTRUMENT_TIMEFRAME_MAP.get(symbol)
+    return InstrumentInfo(
+        symbol=symbol,
+        market=market,
+        market_type=MARKET_TYPES[market],
+        precision=_infer_precision(symbol, market),
+        display_name=_display_name(symbol, market),
+        tradingview_symbol=screener_symbol,
+        tradingview_screener=screener,
+        tradingview_exchange=exchange,
+        binance_symbol=_binance(symbol, market),
+        chart_url=CHART_LINKS.get(symbol),
+        signal_timeframe=signal_timeframe,
+        timeframe=normalize_timeframe(signal_timeframe),
+    )
+
+
+_MARKET_BY_SYMBOL = {symbol: market for market, symbols in MARKET_INSTRUMENTS.items() for symbol in symbols}
+
+
+class InstrumentRegistry:
+    """
+    Immutable lookup of instrument metadata.
+
+    Every known instrument is resolved once when the registry is built; any
+    other symbol is classified with the same rules on first use and memoized,
+    so lookups on hot paths are dictionary reads without scans or logging.
+    """
+
+    def __init__(self):
+        aliases = dict(ALIASES)
+        for base in _CRYPTO_BASES:
+            aliases.setdefault(base, f"{base}USD")
+            aliases.setdefault(f"{base}USDT", f"{base}USD")
+        self._aliases: Mapping[str, str] = MappingProxyType(aliases)
+
+        symbols = set(_MARKET_BY_SYMBOL) | set(CHART_LINKS) | set(INSTRUMENT_TIMEFRAME_MAP)
+        self._instruments: Mapping[str, InstrumentInfo] = MappingProxyType(
+            {symbol: _build(symbol) for symbol in sorted(symbols)}
+        )
+
+    def normalize(self, instrument: str) -> str:
+        """Canonical symbol for a user- or provider-supplied name (e.g. 'eur/usd', 'GOLD', 'BTCUSDT')"""
+        if not instrument:
+            return ""
+        symbol = instrument.upper().replace("/", "").strip()
+        return self._aliases.get(symbol, symbol)
+
+    def get(self, instrument: str) -> InstrumentInfo:
+        """Metadata of an instrument; unknown symbols are classified by naming rules"""
+        symbol = self.normalize(instrument)
+        info = self._instruments.get(symbol)
+        return info if info is not None else _build_unknown(symbol)
+
+    def __contains__(self, instrument: str) -> bool:
+        return self.normalize(instrument) in self._instruments
+
+    def market(self, instrument: str) -> str:
+        return self.get(instrument).market
+
+    def market_type(self, instrument: str) -> str:
+        return self.get(instrument).market_type
+
+    def precision(self, instrument: str) -> int:
+        return self.get(instrument).precision
+
+    def chart_url(self, instrument: str) -> Optional[str]:
+        return self.get(instrument).chart_url
+
+    def tradingview(self, instrument: str) -> Tuple[str, str, str]:
+        """TradingView (symbol, screener, exchange) of an instrument"""
+        info = self.get(instrument)
+        return info.tradingview_symbol, info.tradingview_screener, info.tradingview_exchange
+
+    def binance_symbol(self, instrument: str) -> str:
+        """Binance trading pair, quoting USD instruments in USDT"""
+        info = self.get(instrument)
+        if info.binance_symbol:
+            return info.binance_symbol
+        symbol = info.symbol
+        return symbol[:-3] + "USDT" if symbol.endswith("USD") else symbol
+
+    def instruments(self, market: Optional[str] = None) -> Tuple[InstrumentInfo, ...]:
+        """All known instruments, optionally of one market"""
+        return tuple(info for info in self._instruments.values() if market is None or info.market == market)
+
+    def chart_links(self) -> Dict[str, str]:
+        """Chart URL per symbol, including the aliases that point at a charted instrument"""
+        links = {info.symbol: info.chart_url for info in self._instruments.values() if info.chart_url}
+        for alias, symbol in self._aliases.items():
+            if symbol in links:
+                links.setdefault(alias, links[symbol])
+        return links
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_unknown(symbol: str) -> InstrumentInfo:
+    return _build(symbol)
+
+
+INSTRUMENTS = InstrumentRegistry()
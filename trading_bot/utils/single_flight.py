@@ -0,0 +1,66 @@
+"""
+Async single-flight: concurrent calls for the same key share one execution
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls by key.
+
+    The first caller for a key starts the work; callers arriving while it is
+    running await the same result (or exception) instead of repeating it.
+    The work runs as its own task, so a caller that is cancelled does not
+    cancel it for the others. Nothing is cached once the work finishes.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        """
+        Initialize an empty group.
+
+        Args:
+            name: Label used in logs and statistics
+        """
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Return the result of `func(*args, **kwargs)`, sharing a running call for `key`.
+
+        Args:
+            key: Identity of the work, typically its cache key
+            func: Coroutine function doing the work
+        """
+        self.stats["calls"] += 1
+        task = self._calls.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            logger.debug(f"[{self.name}] Joining in-flight call for {key}")
+        else:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception so it is not reported as unhandled when every caller was cancelled
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def in_flight(self) -> int:
+        """Number of keys currently being worked on"""
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return call counters; `coalesced` counts calls that reused another caller's work"""
+        return {"name": self.name, **self.stats, "in_flight": len(self._calls)}
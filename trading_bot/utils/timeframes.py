@@ -0,0 +1,175 @@
+"""
+Canonical timeframes with precomputed aliases, provider intervals and candle-boundary arithmetic
+"""
+
+import calendar
+import datetime
+import functools
+import logging
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEFRAME = "1h"
+
+
+class Timeframe(NamedTuple):
+    """One canonical timeframe and its spelling per consumer"""
+    id: str                   # canonical id, e.g. "1h"
+    seconds: int              # nominal candle length; months use 30 days
+    label: str                # e.g. "1 Hour"
+    mt_code: str              # MetaTrader notation, e.g. "H1"
+    style: str                # trading style stored with preferences
+    tradingview_ta: str       # tradingview_ta.Interval value
+    tradingview_chart: str    # `interval` parameter of TradingView chart URLs
+    binance: str              # Binance kline interval
+
+
+_MINUTE, _HOUR, _DAY = 60, 3600, 86400
+
+TIMEFRAMES: Dict[str, Timeframe] = {tf.id: tf for tf in (
+    Timeframe("1m", _MINUTE, "1 Minute", "M1", "test", "1m", "1", "1m"),
+    Timeframe("5m", 5 * _MINUTE, "5 Minutes", "M5", "scalp", "5m", "5", "5m"),
+    Timeframe("15m", 15 * _MINUTE, "15 Minutes", "M15", "scalp", "15m", "15", "15m"),
+    Timeframe("30m", 30 * _MINUTE, "30 Minutes", "M30", "intraday", "30m", "30", "30m"),
+    Timeframe("1h", _HOUR, "1 Hour", "H1", "intraday", "1h", "60", "1h"),
+    Timeframe("2h", 2 * _HOUR, "2 Hours", "H2", "intraday", "2h", "120", "2h"),
+    Timeframe("4h", 4 * _HOUR, "4 Hours", "H4", "swing", "4h", "240", "4h"),
+    Timeframe("1d", _DAY, "1 Day", "D1", "swing", "1d", "D", "1d"),
+    Timeframe("1w", 7 * _DAY, "1 Week", "W1", "swing", "1W", "W", "1w"),
+    Timeframe("1M", 30 * _DAY, "1 Month", "MN1", "swing", "1M", "M", "1M"),
+)}
+
+# Trading style chosen in the menus -> timeframe
+STYLE_TIMEFRAME_MAP = {
+    "test": "1m",
+    "scalp": "15m",
+    "scalp30": "30m",
+    "intraday": "1h",
+    "swing": "4h",
+}
+
+
+def _build_aliases() -> Dict[str, str]:
+    aliases: Dict[str, str] = {}
+    for tf in TIMEFRAMES.values():
+        minutes = tf.seconds // _MINUTE
+        spellings = {tf.id, tf.mt_code, tf.tradingview_chart, tf.binance, f"{minutes}min"}
+        if tf.seconds < 30 * _DAY:
+            spellings |= {str(minutes), f"{minutes}m"}
+        for spelling in spellings:
+            aliases[spelling] = tf.id
+            # Everything except the month is case-insensitive ("1M" is not "1m")
+            if tf.id != "1M":
+                aliases.setdefault(spelling.lower(), tf.id)
+    aliases.update({"60m": "1h", "240m": "4h", "m1": "1m", "h1": "1h", "d": "1d", "1day": "1d",
+                    "w": "1w", "1week": "1w", "mn": "1M", "mn1": "1M", "1mo": "1M", "1month": "1M"})
+    return aliases
+
+
+# Every accepted spelling -> canonical id
+TIMEFRAME_ALIASES: Dict[str, str] = _build_aliases()
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize(text: str) -> Optional[str]:
+    text = text.strip().strip("\"'").strip()
+    if text in TIMEFRAME_ALIASES:
+        return TIMEFRAME_ALIASES[text]
+    return TIMEFRAME_ALIASES.get(text.lower())
+
+
+def normalize_timeframe(timeframe: Any, default: Optional[str] = DEFAULT_TIMEFRAME) -> Optional[str]:
+    """
+    Canonical id of a timeframe in any supported notation ('60', 'H1', '1h', '"1h"', {'timeframe': '1h'}).
+
+    Empty values give `default`; unrecognized values are returned lowercased
+    so that they still compare equal to themselves.
+    """
+    if isinstance(timeframe, dict):
+        timeframe = timeframe.get("timeframe")
+    if timeframe is None or timeframe == "":
+        return default
+    text = str(timeframe)
+    canonical = _normalize(text)
+    if canonical is not None:
+        return canonical
+    return text.strip().strip("\"'").lower()
+
+
+def get_timeframe(timeframe: Any) -> Optional[Timeframe]:
+    """Timeframe of any supported notation, or None when unrecognized"""
+    return TIMEFRAMES.get(normalize_timeframe(timeframe, default=None))
+
+
+def timeframe_to_style(timeframe: Any, default: str = "intraday") -> str:
+    """Trading style of a timeframe ('test', 'scalp', 'intraday', 'swing')"""
+    if not timeframe:
+        return default
+    tf = get_timeframe(timeframe)
+    if tf is None:
+        logger.warning(f"Could not map timeframe '{timeframe}' to a style, defaulting to '{default}'")
+        return default
+    return tf.style
+
+
+def provider_interval(timeframe: Any, provider: str, default: Optional[str] = DEFAULT_TIMEFRAME) -> Optional[str]:
+    """
+    Interval notation of a provider for a timeframe.
+
+    Args:
+        timeframe: Timeframe in any supported notation
+        provider: Timeframe field naming the provider ('binance', 'tradingview_ta', 'tradingview_chart', 'mt_code')
+        default: Canonical timeframe used when `timeframe` is unrecognized; None returns None instead
+
+    Returns:
+        The provider's interval string
+    """
+    tf = get_timeframe(timeframe)
+    if tf is None:
+        if default is None:
+            return None
+        tf = TIMEFRAMES[default]
+    return getattr(tf, provider)
+
+
+def _as_timestamp(at: Optional[float]) -> float:
+    return time.time() if at is None else float(at)
+
+
+def candle_start(timeframe: Any, at: Optional[float] = None) -> float:
+    """
+    UTC epoch timestamp at which the candle containing `at` (default: now) opened.
+
+    Intraday candles align to multiples of their length since the epoch (so
+    4h candles open at 00:00, 04:00, ... UTC), weekly candles on Monday 00:00
+    UTC and monthly candles on the first of the month.
+    """
+    tf = get_timeframe(timeframe) or TIMEFRAMES[DEFAULT_TIMEFRAME]
+    ts = _as_timestamp(at)
+    if tf.id == "1M":
+        moment = datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
+        return calendar.timegm((moment.year, moment.month, 1, 0, 0, 0))
+    if tf.id == "1w":
+        # The epoch was a Thursday; shift so weeks start on Monday
+        offset = 3 * _DAY
+        return ts - (ts + offset) % tf.seconds
+    return ts - ts % tf.seconds
+
+
+def candle_end(timeframe: Any, at: Optional[float] = None) -> float:
+    """UTC epoch timestamp at which the candle containing `at` (default: now) closes"""
+    tf = get_timeframe(timeframe) or TIMEFRAMES[DEFAULT_TIMEFRAME]
+    start = candle_start(tf.id, at)
+    if tf.id == "1M":
+        moment = datetime.datetime.fromtimestamp(start, datetime.timezone.utc)
+        year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+        return calendar.timegm((year, month, 1, 0, 0, 0))
+    return start + tf.seconds
+
+
+def seconds_until_close(timeframe: Any, at: Optional[float] = None) -> float:
+    """Seconds until the current candle closes; usable as a cache TTL that expires on the next candle"""
+    ts = _as_timestamp(at)
+    return candle_end(timeframe, ts) - ts